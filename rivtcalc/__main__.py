@@ -49,13 +49,42 @@ def _cmdlinehelp():
     print("     rddcc_calcfilename.pdf")
     print("Logs and other intermediate files are written to the tmp folder.")
     print()
+    print("Options:")
+    print("     --timings   write import times and equation memo counts")
+    print("     --nocache   process all sections without the render cache")
+    print("     --numexpr   evaluate large array expressions with numexpr")
+    print("     --quiet     do not write calc output to the terminal")
+    print("     --flush=n   write terminal output every n writes (default: per string)")
+    print()
+    print("Run a calc for each row of a csv file of input values with:")
+    print("     python  -m rivtcalc sweep rddcc_calcfilename.py cases.csv")
+    print("Results are written to cases_results.csv. Options:")
+    print("     --results=M1,V1   result names (default: equation results)")
+    print("     --workers=4       worker processes (default: cpu count)")
+    print("     --out=file.csv    results file")
+    print()
+    print("Check calc files without running them with:")
+    print("     python  -m rivtcalc check [rddcc_calcfilename.py | project folder]")
+    print("Problems are printed as file:line: message. Options:")
+    print("     --workers=4       worker processes (default: cpu count)")
+    print()
     print("Program and documentation are here: http://rivtcalc.github.io.")
     sys.exit()
 
 
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["sweep"]:
+        import rivtcalc.rc_sweep as _rc_sweep
+
+        _rc_sweep.main(sys.argv[2:])
+        sys.exit()
+    if sys.argv[1:2] == ["check"]:
+        import rivtcalc.rc_chk as _rc_chk
+
+        _rc_chk.main(sys.argv[2:])
     try:
-        _calcfileS = sys.argv[1]  # calc file argument
+        _argL = [a for a in sys.argv[1:] if not a.startswith("--")]
+        _calcfileS = _argL[0]  # calc file argument
         _cwdS = os.getcwd()  # get calc folder
         _cfull = Path(_calcfileS)  # calc file full path
         _cfileS = Path(_cfull).name  # calc file name
@@ -0,0 +1,201 @@
+#! python
+"""hashing and disk caches for rendered calc output
+
+stable_hash returns a digest of calc values that does not change between runs
+(numbers, strings, numpy arrays, Unum values and containers of them). The
+DiskCache class stores pickled results in a project tmp subfolder and evicts
+least recently used entries when the folder exceeds a size limit."""
+
+import os
+import pickle
+import hashlib
+import logging
+from pathlib import Path
+
+import numpy as np
+from rivtcalc.rc_unit import Unum
+
+
+def _feed(hasher, obj, depthI: int = 0):
+    """add stable byte representation of obj to hasher"""
+
+    if depthI > 20:
+        hasher.update(b"<deep>")
+        return
+    typeS = type(obj).__name__
+    hasher.update(typeS.encode("utf-8"))
+    if obj is None or isinstance(obj, (bool, int, float, complex, str)):
+        hasher.update(repr(obj).encode("utf-8"))
+    elif isinstance(obj, bytes):
+        hasher.update(obj)
+    elif isinstance(obj, np.ndarray):
+        hasher.update(str(obj.dtype).encode("utf-8") + str(obj.shape).encode("utf-8"))
+        if obj.dtype == object:
+            for item in obj.ravel():
+                _feed(hasher, item, depthI + 1)
+        else:
+            hasher.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, np.generic):
+        hasher.update(obj.tobytes())
+    elif isinstance(obj, Unum):
+        _feed(hasher, obj._value, depthI + 1)
+        _feed(hasher, sorted(obj._unit.items()), depthI + 1)
+    elif isinstance(obj, (list, tuple)):
+        hasher.update(str(len(obj)).encode("utf-8"))
+        for item in obj:
+            _feed(hasher, item, depthI + 1)
+    elif isinstance(obj, dict):
+        hasher.update(str(len(obj)).encode("utf-8"))
+        for key in sorted(obj, key=repr):
+            _feed(hasher, key, depthI + 1)
+            _feed(hasher, obj[key], depthI + 1)
+    elif isinstance(obj, (set, frozenset)):
+        for item in sorted(obj, key=repr):
+            _feed(hasher, item, depthI + 1)
+    elif hasattr(obj, "stable_key") and not isinstance(obj, type):
+        _feed(hasher, obj.stable_key(), depthI + 1)
+    elif callable(obj) and hasattr(obj, "__code__"):  # function
+        hasher.update(getattr(obj, "__qualname__", "").encode("utf-8"))
+        hasher.update(obj.__code__.co_code)
+        _feed(hasher, obj.__code__.co_consts, depthI + 1)
+    else:
+        try:
+            hasher.update(pickle.dumps(obj, protocol=4))
+        except Exception:
+            hasher.update(getattr(obj, "__qualname__", typeS).encode("utf-8"))
+
+
+def stable_hash(*objs) -> str:
+    """return hex digest of objects that is stable across runs
+
+    Args:
+        objs: values to hash
+
+    Returns:
+        str: sha1 hex digest
+    """
+
+    hasher = hashlib.sha1()
+    for obj in objs:
+        _feed(hasher, obj)
+    return hasher.hexdigest()
+
+
+def file_hash(fileP: Path) -> str:
+    """return sha1 hex digest of file contents or 'missing'"""
+
+    hasher = hashlib.sha1()
+    try:
+        with open(fileP, "rb") as f1:
+            for blockB in iter(lambda: f1.read(1 << 20), b""):
+                hasher.update(blockB)
+    except OSError:
+        return "missing"
+    return hasher.hexdigest()
+
+
+class DiskCache:
+    """pickle cache in a folder with size bounded LRU eviction"""
+
+    def __init__(self, folderP: Path, maxbytesI: int = 64 * 2 ** 20):
+        """
+        Args:
+            folderP (Path): cache folder, created on first write
+            maxbytesI (int): folder size that triggers eviction
+        """
+
+        self.folderP = Path(folderP)
+        self.maxbytesI = maxbytesI
+        self.hitsI = 0
+        self.missesI = 0
+        self.sizeI = None  # folder size estimate, read on first write
+
+    def _path(self, keyS: str) -> Path:
+        return Path(self.folderP, keyS + ".pkl")
+
+    def get(self, keyS: str, default=None):
+        """return cached value or default
+
+        Args:
+            keyS (str): cache key (hex digest)
+        """
+
+        fileP = self._path(keyS)
+        try:
+            with open(fileP, "rb") as f1:
+                value = pickle.load(f1)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+                ImportError, IndexError, TypeError):
+            self.missesI += 1
+            return default
+        try:
+            os.utime(fileP)  # mark as recently used
+        except OSError:
+            pass
+        self.hitsI += 1
+        return value
+
+    def set(self, keyS: str, value) -> bool:
+        """write value to cache and evict old entries if over the size limit
+
+        Args:
+            keyS (str): cache key (hex digest)
+            value: picklable value
+
+        Returns:
+            bool: True if written
+        """
+
+        try:
+            dataB = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as error:
+            logging.debug("cache value not picklable: " + str(error))
+            return False
+        try:
+            self.folderP.mkdir(parents=True, exist_ok=True)
+            tmpP = Path(self.folderP, keyS + "." + str(os.getpid()) + ".tmp")
+            with open(tmpP, "wb") as f1:
+                f1.write(dataB)
+            os.replace(tmpP, self._path(keyS))
+        except OSError as error:
+            logging.debug("cache not written: " + str(error))
+            return False
+        if self.sizeI is None:
+            self.evict()
+        else:
+            self.sizeI += len(dataB)  # overestimate if key was overwritten
+            if self.sizeI > self.maxbytesI:
+                self.evict()
+        return True
+
+    def evict(self):
+        """delete least recently used entries until under the size limit"""
+
+        try:
+            entryL = [
+                (e.stat().st_mtime, e.stat().st_size, e.path)
+                for e in os.scandir(self.folderP)
+                if e.name.endswith(".pkl")
+            ]
+        except OSError:
+            return
+        totalI = sum(e[1] for e in entryL)
+        for mtimeF, sizeI, pathS in sorted(entryL):
+            if totalI <= self.maxbytesI:
+                break
+            try:
+                os.remove(pathS)
+            except OSError:
+                continue
+            totalI -= sizeI
+        self.sizeI = totalI
+
+    def clear(self):
+        """delete all entries"""
+
+        for fileP in self.folderP.glob("*.pkl"):
+            try:
+                fileP.unlink()
+            except OSError:
+                pass
+        self.sizeI = 0
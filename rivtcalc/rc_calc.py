@@ -12,26 +12,112 @@ import subprocess
 import tempfile
 import re
 import io
+import ast
 import logging
 import numpy.linalg as la
-import pandas as pd
-import sympy as sp
-import matplotlib.pyplot as plt
-import matplotlib.image as mpimg
-from IPython.display import display as _display
-from IPython.display import Image as _Image
-from io import StringIO
-from sympy.parsing.latex import parse_latex
-from sympy.abc import _clash2
-from tabulate import tabulate
+import rivtcalc.rc_lazy as _rc_lazy
+import rivtcalc.rc_ir as _rc_ir
+import rivtcalc.rc_cache as _rc_cache
+import rivtcalc.rc_eval as _rc_eval
+import rivtcalc.rc_pretty as _rc_pretty
+import rivtcalc.rc_func as _rc_func
+import rivtcalc.rc_reg as _rc_reg
+import rivtcalc.rc_out as _rc_out
+from contextlib import redirect_stdout
 from pathlib import Path
 from numpy import *
 from rivtcalc.rc_unit import *
 
+# heavy libraries are imported on first use
+pd = _rc_lazy.lazy_module("pandas")
+sp = _rc_lazy.lazy_module("sympy")
+plt = _rc_lazy.lazy_module("matplotlib.pyplot")
+mpimg = _rc_lazy.lazy_module("matplotlib.image")
+_abc = _rc_lazy.lazy_module("sympy.abc")
+tabulate = _rc_lazy.lazy_attr("tabulate", "tabulate")
+_display = _rc_lazy.lazy_attr("IPython.display", "display")
+_Image = _rc_lazy.lazy_attr("IPython.display", "Image")
+
 logging.getLogger("numexpr").setLevel(logging.WARNING)
 # tabulate.PRESERVE_WHITESPACE = True
 
 
+class EqGraph:
+    """dependency graph of value-string assignments
+
+    Each node is keyed by the assignment line and command settings, and holds
+    the names the expression reads, the name it writes, digests of the values
+    read when it was last evaluated, the result and the rendered output. An
+    assignment is evaluated again only if it is new or one of the values it
+    reads has changed, so on re-run only assignments downstream of a change
+    are evaluated and rendered. A session keeps one graph for all V strings.
+    """
+
+    def __init__(self):
+        self.nodeD = {}  # node key -> node dict
+        self.readsD = {}  # expression -> names read
+        self.hitsI = 0
+        self.missesI = 0
+
+    def reads(self, exprS: str) -> list:
+        """return sorted names read by an expression
+
+        Args:
+            exprS (str): Python expression
+
+        Returns:
+            list: names
+        """
+
+        if exprS not in self.readsD:
+            try:
+                nameL = {
+                    n.id for n in ast.walk(ast.parse(exprS, mode="eval"))
+                    if isinstance(n, ast.Name)
+                }
+            except SyntaxError:
+                nameL = set(re.findall(r"[A-Za-z_]\w*", exprS))
+            self.readsD[exprS] = sorted(nameL)
+        return self.readsD[exprS]
+
+    def key(self, vL: list, setcmdD: dict) -> str:
+        """return node key for an assignment line and its render settings"""
+
+        return _rc_cache.stable_hash(
+            vL, setcmdD["trmrI"], setcmdD["trmtI"], setcmdD["subB"]
+        )
+
+    def digest(self, nameL: list, rivtD: dict) -> str:
+        """return digest of the current values of names"""
+
+        return _rc_cache.stable_hash([(n in rivtD, rivtD.get(n)) for n in nameL])
+
+    def lookup(self, keyS: str, rivtD: dict):
+        """return node if the values it reads are unchanged, else None
+
+        Args:
+            keyS (str): node key
+            rivtD (dict): calc values
+
+        Returns:
+            dict: node or None
+        """
+
+        nodeD = self.nodeD.get(keyS)
+        if nodeD is not None and nodeD["digestS"] == self.digest(
+            nodeD["readL"], rivtD
+        ):
+            self.hitsI += 1
+            return nodeD
+        self.missesI += 1
+        return None
+
+    def store(self, keyS: str, nodeD: dict):
+        """store evaluated node"""
+
+        self.nodeD[keyS] = nodeD
+
+
 class OutputUTF:
     """convert rivt-string to UTF8 calc and write to terminal"""
 
@@ -43,6 +129,9 @@ class OutputUTF:
         setsectD: dict,
         rivtD: dict,
         exportS: str,
+        graphO: EqGraph = None,
+        formatO: _rc_eval.FormatContext = None,
+        overD: dict = None,
     ):
 
         """process rivt-string to UTF8 calc-string
@@ -56,16 +145,33 @@ class OutputUTF:
             setsectD (dict): section settings
             rivtD (dict): global rivt dictionary
             exportS (str): stores values that are written to file
+            graphO (EqGraph): assignments from previous runs, or None
+            formatO (FormatContext): session number format, or None
+            overD (dict): expression strings that replace assigned values
         """
 
-        self.calcS = """"""  # utf calc string
+        self.calcS = _rc_out.TextBuilder()  # utf calc string
         self.exportS = exportS
         self.strL = strL
         self.folderD = folderD
         self.setsectD = setsectD
         self.setcmdD = setcmdD
         self.rivtD = rivtD
+        self.scope = _rc_eval.CalcScope(
+            rivtD,
+            _rc_eval.calc_namespace(globals()),
+            setcmdD.get("numexprB", False),
+        )  # calc namespace
+        self.tscope = _rc_eval.CalcScope(
+            rivtD,
+            _rc_eval.table_namespace(globals()),
+            setcmdD.get("numexprB", False),
+        )  # table statement namespace
         self.valL = []  # value list
+        self.evalL = []  # evaluated assignments for doc replay
+        self.graphO = graphO
+        self.formatO = formatO or _rc_eval.FormatContext()
+        self.overD = overD or {}
 
     def _refs(self, objnumI: int, typeS: str) -> str:
         """reference label for equations, tables and figures
@@ -85,167 +191,147 @@ class OutputUTF:
 
         return refS
 
-    def _tags(self, tagS: str, tagL: list) -> tuple:
-        """parse tag
+    def _tags(self, tagS: str, tagD: dict) -> str:
+        """format line with a tag
 
         Args:
-            tagS (str): rivt-string with tag
-            tagL (list): list of tag parameters
-            setsectD (dict): section dictionary
+            tagS (str): rivt-string line with tag
+            tagD (dict): bound tag handlers of the string type
 
         Return:
             uS (str): utf string
         """
 
         tagS = tagS.rstrip()
-        uS = ""
-        swidthII = self.setsectD["swidthI"] - 1
-        try:
-            tag = list(set(tagL).intersection(tagS.split()))[0]
-        except:
-            uS = tagS
-            return uS
-
-        if tag == "[#]_":  # auto increment footnote mark
-            ftnumII = self.setsectD["ftqueL"][-1] + 1
-            self.setsectD["ftqueL"].append(ftnumII)
-            uS = tagS.replace("[x]_", "[" + str(ftnumII) + "]")
-        elif tag == "[foot]_":  # footnote label
-            tagS = tagS.strip("[foot]_").strip()
-            uS = self.setsectD["ftqueL"].popleft() + tagS
-        elif tag == "[page]_":  # new page
-            uS = int(self.setsectD["swidthI"]) * "."
-        elif tag == "[line]_":  # horizontal line
-            uS = int(self.setsectD["swidthI"]) * "-"
-        elif tag == "[link]_":  # url link
-            tgS = tagS.strip("[link]_").strip()
-            tgL = tgS.split("|")
-            uS = tgL[0].strip() + " : " + tgL[1].strip()
-        elif tag == "[literal]_":  # literal text
-            uS = "\n"
-        elif tag == "[latex]_":  # literal text
-            uS = "\n"
-        elif tag == "[r]_":  # right adjust text
-            tagL = tagS.strip().split("[r]_")
-            uS = (tagL[0].strip()).rjust(swidthII)
-        elif tag == "[c]_":  # center text
-            tagL = tagS.strip().split("[c]_")
-            uS = (tagL[0].strip()).rjust(swidthII)
-        elif tag == "[f]_":  # figure caption
-            tagL = tagS.strip().split("[f]_")
-            fnumI = int(self.setsectD["fnumI"]) + 1
-            self.setsectD["fnumI"] = fnumI
-            refS = self._refs(fnumI, "[ Fig: ") + " ]"
-            spcI = self.setsectD["swidthI"] - len(refS) - len(tagL[0].strip())
-            uS = tagL[0].strip() + " " * spcI + refS
-        elif tag == "[e]_":  # equation label
-            tagL = tagS.strip().split("[e]_")
-            enumI = int(self.setsectD["enumI"]) + 1
-            self.setsectD["enumI"] = enumI
-            refS = self._refs(enumI, "[ Equ: ") + " ]"
-            spcI = self.setsectD["swidthI"] - len(refS) - len(tagL[0].strip())
-            uS = tagL[0].strip() + " " * spcI + refS
-        elif tag == "[t]_":  # table label
-            tagL = tagS.strip().split("[t]_")
-            tnumI = int(self.setsectD["tnumI"]) + 1
-            self.setsectD["tnumI"] = tnumI
-            refS = self._refs(tnumI, "[Table: ") + " ]"
-            spcI = self.setsectD["swidthI"] - len(refS) - len(tagL[0].strip())
-            uS = tagL[0].strip() + " " * spcI + refS
-        elif tag == "[x]_":  # format tex
-            tagL = tagS.strip().split("[x]_")
-            txS = tagL[0].strip()
-            # txS = txs.encode('unicode-escape').decode()
-            ptxS = parse_latex(txS)
-            uS = sp.pretty(sp.sympify(ptxS, _clash2, evaluate=False))
-        elif tag == "[s]_":  # format sympy
-            tagL = tagS.strip().split("[s]_")
-            spS = tagL[0].strip()
-            spL = spS.split("=")
-            spS = "Eq(" + spL[0] + ",(" + spL[1] + "))"
-            # sps = sps.encode('unicode-escape').decode()
-            uS = sp.pretty(sp.sympify(spS, _clash2, evaluate=False))
-        elif tag == "[n]_":  # new line
-            tagL = tagS.strip().split("[n]_")
-            tagS = tagL[0]
-            uS = tagS
-        else:
-            uS = tagS
+        tagF = _rc_reg.find_tag(tagS, tagD)
+        if tagF is None:
+            return tagS
+        return tagF(tagS)
+
+    def _tagmark(self, tagS: str) -> str:
+        """auto increment footnote mark"""
+
+        ftnumII = self.setsectD["ftqueL"][-1] + 1
+        self.setsectD["ftqueL"].append(ftnumII)
+        return tagS.replace("[x]_", "[" + str(ftnumII) + "]")
+
+    def _tagfoot(self, tagS: str) -> str:
+        """footnote label"""
+
+        tagS = tagS.strip("[foot]_").strip()
+        return self.setsectD["ftqueL"].popleft() + tagS
+
+    def _tagpage(self, tagS: str) -> str:
+        """new page"""
+
+        return int(self.setsectD["swidthI"]) * "."
+
+    def _tagline(self, tagS: str) -> str:
+        """horizontal line"""
+
+        return int(self.setsectD["swidthI"]) * "-"
+
+    def _taglink(self, tagS: str) -> str:
+        """url link"""
+
+        tgS = tagS.strip("[link]_").strip()
+        tgL = tgS.split("|")
+        return tgL[0].strip() + " : " + tgL[1].strip()
+
+    def _tagliteral(self, tagS: str) -> str:
+        """literal or latex text"""
+
+        return "\n"
+
+    def _tagright(self, tagS: str) -> str:
+        """right adjust text"""
+
+        tagL = tagS.strip().split("[r]_")
+        return (tagL[0].strip()).rjust(self.setsectD["swidthI"] - 1)
+
+    def _tagcenter(self, tagS: str) -> str:
+        """center text"""
+
+        tagL = tagS.strip().split("[c]_")
+        return (tagL[0].strip()).rjust(self.setsectD["swidthI"] - 1)
+
+    def _taglabel(self, tagS: str, tagkeyS: str, numS: str, refS: str) -> str:
+        """number and label figure, equation or table"""
+
+        tagL = tagS.strip().split(tagkeyS)
+        numI = int(self.setsectD[numS]) + 1
+        self.setsectD[numS] = numI
+        refS = self._refs(numI, refS) + " ]"
+        spcI = self.setsectD["swidthI"] - len(refS) - len(tagL[0].strip())
+        return tagL[0].strip() + " " * spcI + refS
+
+    def _tagfigure(self, tagS: str) -> str:
+        """figure caption"""
+
+        return self._taglabel(tagS, "[f]_", "fnumI", "[ Fig: ")
+
+    def _tagequation(self, tagS: str) -> str:
+        """equation label"""
+
+        return self._taglabel(tagS, "[e]_", "enumI", "[ Equ: ")
+
+    def _tagtable(self, tagS: str) -> str:
+        """table label"""
+
+        return self._taglabel(tagS, "[t]_", "tnumI", "[Table: ")
+
+    def _tagtex(self, tagS: str) -> str:
+        """format tex"""
+
+        txS = tagS.strip().split("[x]_")[0].strip()
+        return _rc_pretty.pretty_latex(txS, self.folderD["mpath"])
+
+    def _tagsympy(self, tagS: str) -> str:
+        """format sympy"""
 
-        return uS
+        spL = tagS.strip().split("[s]_")[0].strip().split("=")
+        return _rc_pretty.pretty_eq(spL[0], spL[1], self.folderD["mpath"])
 
-    def _parseUTF(self, typeS: str, cmdL: list, methL: list, tagL: list):
+    def _parseUTF(self, typeS: str):
         """parse rivt-string to UTF
 
+        Commands and tags are dispatched to the handlers registered in rc_reg
+        for the utf backend and the string type.
+
         Args:
             typeS (str): rivt-string type
-            cmdL (list): command list
-            methL (list): method list
-            tagL (list): tag list
         """
-        locals().update(self.rivtD)
-        uL = []  # command arguments
-        indxI = -1  # method index
-        _rgx = r"\[([^\]]+)]_"  # find tags
-
-        for uS in self.strL:
-            if uS[0:2] == "##":
-                continue  # remove review comment
-            uS = uS[4:]  # remove indent
-            if len(uS) == 0:
+        cmdD = _rc_reg.bind(self, _rc_reg.commands("utf", typeS))
+        tagD = _rc_reg.bind(self, _rc_reg.tags("utf", typeS))
+        nodeL = _rc_ir.compile_str(self.strL, typeS, self.folderD["mpath"])
+
+        for node in nodeL:
+            kindS = node.kindS
+            if kindS == "flush":
                 if len(self.valL) > 0:  # prnt value table
                     hdrL = ["variable", "value", "[value]", "description"]
                     alignL = ["left", "right", "right", "left"]
                     self._vtable(self.valL, hdrL, "rst", alignL)
                     self.valL = []
-                    print(uS.rstrip(" "))
+                    print("")
                     self.calcS += " \n"
-                    self.rivtD.update(locals())
-                    continue
                 else:
                     print(" ")
                     self.calcS += "\n"
-                    continue
-            try:
-                if uS[0] == "#":
-                    continue  # remove comment
-            except:
-                print(" ")  # if uS[0] throws error
-                self.calcS += "\n"
-                continue
-            if re.search(_rgx, uS):  # check for tag
-                utgS = self._tags(uS, tagL)
+            elif kindS == "tag":
+                utgS = self._tags(node.textS, tagD)
                 print(utgS.rstrip())
                 self.calcS += utgS.rstrip() + "\n"
-                continue
-            if typeS == "values":
-                self.setcmdD["saveB"] = False
-                if "=" in uS and uS.strip()[-2] == "||":  # set save flag
-                    uS = uS.replace("||", " ")
-                    self.setcmdD["saveB"] = True
-                if "=" in uS:  # just assign value
-                    uL = uS.split("|")
-                    self._vassign(uL)
-                    continue
-            if typeS == "table":
-                if uS[0:2] == "||":  # check for command
-                    uL = uS[2:].split("|")
-                    indxI = cmdL.index(uL[0].strip())
-                    methL[indxI](uL)
-                    continue
-                else:
-                    exec(uS)  # otherwise exec Python code
-                    continue
-            if uS[0:2] == "||":  # check for command
-                uL = uS[2:].split("|")
-                indxI = cmdL.index(uL[0].strip())
-                methL[indxI](uL)
-                continue
-
-            if typeS != "table":  # skip table print
-                print(uS)
-                self.calcS += uS.rstrip() + "\n"
-            self.rivtD.update(locals())
+            elif kindS == "equation" or kindS == "assign":
+                self.setcmdD["saveB"] = node.saveB
+                self._vassign(list(node.argL))
+            elif kindS == "command":
+                cmdD[node.cmdS](list(node.argL))
+            elif kindS == "code":
+                self.tscope.exec(node.codeS)  # otherwise exec Python code
+            else:
+                print(node.textS)
+                self.calcS += node.textS.rstrip() + "\n"
 
     def r_utf(self) -> str:
         """parse repository string
@@ -254,18 +340,8 @@ class OutputUTF:
              calcS (list): utf formatted calc-string (appended)
              setsectD (dict): section settings
         """
-        rcmdL = ["search", "keys", "info", "table", "text", "pdf"]
-        rmethL = [
-            self._rsearch,
-            self._rkeys,
-            self._rinfo,
-            self._itable,
-            self._itext,
-            self._rpdf,
-        ]
-        rtagL = ["[links]_", "[literal]_", "[foot]_", "[#]__"]
-
-        self._parseUTF("repository", rcmdL, rmethL, rtagL)
+
+        self._parseUTF("repository")
 
         return self.calcS, self.setsectD
 
@@ -308,26 +384,7 @@ class OutputUTF:
             setcmdD (dict): command settings
         """
 
-        icmdL = ["text", "table", "image"]
-        imethL = [self._itext, self._itable, self._iimage]
-        itagL = [
-            "[page]_",
-            "[line]_",
-            "[link]_",
-            "[literal]_",
-            "[foot]_",
-            "[latex]_",
-            "[s]_",
-            "[x]_",
-            "[r]_",
-            "[c]_",
-            "[e]_",
-            "[t]_",
-            "[f]_",
-            "[#]_",
-        ]
-
-        self._parseUTF("insert", icmdL, imethL, itagL)
+        self._parseUTF("insert")
 
         return self.calcS, self.setsectD, self.setcmdD
 
@@ -370,19 +427,6 @@ class OutputUTF:
             ipl (list): parameter list
         """
         alignD = {"S": "", "D": "decimal", "C": "center", "R": "right", "L": "left"}
-        itagL = [
-            "[page]_",
-            "[line]_",
-            "[link]_",
-            "[literal]_",
-            "[foot]_",
-            "[r]_",
-            "[c]_",
-            "[e]_",
-            "[t]_",
-            "[f]_",
-            "[#]_",
-        ]
         if len(iL) < 4:
             iL += [""] * (4 - len(iL))  # pad parameters
         utfS = ""
@@ -419,7 +463,7 @@ class OutputUTF:
                 incl_colL = eval(iL[3].strip())
                 totalL = [""] * len(incl_colL)
         ttitleS = readL[0][0].strip() + " [t]_"
-        utgS = self._tags(ttitleS, itagL)
+        utgS = self._tagtable(ttitleS)
         print(utgS.rstrip() + "\n")
         self.calcS += utgS.rstrip() + "\n\n"
         for row in readL[1:]:
@@ -432,20 +476,13 @@ class OutputUTF:
                 templist = [i.replace("""\\n""", """\n""") for i in templist]
                 wrowL.append("""\n""".join(templist))
             wcontentL.append(wrowL)
-        sys.stdout.flush()
-        old_stdout = sys.stdout
-        output = StringIO()
-        output.write(
-            tabulate(
-                wcontentL,
-                tablefmt="rst",
-                headers="firstrow",
-                numalign="decimal",
-                stralign=saS,
-            )
+        utfS = tabulate(
+            wcontentL,
+            tablefmt="rst",
+            headers="firstrow",
+            numalign="decimal",
+            stralign=saS,
         )
-        utfS = output.getvalue()
-        sys.stdout = old_stdout
 
         print(str(tfileS))
         print(utfS)
@@ -537,36 +574,10 @@ class OutputUTF:
             exportS (list): value strings for export
         """
 
-        locals().update(self.rivtD)
-        vcmdL = ["config", "value", "data", "func", "text", "table", "image"]
-        vmethL = [
-            self._vconfig,
-            self._vvalue,
-            self._vdata,
-            self._vfunc,
-            self._itext,
-            self._itable,
-            self._iimage,
-        ]
-        vtagL = [
-            "[page]_",
-            "[line]_",
-            "[link]_",
-            "[literal]_",
-            "[foot]_",
-            "[latex]_",
-            "[s]_",
-            "[x]_",
-            "[r]_",
-            "[c]_",
-            "[e]_",
-            "[t]_",
-            "[f]_",
-            "[#]_",
-        ]
-
-        self._parseUTF("values", vcmdL, vmethL, vtagL)
-        self.rivtD.update(locals())
+        self._parseUTF("values")
+        batchL = [r[1:] for r in self.evalL if r[0] == "batch"]
+        if batchL:
+            self._vbatch(batchL)
         return self.calcS, self.setsectD, self.setcmdD, self.rivtD, self.exportS
 
     def _vconfig(self, vL: list):
@@ -581,115 +592,234 @@ class OutputUTF:
         self.setcmdD["trmtI"] = vL[2].split(",")[1].strip()
 
     def _vassign(self, vL: list):
-        """assign values to variables and equations
+        """assign values to variables and equations, reusing unchanged results
+
+        Args:
+            vL (list): list of assignments
+        """
+
+        if self.graphO is None or self.overD:
+            self._veval(vL)
+            return
+        keyS = self.graphO.key(vL, self.setcmdD)
+        nodeD = self.graphO.lookup(keyS, self.rivtD)
+        if nodeD is not None:
+            self._vreuse(vL, nodeD)
+            return
+        varS = vL[0].split("=")[0].strip()
+        readL = self.graphO.reads(vL[0].split("=")[1].strip())
+        digestS = self.graphO.digest(readL, self.rivtD)
+        calcI, evalI, valI = self.calcS.mark(), len(self.evalL), len(self.valL)
+        termO = _rc_out.ListSink()
+        with redirect_stdout(_rc_out.Tee(termO, sys.stdout)):
+            self._veval(vL)
+        self.graphO.store(
+            keyS,
+            {
+                "varS": varS,
+                "readL": readL,
+                "digestS": digestS,
+                "termS": termO.getvalue(),
+                "calcS": self.calcS.since(calcI),
+                "evalL": self.evalL[evalI:],
+                "valL": self.valL[valI:],
+            },
+        )
+
+    def _vreuse(self, vL: list, nodeD: dict):
+        """write assignment result and output from a previous run
+
+        Args:
+            vL (list): list of assignments
+            nodeD (dict): graph node
+        """
+
+        rprecS = str(self.setcmdD["trmrI"])
+        self.formatO.set_precision(rprecS)
+        for evalL in nodeD["evalL"]:
+            self.rivtD[evalL[1]] = evalL[2]
+            if evalL[0] == "batch":
+                self.setcmdD["batchL"].append(evalL[1])
+        sys.stdout.write(nodeD["termS"])
+        self.calcS += nodeD["calcS"]
+        self.evalL.extend(nodeD["evalL"])
+        self.valL.extend(nodeD["valL"])
+        if self.setcmdD["saveB"] == True:
+            if len(vL) <= 2:
+                self.exportS += vL[0] + vL[1] + "  # equation" + "\n"
+            else:
+                self.exportS += vL[0] + vL[1] + vL[2] + "\n"
+        logging.debug("assignment reused: " + nodeD["varS"])
+
+    def _veval(self, vL: list):
+        """evaluate and render values and equations
 
         Args:
             vL (list): list of assignments
         """
-        locals().update(self.rivtD)
         rprecS = str(self.setcmdD["trmrI"])  # trim numbers
         tprecS = str(self.setcmdD["trmtI"])
         fltfmtS = "." + rprecS.strip() + "f"
-        exec("set_printoptions(precision=" + rprecS + ")")
-        exec("Unum.set_format(value_format = '%." + rprecS + "f')")
+        self.formatO.set_precision(rprecS)
         if len(vL) <= 2:  # equation
             unitL = vL[1].split(",")
             unit1S, unit2S = unitL[0].strip(), unitL[1].strip()
             varS = vL[0].split("=")[0].strip()
             valS = vL[0].split("=")[1].strip()
-            val1U = val2U = array(eval(valS))
+            subD = {}
+            if self.setcmdD["subB"]:  # values before assignment
+                subD = _rc_pretty.sub_values(
+                    valS, self.rivtD, self.formatO.formatter()
+                )
+            valV = self.scope.eval(valS)
+            if self._visbatch(valS, valV):  # one result per case
+                self.scope[varS] = valV
+                self.setcmdD["batchL"].append(varS)
+                utfS = _rc_pretty.pretty_eq(varS, valS, self.folderD["mpath"])
+                print("\n" + utfS + "\n")  # pretty print equation
+                self.calcS += "\n" + utfS + "\n"
+                self.evalL.append(["batch", varS, valV, unit1S])
+                if self.setcmdD["saveB"] == True:
+                    self.exportS += vL[0] + vL[1] + "  # equation" + "\n"
+                return
+            val1U = val2U = array(valV)
             if unit1S != "-":
-                if type(eval(valS)) == list:
-                    val1U = array(eval(valS)) * eval(unit1S)
-                    val2U = [q.cast_unit(eval(unit2S)) for q in val1U]
+                if type(valV) == list:
+                    val1U = array(valV) * self.scope.eval(unit1S)
+                    unit2U = self.scope.eval(unit2S)
+                    val2U = [q.cast_unit(unit2U) for q in val1U]
                 else:
-                    cmdS = varS + "= " + valS
-                    exec(cmdS, globals(), locals())
-                    valU = eval(varS).cast_unit(eval(unit1S))
+                    self.scope[varS] = valV  # evaluated above
+                    valU = valV.cast_unit(self.scope.eval(unit1S))
                     valdec = ("%." + str(rprecS) + "f") % valU.number()
-                    val1U = str(valdec) + " " + str(valU.unit())
-                    val2U = valU.cast_unit(eval(unit2S))
+                    val1U = str(valdec) + " " + self.formatO.unit(valU)
+                    val2U = valU.cast_unit(self.scope.eval(unit2S))
             else:
-                cmdS = varS + "= " + "unum.as_unum(" + valS + ")"
-                exec(cmdS, globals(), locals())
+                self.scope[varS] = unum.as_unum(valV)
                 # valU = eval(varS).cast_unit(eval(unit1S))
                 # valdec = ("%." + str(rprecS) + "f") % valU.number()
                 # val1U = str(valdec) + " " + str(valU.unit())
-                val1U = eval(varS)
+                val1U = self.scope.eval(varS)
                 val2U = val1U
-            utfS = vL[0]
-            spS = "Eq(" + varS + ",(" + valS + "))"
-            utfS = sp.pretty(sp.sympify(spS, _clash2, evaluate=False))
-            print("\n" + utfS + "\n")  # pretty print equation
-            self.calcS += "\n" + utfS + "\n"
-            eqS = sp.sympify(valS)
-            eqatom = eqS.atoms(sp.Symbol)
+            eqatom = [n for n in _rc_pretty.names(valS) if n in self.rivtD]
+            hdrL = []
+            valL = []
             if self.setcmdD["subB"]:  # substitute into equation
-                self._vsub(vL)
+                valL.append(self._vresult(val1U, val2U))
+                self._vsub(varS, valS, subD, valL[0])
             else:  # write equation table
-                hdrL = []
-                valL = []
+                utfS = _rc_pretty.pretty_eq(varS, valS, self.folderD["mpath"])
+                print("\n" + utfS + "\n")  # pretty print equation
+                self.calcS += "\n" + utfS + "\n"
                 hdrL.append(varS)
-                valL.append(str(val1U) + "  [" + str(val2U) + "]")
+                valL.append(self._vresult(val1U, val2U))
                 for sym in eqatom:
-                    hdrL.append(str(sym))
-                    symU = eval(str(sym))
-                    valL.append(str(symU.simplify_unit()))
+                    hdrL.append(sym)
+                    symU = self.rivtD[sym]
+                    if isinstance(symU, Unum):
+                        symU = symU.simplify_unit()
+                    valL.append(self.formatO.format(symU))
                 alignL = ["center"] * len(valL)
                 self._vtable([valL], hdrL, "rst", alignL)
+            resultU = self.rivtD.get(varS, val1U)
+            self.evalL.append(["equation", varS, resultU, [hdrL, valL, subD]])
             if self.setcmdD["saveB"] == True:
                 pyS = vL[0] + vL[1] + "  # equation" + "\n"
                 # print(pyS)
                 self.exportS += pyS
-            locals().update(self.rivtD)
+        elif len(vL) >= 4 and vL[3].strip() == "batch":  # one value per case
+            unitL = vL[1].split(",")
+            unit1S = unitL[0].strip()
+            varS = vL[0].split("=")[0].strip()
+            valS = vL[0].split("=")[1].strip()
+            valS = self.overD.get(varS, valS)  # input from a sweep case
+            valA = asarray(self.scope.eval(valS), dtype=float).ravel()
+            if unit1S != "-":
+                valA = self.scope.eval(unit1S) * valA
+            self.scope[varS] = valA
+            self.setcmdD["batchL"].append(varS)
+            self.evalL.append(["batch", varS, valA, unit1S])
+            if self.setcmdD["saveB"] == True:
+                self.exportS += vL[0] + vL[1] + vL[2] + "\n"
         elif len(vL) >= 3:  # value
             descripS = vL[2].strip()
             unitL = vL[1].split(",")
             unit1S, unit2S = unitL[0].strip(), unitL[1].strip()
             varS = vL[0].split("=")[0].strip()
             valS = vL[0].split("=")[1].strip()
-            val1U = val2U = array(eval(valS))
+            valS = self.overD.get(varS, valS)  # input from a sweep case
+            valV = self.scope.eval(valS)
+            val1U = val2U = array(valV)
             if unit1S != "-":
-                if type(eval(valS)) == list:
-                    val1U = array(eval(valS)) * eval(unit1S)
-                    val2U = [q.cast_unit(eval(unit2S)) for q in val1U]
+                if type(valV) == list:
+                    val1U = array(valV) * self.scope.eval(unit1S)
+                    unit2U = self.scope.eval(unit2S)
+                    val2U = [q.cast_unit(unit2U) for q in val1U]
                 else:
                     cmdS = varS + "= " + valS + "*" + unit1S
-                    exec(cmdS, globals(), locals())
-                    valU = eval(varS)
-                    val1U = str(valU.number()) + " " + str(valU.unit())
-                    val2U = valU.cast_unit(eval(unit2S))
+                    self.scope.exec(cmdS)
+                    valU = self.scope.eval(varS)
+                    val1U = str(valU.number()) + " " + self.formatO.unit(valU)
+                    val2U = valU.cast_unit(self.scope.eval(unit2S))
             else:
-                cmdS = varS + "= " + "unum.as_unum(" + valS + ")"
-                exec(cmdS, globals(), locals())
-                valU = eval(varS)
+                cmdS = varS + "= " + "as_unum(" + valS + ")"
+                self.scope.exec(cmdS)
+                valU = self.scope.eval(varS)
                 # val1U = str(valU.number()) + " " + str(valU.unit())
                 val2U = valU
             self.valL.append([varS, val1U, val2U, descripS])
+            resultU = self.rivtD.get(varS, val1U)
+            self.evalL.append(["value", varS, resultU, self.valL[-1]])
             if self.setcmdD["saveB"] == True:
                 pyS = vL[0] + vL[1] + vL[2] + "\n"
                 # print(pyS)
                 self.exportS += pyS
-        self.rivtD.update(locals())
 
-    def _vtable(self, tbl, hdrL, tblfmt, alignL):
+    def _visbatch(self, valS: str, valV) -> bool:
+        """return True if equation reads batch values and gives one result per case"""
+
+        if set(_rc_pretty.names(valS)).isdisjoint(self.setcmdD["batchL"]):
+            return False
+        return _rc_eval.is_batch(valV)
+
+    def _vbatch(self, batchL: list):
+        """write one table of batch values and results, one row for each case
+
+        Args:
+            batchL (list): name, value and unit expression of each column
+        """
+
+        hdrL, colL = ["case"], []
+        for varS, valO, unitS in batchL:
+            if isinstance(valO, Unum) and unitS != "-":
+                unitU = self.scope.eval(unitS)
+                valO = valO.cast_unit(unitU)  # one unit check per column
+                varS += " [" + self.formatO.unit(unitU) + "]"
+            hdrL.append(varS)
+            colL.append(valO)
+        alignL = ["right"] * len(hdrL)
+        fltfmtS = "." + str(self.formatO.precI) + "f"
+        self._vtable(self.formatO.columns(colL), hdrL, "rst", alignL, fltfmtS)
+
+    def _vresult(self, val1U, val2U) -> str:
+        """return equation result and converted result"""
+
+        return self.formatO.format(val1U) + "  [" + self.formatO.format(val2U) + "]"
+
+    def _vtable(self, tbl, hdrL, tblfmt, alignL, fltfmtS="g"):
         """write value table"""
 
-        locals().update(self.rivtD)
-        sys.stdout.flush()
-        old_stdout = sys.stdout
-        output = StringIO()
-        output.write(
-            tabulate(
-                tbl, tablefmt=tblfmt, headers=hdrL, showindex=False, colalign=alignL
-            )
+        tbl = [[self.formatO.cell(c) for c in rowL] for rowL in tbl]
+        utfS = tabulate(
+            tbl,
+            tablefmt=tblfmt,
+            headers=hdrL,
+            showindex=False,
+            colalign=alignL,
+            floatfmt=fltfmtS,
         )
-        utfS = output.getvalue()
-        sys.stdout = old_stdout
-        sys.stdout.flush()
         print(utfS)
         self.calcS += utfS + "\n"
-        self.rivtD.update(locals())
 
     def _vvalue(self, vL: list):
         """import values from files
@@ -698,7 +828,6 @@ class OutputUTF:
             vL (list): value command arguments
         """
 
-        locals().update(self.rivtD)
         valL = []
         if len(vL) < 5:
             vL += [""] * (5 - len(vL))  # pad command
@@ -716,22 +845,23 @@ class OutputUTF:
             if not len(varS):
                 valL.append(["---------", " ", " ", " "])  # totals
                 continue
-            val1U = val2U = array(eval(valS))
+            valV = self.scope.eval(valS)
+            val1U = val2U = array(valV)
             if unit1S != "-":
-                if type(eval(valS)) == list:
-                    val1U = array(eval(valS)) * eval(unit1S)
-                    val2U = [q.cast_unit(eval(unit2S)) for q in val1U]
+                if type(valV) == list:
+                    val1U = array(valV) * self.scope.eval(unit1S)
+                    unit2U = self.scope.eval(unit2S)
+                    val2U = [q.cast_unit(unit2U) for q in val1U]
                 else:
                     cmdS = varS + "= " + valS + "*" + unit1S
-                    exec(cmdS, globals(), locals())
-                    valU = eval(varS)
-                    val1U = str(valU.number()) + " " + str(valU.unit())
-                    val2U = valU.cast_unit(eval(unit2S))
+                    self.scope.exec(cmdS)
+                    valU = self.scope.eval(varS)
+                    val1U = str(valU.number()) + " " + self.formatO.unit(valU)
+                    val2U = valU.cast_unit(self.scope.eval(unit2S))
             valL.append([varS, val1U, val2U, descripS])
         hdrL = ["variable", "value", "[value]", "description"]
         alignL = ["left", "right", "right", "left"]
         self._vtable(valL, hdrL, "rst", alignL)
-        self.rivtD.update(locals())
 
     def _vdata(self, vL: list):
         """import data from files
@@ -740,13 +870,12 @@ class OutputUTF:
             vL (list): data command arguments
         """
 
-        locals().update(self.rivtD)
         valL = []
         if len(vL) < 5:
             vL += [""] * (5 - len(vL))  # pad command
         valL.append(["variable", "values"])
         vfileS = Path(self.folderD["cpath"] / vL[2].strip())
-        vecL = eval(vL[3].strip())
+        vecL = self.scope.eval(vL[3].strip())
         with open(vfileS, "r") as csvF:
             reader = csv.reader(csvF)
         vL = list(reader)
@@ -754,85 +883,42 @@ class OutputUTF:
             varS = i[0]
             varL = array(i[1:])
             cmdS = varS + "=" + str(varL)
-            exec(cmdS, globals(), locals())
+            self.scope.exec(cmdS)
             if len(varL) > 4:
                 varL = str((varL[:2]).append(["..."]))
             valL.append([varS, varL])
         hdrL = ["variable", "values"]
         alignL = ["left", "right"]
         self._vtable(valL, hdrL, "rst", alignL)
-        self.rivtD.update(locals())
 
-    def _vsub(self, eqL: list, eqS: str):
-        """substitute numbers for variables in printed output
+    def _vsub(self, varS: str, valS: str, subD: dict, resultS: str):
+        """print equation and equation with values substituted
 
         Args:
-            epL (list): equation and units
-            epS (str): [description]
+            varS (str): assigned name
+            valS (str): expression
+            subD (dict): value text for names in the expression
+            resultS (str): formatted result
         """
 
-        locals().update(self.rivtd)
-
-        eformat = ""
-        utfS = eqL[0].strip()
-        descripS = eqL[3]
-        parD = dict(eqL[1])
-        varS = utfS.split("=")
-        resultS = vars[0].strip() + " = " + str(eval(vars[1]))
-        try:
-            eqS = "Eq(" + eqL[0] + ",(" + eqL[1] + "))"
-            # sps = sps.encode('unicode-escape').decode()
-            utfs = sp.pretty(sp.sympify(eqS, _clash2, evaluate=False))
-            print(utfs)
-            self.calcl.append(utfs)
-        except:
-            print(utfs)
-            self.calcl.append(utfs)
-        try:
-            symeq = sp.sympify(eqS.strip())  # substitute
-            symat = symeq.atoms(sp.Symbol)
-            for _n2 in symat:
-                evlen = len((eval(_n2.__str__())).__str__())  # get var length
-                new_var = str(_n2).rjust(evlen, "~")
-                new_var = new_var.replace("_", "|")
-                symeq1 = symeq.subs(_n2, sp.Symbols(new_var))
-            out2 = sp.pretty(symeq1, wrap_line=False)
-            # print('out2a\n', out2)
-            symat1 = symeq1.atoms(sp.Symbol)  # adjust character length
-            for _n1 in symat1:
-                orig_var = str(_n1).replace("~", "")
-                orig_var = orig_var.replace("|", "_")
-                try:
-                    expr = eval((self.odict[orig_var][1]).split("=")[1])
-                    if type(expr) == float:
-                        form = "{:." + eformat + "f}"
-                        symeval1 = form.format(eval(str(expr)))
-                    else:
-                        symeval1 = eval(orig_var.__str__()).__str__()
-                except:
-                    symeval1 = eval(orig_var.__str__()).__str__()
-                out2 = out2.replace(_n1.__str__(), symeval1)
-            # print('out2b\n', out2)
-            out3 = out2  # clean up unicode
-            out3.replace("*", "\\u22C5")
-            # print('out3a\n', out3)
-            _cnt = 0
-            for _m in out3:
-                if _m == "-":
-                    _cnt += 1
-                    continue
-                else:
-                    if _cnt > 1:
-                        out3 = out3.replace("-" * _cnt, "\u2014" * _cnt)
-                    _cnt = 0
-            # print('out3b \n', out3)
-            self._write_text(out3, 1, 0)  # print substituted form
-            self._write_text(" ", 0, 0)
-        except:
-            pass
+        symS, subS = _rc_pretty.pretty_sub(varS, valS, subD.get, resultS)
+        utfS = "\n" + symS + "\n\n" + subS + "\n"
+        print(utfS)
+        self.calcS += utfS
 
     def _vfunc(self, vL: list):
-        pass
+        """assign function from a script file
+
+        Args:
+            vL (list): func command arguments - file, name and optional memo
+        """
+
+        funcO = _rc_func.script_func(vL, self.folderD)
+        self.rivtD[funcO.nameS] = funcO
+        memoS = "  [memo]" if funcO.memoS else ""
+        utfS = str(funcO.fileS) + "\n" + funcO.signature() + memoS + "\n"
+        print(utfS)
+        self.calcS += utfS + "\n"
 
     def t_utf(self) -> tuple:
         """parse table-strings
@@ -844,25 +930,6 @@ class OutputUTF:
             rivtD (list): calculation values
         """
 
-        tcmdL = ["text", "table", "image", "latex"]
-        tmethL = [self._itext, self._itable, self._iimage, self.ilatex]
-        ttagL = [
-            "[page]_",
-            "[line]_",
-            "[link]_",
-            "[literal]_",
-            "[foot]_",
-            "[latex]_",
-            "[s]",
-            "[x]",
-            "[r]_",
-            "[c]_",
-            "[e]_",
-            "[t]_",
-            "[f]_",
-            "[#]_",
-        ]
-
-        self._parseUTF("table", tcmdL, tmethL, ttagL)
+        self._parseUTF("table")
 
         return self.calcS, self.setsectD, self.setcmdD, self.rivtD
\ No newline at end of file
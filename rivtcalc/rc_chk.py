@@ -1,87 +1,345 @@
-#!
+#! python
+"""checks calc files without running them
+
+    python -m rivtcalc check [calc.py | project folder] [--workers=4]
+
+Rivt-strings are read from the calc file with the ast module and compiled to
+node lists. Command names and arguments are checked against the commands
+registered in rc_reg for each string type, files named in commands are
+looked up in the calcs and docs folders, unit names in assignments are
+checked against the units defined in rc_unit, tags against the registered
+tags and table statements for imports and names not allowed in calcs.
+Problems are printed as file:line: message. A project folder is checked in
+a pool of worker processes, one calc file per task."""
 
 import os
-import datetime
+import re
+import ast
+import sys
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import rivtcalc.rc_ir as _rc_ir
+import rivtcalc.rc_reg as _rc_reg
+import rivtcalc.rc_eval as _rc_eval
+
+_calcrgx = re.compile(r"^[a-z]\d{4}_.*\.py$")  # calc file name
+_sectrgx = re.compile(r"\[\d\d\]")  # section number
+_unitS = None  # unit names, read on first use
+
+
+def _units() -> set:
+    """return names of units defined in rc_unit"""
 
-__version__ = "0.9.0"
-__author__ = 'rholland'
+    global _unitS
+    if _unitS is None:
+        import rivtcalc.rc_unit as _rc_unit
 
+        _unitS = {
+            n
+            for n, v in vars(_rc_unit).items()
+            if isinstance(v, _rc_unit.Unum)
+            and all(s in _rc_unit.UNIT_TABLE for s in v._unit)
+        }
+    return _unitS
+
+
+def calc_strings(calcS: str) -> list:
+    """return rivt-strings in calc source
+
+    Args:
+        calcS (str): calc file source
 
-class Checkrivt:
-    """check rivt syntax and log
-    
-    Arguments:
-        logname {[type]} -- [description]
-    
     Returns:
-        [type] -- [description]
+        list: [string type, line number, rivt-string] in source order
     """
 
-    def __init__(self, logname):
-        
-        self.logname = logname
+    strL = []
+    for node in ast.walk(ast.parse(calcS)):
+        if not isinstance(node, ast.Call) or not node.args:
+            continue
+        funcO = node.func
+        nameS = getattr(funcO, "attr", getattr(funcO, "id", ""))
+        argO = node.args[0]
+        if nameS in _rc_reg.TYPE_D or nameS == "S":
+            if isinstance(argO, ast.Constant) and isinstance(argO.value, str):
+                strL.append([nameS, argO.lineno, argO.value])
+    return sorted(strL, key=lambda s: s[1])
 
-    def logstart(self):
-        """delete log file and initialize new file
 
+class CalcCheck:
+    """check rivt-strings in a calc file"""
+
+    def __init__(self, calcfileS: str):
+        """
+        Args:
+            calcfileS (str): calc file path
         """
-        try: os.remove(self.logname)
-        except: pass
-        with open(self.logname, 'w') as lg:
-            lg.write("< start log: " + str(datetime.datetime.now()) + "  >\n")
-        return self.logname
 
-    def logwrite(self, logstrg, flg=0):
-        """write processes to log file, option echo to terminal
+        self.cfull = Path(calcfileS)
+        self.cnameS = self.cfull.name.split(".py")[0]
+        ppath = self.cfull.resolve().parent.parent.parent
+        cpath = Path(ppath, "calcs")
+        dpath = Path(ppath, "docs")
+        self.folderD = {
+            "calc": Path(cpath, "c" + self.cnameS[1:5]),
+            "table": Path(cpath, self.cnameS[0:5]),
+            "data": cpath,
+            "scripts": Path(cpath, "scripts"),
+            "doc": Path(dpath, "d" + self.cnameS[1:5]),
+            "d0000": Path(dpath, "d0000"),
+        }
+        self.probL = []  # [line number, message]
 
-        """
-        #print('log', logstrg)
-        with open(self.logname, 'a') as lg:
-            logstrg += '\n'
-            lg.write(logstrg)
-        if flg:
-            print(logstrg)
+    def _problem(self, lineI: int, msgS: str):
+        self.probL.append([lineI, msgS])
 
-    def logclose(self):
-        """close log file
+    def check(self) -> list:
+        """return problems found in the calc file
 
+        Returns:
+            list: problem strings as file:line: message
         """
+
         try:
-            with open(self.logname, 'a') as lg:
-                lg.write("\n< close log: "  + str(datetime.datetime.now()) + " >")
-        except IOError:
-            print('error: problem closing log file')
+            calcS = self.cfull.read_text(encoding="utf-8")
+            strL = calc_strings(calcS)
+        except (OSError, UnicodeDecodeError) as error:
+            return [str(self.cfull) + ":0: " + str(error)]
+        except SyntaxError as error:
+            return ["%s:%s: %s" % (self.cfull, error.lineno, error.msg)]
+        for typeS, lineI, rawS in strL:
+            if typeS != "S":
+                self._string(typeS, lineI, rawS)
+        return [
+            "%s:%d: %s" % (self.cfull, lineI, msgS)
+            for lineI, msgS in sorted(self.probL, key=lambda p: p[0])
+        ]
 
+    def _string(self, typeS: str, lineI: int, rawS: str):
+        """check one rivt-string"""
 
-    def filesummary():
-        """file name summary table
+        strtypeS = _rc_reg.TYPE_D[typeS]
+        cmdL = set(_rc_reg.commands("utf", strtypeS))
+        tagL = set(_rc_reg.tags("utf", strtypeS)) | set(_rc_reg.tags("rst", strtypeS))
+        sectS, _, strS = rawS.partition("\n")
+        if not _sectrgx.search(sectS):
+            self._problem(lineI, "section heading without [dd]_ number")
+        uL = strS.split("\n")
+        lineL = [  # line number of each node, skipping comments as compiled
+            lineI + 1 + i
+            for i, uS in enumerate(uL)
+            if uS[0:2] != "##" and uS[4:5] != "#"
+        ]
+        for lineI, node in zip(lineL, _rc_ir.compile_str(uL, strtypeS)):
+            kindS = node.kindS
+            if kindS == "tag":
+                self._tags(lineI, node.textS, tagL)
+            elif kindS == "command":
+                self._command(lineI, node, strtypeS, cmdL)
+            elif kindS in ("assign", "equation"):
+                self._assign(lineI, node)
+            elif kindS == "code":
+                if self._syntax(lineI, node.codeS.strip(), "exec"):
+                    self._names(lineI, node.codeS.strip())
 
-        """
-        filesum1 = ("Path Summary\n"
-                    "============================"
-                    "\nproject path :\n    {}\n"    
-                    "\ndesign file :\n    {}\n"
-                    "\nlog file :\n    {}"
-                    "\ncalc path :\n    {}").format(cfg.ppath.strip(), 
-                                            cfg.dfile, cfg.tlog, cfg.cpath) 
+    def _tags(self, lineI: int, textS: str, tagL: list):
+        """check tags in a line"""
+
+        wordL = textS.split()
+        for tagS in _rc_ir._tagrgx.findall(textS):
+            tagS = "[" + tagS + "]_"
+            if tagS not in tagL:
+                self._problem(lineI, "unknown tag " + tagS)
+            elif tagS not in wordL:
+                self._problem(lineI, "tag " + tagS + " not separated by spaces")
+
+    def _command(self, lineI: int, node, strtypeS: str, cmdL: set):
+        """check command name, arguments and files"""
+
+        cmdS, argL = node.cmdS, [a.strip() for a in node.argL]
+        if cmdS not in cmdL:
+            self._problem(lineI, "unknown command '%s'" % cmdS)
+            return
+        argsI = _rc_reg.arguments(strtypeS, cmdS)
+        if len(argL) - 1 < argsI:
+            self._problem(
+                lineI,
+                "%s command needs %d arguments, has %d" % (cmdS, argsI, len(argL) - 1),
+            )
+            return
+        argL += [""] * (4 - len(argL))
+        if cmdS in ("text", "value"):
+            self._files(lineI, argL[1], ["calc"])
+        elif cmdS == "table":
+            self._table(lineI, argL)
+        elif cmdS == "info" and argL[1]:
+            self._files(lineI, argL[1], ["d0000"])
+        elif cmdS == "image":
+            self._image(lineI, argL)
+        elif cmdS == "data":
+            self._files(lineI, argL[2], ["data"])
+            self._syntax(lineI, argL[3], "eval")
+        elif cmdS == "func":
+            self._files(lineI, argL[1], ["scripts"])
+            if argL[3] not in ("", "memo"):
+                self._problem(lineI, "func option '%s' not memo" % argL[3])
+        elif cmdS == "config":
+            if argL[1] not in ("sub", "nosub"):
+                self._problem(lineI, "config mode '%s' not sub or nosub" % argL[1])
+            if not re.fullmatch(r"\s*\d+\s*,\s*\d+\s*", argL[2]):
+                self._problem(lineI, "config precision '%s' not int,int" % argL[2])
+
+    def _files(self, lineI: int, fileS: str, folderL: list):
+        """check that files exist in one of the folders"""
+
+        for fS in fileS.split(","):
+            fS = fS.strip()
+            pathL = [Path(self.folderD[folderS], fS) for folderS in folderL]
+            if not fS or not any(p.is_file() for p in pathL):
+                self._problem(
+                    lineI, "file not found: " + " or ".join(str(p) for p in pathL)
+                )
+
+    def _table(self, lineI: int, argL: list):
+        """check table file, width, alignment and columns"""
+
+        if argL[1].split(".")[-1] not in ("csv", "xlsx"):
+            self._problem(lineI, "table file not csv or xlsx: " + argL[1])
+            return
+        self._files(lineI, argL[1], ["table"])
+        if argL[2]:
+            fmtL = [f.strip() for f in argL[2].split(",")]
+            if len(fmtL) != 2 or not fmtL[0].isdigit() or fmtL[1] not in "SDCRL":
+                self._problem(lineI, "table format '%s' not width,S|D|C|R|L" % argL[2])
+        if argL[3] and argL[3] != "[:]":
+            try:
+                colL = ast.literal_eval(argL[3])
+                assert isinstance(colL, list) and all(type(c) is int for c in colL)
+            except (ValueError, SyntaxError, AssertionError):
+                self._problem(lineI, "table columns '%s' not [:] or list" % argL[3])
+
+    def _image(self, lineI: int, argL: list):
+        """check image files and scales"""
+
+        self._files(lineI, argL[1], ["doc"])
+        fileI = len(argL[1].split(","))
+        scaleL = argL[2].split(",")
+        try:
+            [float(s) for s in scaleL]
+        except ValueError:
+            self._problem(lineI, "image scale '%s' not a number" % argL[2])
+            return
+        if len(scaleL) < fileI:
+            self._problem(lineI, "image needs a scale for each file")
 
+    def _assign(self, lineI: int, node):
+        """check expression syntax and unit names of an assignment"""
 
-class CheckDesign:
-    """[summary]
+        self._syntax(lineI, node.varS + " = " + node.exprS, "exec")
+        if len(node.argL) < 2:
+            return
+        for unitS in node.argL[1].split(","):
+            unitS = unitS.strip()
+            if unitS in ("-", ""):
+                continue
+            try:
+                exprO = ast.parse(unitS, mode="eval")
+            except SyntaxError:
+                self._problem(lineI, "unit syntax: " + unitS)
+                continue
+            for nameO in ast.walk(exprO):
+                if isinstance(nameO, ast.Name) and nameO.id not in _units():
+                    self._problem(lineI, "unknown unit '%s'" % nameO.id)
+
+    def _syntax(self, lineI: int, codeS: str, modeS: str) -> bool:
+        """check Python syntax of a statement or expression"""
+
+        try:
+            compile(codeS, "<rivt>", modeS)
+        except SyntaxError as error:
+            self._problem(lineI, "syntax: %s: %s" % (error.msg, codeS))
+            return False
+        return True
+
+    def _names(self, lineI: int, codeS: str):
+        """check a table statement for imports and dunder names"""
+
+        try:
+            _rc_eval.read_names(codeS, "exec")
+        except _rc_eval.CalcNameError as error:
+            self._problem(lineI, str(error))
+
+
+def check_calc(calcfileS: str) -> list:
+    """return problems found in a calc file
+
+    Args:
+        calcfileS (str): calc file path
+
+    Returns:
+        list: problem strings as file:line: message
     """
-    
-    
-    def varsummary():
-        """variable summary table
-        
-        """
-        
-        print("Variable Summary")
-        print("================")
-        print(cfg.varevaled)
 
+    return CalcCheck(calcfileS).check()
 
 
+def calc_files(pathS: str) -> list:
+    """return calc files in a project or calcs folder, or the given file"""
 
+    pathP = Path(pathS)
+    if pathP.is_file():
+        return [pathP]
+    if Path(pathP, "calcs").is_dir():
+        pathP = Path(pathP, "calcs")
+    return sorted(p for p in pathP.glob("*/*.py") if _calcrgx.match(p.name))
+
+
+def check(pathS: str, workersI: int = None) -> list:
+    """check calc files and print problems
+
+    Args:
+        pathS (str): calc file, project folder or calcs folder
+        workersI (int): worker processes, defaults to the cpu count
+
+    Returns:
+        list: problem strings as file:line: message
+    """
+
+    startF = time.perf_counter()
+    fileL = [str(p) for p in calc_files(pathS)]
+    workersI = max(1, min(workersI or os.cpu_count() or 1, len(fileL)))
+    probL = []
+    if workersI == 1:
+        for fileS in fileL:
+            probL.extend(check_calc(fileS))
+    else:
+        with ProcessPoolExecutor(max_workers=workersI) as pool:
+            for fileprobL in pool.map(check_calc, fileL):
+                probL.extend(fileprobL)
+    for probS in probL:
+        print(probS)
+    print(
+        "INFO  check: %d calcs, %d problems, %.2f s"
+        % (len(fileL), len(probL), time.perf_counter() - startF),
+        flush=True,
+    )
+    return probL
+
+
+def main(argL: list):
+    """run check from command line arguments
+
+    Args:
+        argL (list): arguments after 'check'
+    """
 
-    pass
+    pathL = [a for a in argL if not a.startswith("--")]
+    optD = dict(a[2:].split("=", 1) for a in argL if a.startswith("--") and "=" in a)
+    if len(pathL) > 1:
+        print("usage: python -m rivtcalc check [calc.py | folder] [--workers=n]")
+        sys.exit(1)
+    workersI = int(optD["workers"]) if "workers" in optD else None
+    probL = check(pathL[0] if pathL else os.getcwd(), workersI)
+    sys.exit(1 if probL else 0)
@@ -0,0 +1,635 @@
+#! python
+"""evaluates calc expressions from cached code objects
+
+Expression, assignment and unit strings in value-strings are compiled once to
+code objects and kept for the rest of the run. The UTF and reST backends share
+the cache, so the reST pass does not compile strings again. A CalcScope runs
+the code objects against the calc values dictionary. Expressions are compiled
+to functions of the calc values they read, so an equation can be evaluated
+again, or with arrays, by calling the function. If enabled with --numexpr,
+expressions over large numeric arrays are evaluated with numexpr, using
+several threads and no temporary arrays, and with numpy otherwise. A
+FormatContext formats values for tables at the precision set by the ||config
+command.
+
+Expressions may read calc values, units, numpy functions, some numpy.linalg
+functions as la and a few builtins. Modules and numpy functions that read or
+write files are not included. Table statements may also use the modules
+table-strings have always provided - numpy, pandas, sympy, matplotlib.pyplot
+and matplotlib.image as np, pd, sp, plt and mpimg, and numpy.linalg as la.
+Names are checked with the ast module when a string is first compiled.
+Unknown names, imports, global statements, dunder names and array file
+methods raise a CalcNameError before any code is run. This limits the names
+a calc can use. It does not isolate the process, and methods of allowed
+values and modules can still be called."""
+
+import ast
+import types
+import logging
+import builtins
+import numpy as np
+from numpy import array2string, asarray, broadcast_arrays, char, ndarray
+import rivtcalc.rc_lazy as _rc_lazy
+from rivtcalc.rc_unit import Formatter, Unum
+
+_numexpr = _rc_lazy.lazy_module("numexpr")
+_numexprB = True  # False once numexpr failed to import
+
+NUMEXPR_MIN = 2 ** 12  # smallest array evaluated with numexpr
+_codeD = {}  # (source, mode) -> code object
+_nameD = {}  # expression -> names read
+_funcD = {}  # (expression, arguments, namespace id) -> function
+_assignD = {}  # statement -> (name, expression) of a simple assignment or None
+_nestedD = {}  # statement -> True if it has a nested scope
+_nesyntaxD = {}  # expression -> reason numexpr can not evaluate it, or ""
+_pathD = {}  # array expression -> 'numexpr' or 'numpy (reason)'
+_nefuncS = frozenset(
+    "sin cos tan arcsin arccos arctan arctan2 sinh cosh tanh arcsinh arccosh "
+    "arctanh log log10 log1p exp expm1 sqrt abs where real imag conj".split()
+)
+_neopT = (
+    ast.Expression, ast.Load, ast.Name, ast.Constant, ast.Call,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod,
+    ast.UnaryOp, ast.USub, ast.UAdd, ast.Invert, ast.BitAnd, ast.BitOr,
+    ast.Compare, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq,
+)  # ast nodes numexpr evaluates
+_fallback = object()  # numexpr not used
+_scopeT = (
+    ast.Lambda, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef,
+    ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp,
+)  # ast nodes with their own scope
+_namespaceD = {}  # backend module name -> calc namespace
+_readD = {}  # (source, mode) -> names read and not bound in the source
+_unitfuncS = frozenset("Unum as_unum as_number uarray".split())
+_numpyioS = frozenset(
+    "load save savez savez_compressed loadtxt savetxt genfromtxt fromfile "
+    "fromregex memmap DataSource info test".split()
+)  # numpy functions that read or write files or run tests
+_lafuncS = frozenset(
+    "cholesky det eig eigh eigvals eigvalsh inv lstsq matrix_power "
+    "matrix_rank norm pinv qr solve svd".split()
+)  # numpy.linalg functions available as la
+_attrS = frozenset("tofile dump dumps".split())  # array methods that write
+_tablemodD = {
+    "np": "numpy",
+    "la": "numpy.linalg",
+    "pd": "pandas",
+    "sp": "sympy",
+    "plt": "matplotlib.pyplot",
+    "mpimg": "matplotlib.image",
+}  # modules of table statements, imported on first use
+_builtinS = frozenset(
+    "abs all any bool complex dict divmod enumerate filter float format "
+    "frozenset int isinstance len list map max min pow print range repr "
+    "reversed round set slice sorted str sum tuple zip".split()
+)
+
+
+class CalcNameError(NameError):
+    """name or statement not allowed in a calc expression or table statement"""
+
+
+def calc_namespace(moduleD: dict) -> dict:
+    """return calc namespace built from a backend module namespace
+
+    The namespace holds the numpy functions and unit names imported by the
+    backend, a namespace of numpy.linalg functions as la and a restricted
+    set of builtins. Modules are not included.
+    It is built once per backend module, so compiled functions that are
+    cached by namespace are shared by all rivt-strings.
+
+    Args:
+        moduleD (dict): backend module globals
+
+    Returns:
+        dict: calc namespace
+    """
+
+    keyS = moduleD.get("__name__", "")
+    baseD = _namespaceD.get(keyS)
+    if baseD is None:
+        numpyS = frozenset(np.__all__) - _numpyioS
+        baseD = {
+            "__builtins__": {n: getattr(builtins, n) for n in _builtinS},
+            "__name__": "__rivt__",
+            "la": types.SimpleNamespace(
+                **{n: getattr(np.linalg, n) for n in sorted(_lafuncS)}
+            ),
+        }
+        for nameS, valO in moduleD.items():
+            if isinstance(valO, types.ModuleType):
+                continue
+            if nameS in numpyS or nameS in _unitfuncS or isinstance(valO, Unum):
+                baseD[nameS] = valO
+        _namespaceD[keyS] = baseD
+    return baseD
+
+
+def table_namespace(moduleD: dict) -> dict:
+    """return namespace of table statements built from a backend module namespace
+
+    The namespace is the calc namespace with the plotting and table modules
+    of _tablemodD added. numpy.linalg replaces the la functions.
+
+    Args:
+        moduleD (dict): backend module globals
+
+    Returns:
+        dict: table namespace
+    """
+
+    keyS = moduleD.get("__name__", "") + ":table"
+    baseD = _namespaceD.get(keyS)
+    if baseD is None:
+        baseD = dict(calc_namespace(moduleD))
+        for nameS, modS in _tablemodD.items():
+            baseD[nameS] = _rc_lazy.lazy_module(modS)
+        _namespaceD[keyS] = baseD
+    return baseD
+
+
+def read_names(srcS: str, modeS: str = "eval") -> tuple:
+    """return names read by source and not bound in it
+
+    Comprehension and loop variables and lambda arguments bound in the
+    source are not returned.
+
+    Args:
+        srcS (str): Python expression or statement
+        modeS (str): parse mode - 'eval' or 'exec'
+
+    Returns:
+        tuple: names in source order
+
+    Raises:
+        CalcNameError: source imports, declares globals, uses dunder names
+            or calls array file methods
+    """
+
+    keyT = (srcS, modeS)
+    nameT = _readD.get(keyT)
+    if nameT is None:
+        readL, boundS = [], set()
+        for node in ast.walk(ast.parse(srcS, mode=modeS)):
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                raise CalcNameError("import not allowed: " + srcS.strip())
+            if isinstance(node, (ast.Global, ast.Nonlocal)):
+                raise CalcNameError("global not allowed: " + srcS.strip())
+            nameS = getattr(node, "id", getattr(node, "attr", None))
+            if isinstance(node, ast.arg):
+                nameS = node.arg
+                boundS.add(nameS)
+            if isinstance(node, ast.Attribute) and nameS in _attrS:
+                raise CalcNameError(
+                    "method '%s' not allowed: %s" % (nameS, srcS.strip())
+                )
+            if isinstance(nameS, str) and nameS.startswith("__"):
+                raise CalcNameError(
+                    "name '%s' not allowed: %s" % (nameS, srcS.strip())
+                )
+            if isinstance(node, (ast.comprehension, ast.For, ast.NamedExpr)):
+                boundS.update(
+                    n.id for n in ast.walk(node.target) if isinstance(n, ast.Name)
+                )
+            elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+                if node.id not in readL:
+                    readL.append(node.id)
+        nameT = tuple(n for n in readL if n not in boundS)
+        _readD[keyT] = nameT
+    return nameT
+
+
+def compiled(srcS: str, modeS: str = "eval"):
+    """return cached code object for source string
+
+    Args:
+        srcS (str): Python expression or statement
+        modeS (str): compile mode - 'eval' or 'exec'
+
+    Returns:
+        code: code object
+    """
+
+    keyT = (srcS, modeS)
+    codeO = _codeD.get(keyT)
+    if codeO is None:
+        codeO = compile(srcS, "<rivt>", modeS)
+        _codeD[keyT] = codeO
+    return codeO
+
+
+def free_names(exprS: str) -> tuple:
+    """return names read by an expression, in source order
+
+    Args:
+        exprS (str): Python expression
+
+    Returns:
+        tuple: names
+    """
+
+    nameT = _nameD.get(exprS)
+    if nameT is None:
+        nameL = []
+        for node in ast.walk(ast.parse(exprS, mode="eval")):
+            if isinstance(node, ast.Name) and node.id not in nameL:
+                nameL.append(node.id)
+        nameT = tuple(nameL)
+        _nameD[exprS] = nameT
+    return nameT
+
+
+def lambdified(exprS: str, argT: tuple, baseD: dict):
+    """return cached function of argT that evaluates an expression
+
+    Names in argT are function arguments. Other names resolve from baseD and
+    then builtins when the function is called.
+
+    Args:
+        exprS (str): Python expression
+        argT (tuple): argument names
+        baseD (dict): namespace for other names
+
+    Returns:
+        function: compiled expression
+    """
+
+    keyT = (exprS, argT, id(baseD))
+    funcF = _funcD.get(keyT)
+    if funcF is None:
+        srcS = "lambda " + ", ".join(argT) + ": (" + exprS + ")"
+        funcF = eval(compile(srcS, "<rivt>", "eval"), baseD)
+        _funcD[keyT] = funcF
+    return funcF
+
+
+def _numexpr_syntax(exprS: str) -> str:
+    """return reason numexpr can not evaluate an expression, or ''"""
+
+    reasonS = _nesyntaxD.get(exprS)
+    if reasonS is None:
+        reasonS = ""
+        for node in ast.walk(ast.parse(exprS, mode="eval")):
+            if not isinstance(node, _neopT):
+                reasonS = "unsupported " + type(node).__name__
+            elif isinstance(node, ast.Call) and (
+                not isinstance(node.func, ast.Name)
+                or node.func.id not in _nefuncS
+                or node.keywords
+            ):
+                reasonS = "unsupported call " + ast.unparse(node.func)
+            elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+                reasonS = "string constant"
+            if reasonS:
+                break
+        _nesyntaxD[exprS] = reasonS
+    return reasonS
+
+
+def numexpr_eval(exprS: str, argT: tuple, valL: list, baseD: dict):
+    """return value of an array expression evaluated with numexpr
+
+    Expressions are evaluated with numexpr if they read a numeric array with
+    at least NUMEXPR_MIN items, all other values are numbers or numeric
+    arrays and numexpr supports the operators and functions. The path taken
+    is recorded for array expressions.
+
+    Args:
+        exprS (str): Python expression
+        argT (tuple): names of the calc values read
+        valL (list): calc values
+        baseD (dict): namespace for other names, such as pi
+
+    Returns:
+        value, or _fallback if the expression should be evaluated with numpy
+    """
+
+    global _numexprB
+
+    valD = dict(zip(argT, valL))
+    for nameS in free_names(exprS):
+        if nameS not in valD and nameS not in _nefuncS and nameS in baseD:
+            valD[nameS] = baseD[nameS]  # numpy constants and units
+    sizeI = 0
+    reasonS = "" if _numexprB else "numexpr not installed"
+    for valO in valD.values():
+        if isinstance(valO, ndarray):
+            if valO.dtype.kind not in "biufc":
+                reasonS = "non-numeric array"
+            sizeI = max(sizeI, valO.size)
+        elif isinstance(valO, Unum) and isinstance(valO._value, ndarray):
+            sizeI = max(sizeI, valO._value.size)
+            reasonS = reasonS or "unit values"
+        elif not isinstance(valO, (int, float, complex, np.number)):
+            reasonS = reasonS or "value type " + type(valO).__name__
+    if sizeI == 0:
+        return _fallback  # not an array expression
+    reasonS = reasonS or _numexpr_syntax(exprS)
+    if not reasonS and sizeI < NUMEXPR_MIN:
+        reasonS = "small arrays"
+    if not reasonS:
+        try:
+            valO = _numexpr.evaluate(exprS, local_dict=valD, global_dict={})
+            _pathD[exprS] = "numexpr"
+            return valO
+        except ImportError:
+            _numexprB = False  # not imported again in this run
+            logging.info("numexpr not installed, arrays evaluated with numpy")
+            reasonS = "numexpr not installed"
+        except Exception as error:
+            reasonS = "numexpr error: " + str(error)
+    if exprS not in _pathD:
+        logging.debug("numpy evaluation (" + reasonS + "): " + exprS)
+    _pathD[exprS] = "numpy (" + reasonS + ")"
+    return _fallback
+
+
+def numexpr_paths() -> dict:
+    """return evaluation path of each array expression evaluated in the run"""
+
+    return dict(_pathD)
+
+
+def is_batch(valO) -> bool:
+    """return True if value is a 1-D numeric array, or a Unum of one
+
+    Batch values and the equation results computed from them hold one
+    number for each case.
+    """
+
+    if isinstance(valO, Unum):
+        valO = valO._value
+    return isinstance(valO, ndarray) and valO.ndim == 1 and valO.dtype != object
+
+
+class CalcScope:
+    """calc namespace
+
+    Names defined by the calc are read from and written to varsD, the calc
+    values dictionary. Other names resolve from the base namespace (numpy,
+    units and la from calc_namespace) and then the allowed builtins.
+    Code runs with varsD as its local namespace, so assignments write
+    through to the calc values and no names are copied between dictionaries,
+    except for statements with comprehensions, lambdas or functions.
+    Names that are in neither raise a CalcNameError before code is run.
+    """
+
+    __slots__ = ("varsD", "baseD", "funcD", "numexprB")
+
+    def __init__(self, varsD: dict, baseD: dict, numexprB: bool = False):
+        """
+        Args:
+            varsD (dict): calc values
+            baseD (dict): base namespace, usually from calc_namespace
+            numexprB (bool): evaluate large array expressions with numexpr
+        """
+        self.varsD = varsD
+        self.baseD = baseD
+        self.funcD = {}  # expression -> (function, arguments, other names)
+        self.numexprB = numexprB
+
+    def function(self, srcS: str) -> tuple:
+        """return compiled function of an expression and its argument names
+
+        The arguments are the calc values read by the expression. Calling the
+        function with other values, such as arrays, evaluates the expression
+        for them without changing the calc values.
+
+        Args:
+            srcS (str): Python expression
+
+        Returns:
+            tuple: function, argument names
+
+        Raises:
+            CalcNameError: expression reads a name that is not allowed
+        """
+
+        varsD = self.varsD
+        entryT = self.funcD.get(srcS)
+        if entryT is None or not varsD.keys().isdisjoint(entryT[2]):
+            self.check(srcS, "eval")
+            argL, otherL = [], []
+            for nameS in free_names(srcS):
+                (argL if nameS in varsD else otherL).append(nameS)
+            argT = tuple(argL)
+            entryT = (lambdified(srcS, argT, self.baseD), argT, tuple(otherL))
+            self.funcD[srcS] = entryT
+        return entryT[0], entryT[1]
+
+    def eval(self, srcS: str):
+        """return value of expression string"""
+
+        varsD = self.varsD
+        entryT = self.funcD.get(srcS)
+        if entryT is None or not varsD.keys().isdisjoint(entryT[2]):
+            self.function(srcS)  # compile or add new calc values
+            entryT = self.funcD[srcS]
+        if self.numexprB:
+            valL = [varsD[n] for n in entryT[1]]
+            valO = numexpr_eval(srcS, entryT[1], valL, self.baseD)
+            return entryT[0](*valL) if valO is _fallback else valO
+        return entryT[0](*map(varsD.__getitem__, entryT[1]))
+
+    def exec(self, srcS: str):
+        """execute statement string, writing assigned names to the calc values
+
+        Comprehensions, lambdas and functions only see global names, so a
+        statement that has them runs in one namespace merged from the base
+        namespace and the calc values. Names it binds are then written to
+        the calc values. Functions defined this way see the calc values as
+        they were when the statement ran.
+        """
+
+        self.check(srcS, "exec")
+        if self.numexprB:
+            assignT = self._assignment(srcS)
+            if assignT is not None:  # name = expression
+                self.varsD[assignT[0]] = self.eval(assignT[1])
+                return
+        if not self._nested(srcS):
+            exec(compiled(srcS, "exec"), self.baseD, self.varsD)
+            return
+        baseD, varsD = self.baseD, self.varsD
+        mergeD = dict(baseD)
+        mergeD.update(varsD)
+        exec(compiled(srcS, "exec"), mergeD)
+        for nameS in [n for n in varsD if n not in mergeD]:  # del statements
+            del varsD[nameS]
+        for nameS, valO in mergeD.items():
+            if nameS in varsD or baseD.get(nameS, _fallback) is not valO:
+                varsD[nameS] = valO
+
+    def check(self, srcS: str, modeS: str = "eval"):
+        """raise CalcNameError if source reads a name that is not allowed
+
+        Args:
+            srcS (str): Python expression or statement
+            modeS (str): parse mode - 'eval' or 'exec'
+        """
+
+        baseD = self.baseD
+        for nameS in read_names(srcS, modeS):
+            if (
+                nameS not in self.varsD
+                and nameS not in baseD
+                and nameS not in baseD["__builtins__"]
+            ):
+                raise CalcNameError("unknown name '%s' in: %s" % (nameS, srcS.strip()))
+
+    @staticmethod
+    def _assignment(srcS: str):
+        """return (name, expression) if statement assigns one name, or None"""
+
+        try:
+            return _assignD[srcS]
+        except KeyError:
+            pass
+        assignT = None
+        try:
+            bodyL = ast.parse(srcS).body
+        except SyntaxError:
+            bodyL = []
+        if (
+            len(bodyL) == 1
+            and isinstance(bodyL[0], ast.Assign)
+            and len(bodyL[0].targets) == 1
+            and isinstance(bodyL[0].targets[0], ast.Name)
+        ):
+            exprS = ast.get_source_segment(srcS, bodyL[0].value)
+            assignT = (bodyL[0].targets[0].id, exprS)
+        _assignD[srcS] = assignT
+        return assignT
+
+    @staticmethod
+    def _nested(srcS: str) -> bool:
+        """return True if statement has a comprehension, lambda or def"""
+
+        try:
+            return _nestedD[srcS]
+        except KeyError:
+            pass
+        try:
+            treeO = ast.parse(srcS)
+        except SyntaxError:
+            treeO = None
+        nestB = treeO is not None and any(
+            isinstance(n, _scopeT) for n in ast.walk(treeO)
+        )
+        _nestedD[srcS] = nestB
+        return nestB
+
+    def __getitem__(self, nameS: str):
+        try:
+            return self.varsD[nameS]
+        except KeyError:
+            return self.baseD[nameS]
+
+    def __setitem__(self, nameS: str, value):
+        self.varsD[nameS] = value
+
+    def __contains__(self, nameS: str) -> bool:
+        return nameS in self.varsD or nameS in self.baseD
+
+    def get(self, nameS: str, default=None):
+        """return value of name or default"""
+
+        try:
+            return self[nameS]
+        except KeyError:
+            return default
+
+
+class FormatContext:
+    """number format of a render session
+
+    Values are formatted explicitly when tables are built, with a Unum
+    Formatter for the current precision. Formatters are built once per
+    precision and shared, and Unum.formatter and numpy print options are not
+    changed, so sessions with different precision can render side by side.
+    """
+
+    __slots__ = ("precI",)
+    _formatD = {}  # precision -> Formatter
+
+    def __init__(self, precI: int = 2):
+        """
+        Args:
+            precI (int): decimal places
+        """
+        self.precI = int(precI)
+
+    def set_precision(self, precI: int):
+        """set decimal places for following values
+
+        Args:
+            precI (int): decimal places
+        """
+
+        self.precI = int(precI)
+
+    def formatter(self) -> Formatter:
+        """return Unum formatter for the current precision"""
+
+        fmtO = self._formatD.get(self.precI)
+        if fmtO is None:
+            fmtO = Formatter(
+                value_format="%." + str(self.precI) + "f",
+                always_display_number=True,  # 1.00 ft, not ft
+            )
+            self._formatD[self.precI] = fmtO
+        return fmtO
+
+    def unit(self, valU: Unum) -> str:
+        """return unit of value as a string"""
+
+        return self.formatter().format_unit(valU)
+
+    def format(self, valO) -> str:
+        """return value as a string at the current precision
+
+        Args:
+            valO: Unum, array, list of values or other value
+
+        Returns:
+            str: formatted value
+        """
+
+        if isinstance(valO, Unum):
+            if isinstance(valO._value, ndarray):
+                numS = self.format(valO._value)
+                return (numS + " " + self.unit(valO)).strip()
+            return self.formatter().format(valO)
+        if isinstance(valO, ndarray):
+            return array2string(
+                valO, precision=self.precI, formatter={"object": self.format}
+            )
+        if isinstance(valO, (list, tuple)):
+            return "[" + ", ".join(self.format(v) for v in valO) + "]"
+        return str(valO)
+
+    def columns(self, colL: list) -> list:
+        """return table rows of batch values, one row for each case
+
+        Args:
+            colL (list): arrays or Unum arrays of equal length, or scalars
+
+        Returns:
+            list: rows of case number and formatted numbers
+        """
+
+        numL = [asarray(getattr(c, "_value", c), dtype=float) for c in colL]
+        fmtS = "%." + str(self.precI) + "f"
+        strL = [char.mod(fmtS, a) for a in broadcast_arrays(*numL)]
+        return [[i] + list(rowT) for i, rowT in enumerate(zip(*strL), 1)]
+
+    def cell(self, valO):
+        """return table cell for value
+
+        Unum, array and list values are formatted. Other values are returned
+        unchanged so tabulate aligns and formats plain numbers.
+        """
+
+        if isinstance(valO, (Unum, ndarray, list, tuple)):
+            return self.format(valO)
+        return valO
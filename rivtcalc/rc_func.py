@@ -0,0 +1,226 @@
+#! python
+"""imports functions from calc scripts for the || func command
+
+    || func | func_stiff.py | stiffness | memo
+
+Script modules in the calcs/scripts folder are imported once per process and
+the named function is assigned to the calc values. With the memo argument,
+results are pickled to the project tmp/memo folder, keyed by a hash of the
+script source, the function name and the arguments, so a calc whose inputs
+have not changed reads the results instead of calling the function.
+
+In a long running session a script module is executed again when its file,
+or a script module it uses, changes. Changes are found from the file
+modification time and size and confirmed with a content hash. Memoized
+results of the old source are deleted and other modules are not reloaded."""
+
+import sys
+import inspect
+import logging
+import importlib.util
+from pathlib import Path
+
+import rivtcalc.rc_cache as _rc_cache
+
+_moduleD = {}  # script path -> {"statT", "filehashS", "hashS", "module", "helperL"}
+_memoD = {}  # memo folder -> DiskCache
+_missO = object()
+
+
+def _stat(fileP: Path) -> tuple:
+    """return modification time and size of a file, or None if missing"""
+
+    try:
+        statO = fileP.stat()
+    except OSError:
+        return None
+    return (statO.st_mtime_ns, statO.st_size)
+
+
+def _helpers(module) -> list:
+    """return paths of other script modules used by a script module"""
+
+    folderS = str(Path(module.__file__).resolve().parent)
+    pathS = set()
+    for valO in list(vars(module).values()):
+        modO = valO if inspect.ismodule(valO) else inspect.getmodule(valO)
+        fileS = getattr(modO, "__file__", None)
+        if modO is module or not fileS:
+            continue
+        fileP = Path(fileS).resolve()
+        if str(fileP.parent) == folderS:
+            pathS.add(str(fileP))
+    return sorted(pathS)
+
+
+def _entry(fileP: Path, module) -> dict:
+    """start tracking a script module"""
+
+    entryD = {
+        "statT": _stat(fileP),
+        "filehashS": _rc_cache.file_hash(fileP),
+        "module": module,
+    }
+    _moduleD[str(fileP)] = entryD
+    return entryD
+
+
+def _changed(entryD: dict, fileP: Path) -> bool:
+    """return True if a script file changed since it was last read"""
+
+    statT = _stat(fileP)
+    if statT == entryD["statT"]:
+        return False
+    entryD["statT"] = statT
+    filehashS = _rc_cache.file_hash(fileP)
+    if filehashS == entryD["filehashS"]:  # touched, same content
+        return False
+    entryD["filehashS"] = filehashS
+    return True
+
+
+def script_module(fileP: Path) -> dict:
+    """return script module entry, importing or reloading it if needed
+
+    The scripts folder is added to sys.path so scripts can import each
+    other, and the module is added to sys.modules under the file stem.
+    Script modules used by the script are tracked with it, one level deep,
+    and reloaded with it when they change.
+
+    Args:
+        fileP (Path): script file path
+
+    Returns:
+        dict: module, source hash ('hashS') and file state
+    """
+
+    fileP = Path(fileP).resolve()
+    entryD = _moduleD.get(str(fileP))
+    if entryD is not None and "helperL" in entryD:
+        reloadB = _changed(entryD, fileP)
+        for helperS in entryD["helperL"]:
+            helperD = _moduleD[helperS]
+            if _changed(helperD, Path(helperS)) and helperD["module"]:
+                helperD["module"].__spec__.loader.exec_module(helperD["module"])
+                logging.info("script module reloaded: " + helperS)
+                reloadB = True
+        if not reloadB:
+            return entryD
+        entryD["module"].__spec__.loader.exec_module(entryD["module"])
+        logging.info("script module reloaded: " + str(fileP))
+    else:
+        if str(fileP.parent) not in sys.path:
+            sys.path.append(str(fileP.parent))
+        spec = importlib.util.spec_from_file_location(fileP.stem, fileP)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[fileP.stem] = module
+        spec.loader.exec_module(module)
+        entryD = _entry(fileP, module)
+        logging.info("script module imported: " + str(fileP))
+    entryD["helperL"] = _helpers(entryD["module"])
+    for helperS in entryD["helperL"]:
+        if helperS not in _moduleD:
+            _entry(Path(helperS), sys.modules.get(Path(helperS).stem))
+    entryD["hashS"] = _rc_cache.stable_hash(
+        entryD["filehashS"], [_moduleD[h]["filehashS"] for h in entryD["helperL"]]
+    )
+    return entryD
+
+
+def memo_cache(memoP: Path) -> _rc_cache.DiskCache:
+    """return result cache for a memo folder"""
+
+    keyS = str(memoP)
+    if keyS not in _memoD:
+        _memoD[keyS] = _rc_cache.DiskCache(Path(memoP), 256 * 2 ** 20)
+    return _memoD[keyS]
+
+
+class ScriptFunc:
+    """function from a script module, optionally memoized on disk
+
+    The function is looked up again when the script module is reloaded.
+    Instances are pickled by script path and function name, so cached calc
+    values import the script again when loaded.
+    """
+
+    def __init__(self, fileS: str, nameS: str, memoS: str = ""):
+        """
+        Args:
+            fileS (str): script file path
+            nameS (str): function name
+            memoS (str): memo folder, or '' to call the function every time
+        """
+
+        self.fileS = fileS
+        self.nameS = nameS
+        self.memoS = memoS
+        self.srchashS = ""
+        self._current()
+
+    def _current(self):
+        """bind the function of the current script source"""
+
+        entryD = script_module(Path(self.fileS))
+        if entryD["hashS"] == self.srchashS:
+            return
+        if self.srchashS and self.memoS:  # results of the old source
+            memo_cache(self._memo_path()).clear()
+        self.srchashS = entryD["hashS"]
+        self.funcF = getattr(entryD["module"], self.nameS)
+        self.__doc__ = self.funcF.__doc__
+
+    def _memo_path(self) -> Path:
+        return Path(self.memoS, Path(self.fileS).stem)
+
+    def __call__(self, *argT, **kwargD):
+        self._current()
+        if not self.memoS:
+            return self.funcF(*argT, **kwargD)
+        memoO = memo_cache(self._memo_path())
+        keyS = _rc_cache.stable_hash(self.srchashS, self.nameS, argT, kwargD)
+        valO = memoO.get(keyS, _missO)
+        if valO is _missO:
+            valO = self.funcF(*argT, **kwargD)
+            memoO.set(keyS, valO)
+        return valO
+
+    def __reduce__(self):
+        return (ScriptFunc, (self.fileS, self.nameS, self.memoS))
+
+    def stable_key(self) -> tuple:
+        """return values that identify the function for rc_cache.stable_hash"""
+
+        self._current()
+        return (self.fileS, self.nameS, self.srchashS, self.memoS)
+
+    def signature(self) -> str:
+        """return name, arguments and first docstring line"""
+
+        try:
+            sigS = self.nameS + str(inspect.signature(self.funcF))
+        except (TypeError, ValueError):
+            sigS = self.nameS + "(...)"
+        docS = (self.funcF.__doc__ or "").strip().split("\n")[0]
+        return sigS + ("  - " + docS if docS else "")
+
+    def __repr__(self):
+        return "<function %s from %s>" % (self.nameS, Path(self.fileS).name)
+
+
+def script_func(vL: list, folderD: dict) -> ScriptFunc:
+    """return function for a func command
+
+    Args:
+        vL (list): func command arguments - func, file, name, optional memo
+        folderD (dict): folder paths
+
+    Returns:
+        ScriptFunc: function
+    """
+
+    fileP = Path(folderD["spath"], vL[1].strip())
+    memoS = ""
+    if len(vL) > 3 and vL[3].strip() == "memo":
+        memoS = str(Path(folderD["mpath"], "memo"))
+    return ScriptFunc(str(fileP), vL[2].strip(), memoS)
@@ -0,0 +1,178 @@
+#! python
+"""compiles rivt-strings to node lists
+
+A rivt-string is compiled once to a list of typed nodes that are walked by
+both the OutputUTF and OutputRST classes. Node lists are cached in memory and
+pickled to the project tmp folder, keyed by a hash of the string type and
+text, so unchanged strings are not parsed again."""
+
+import re
+import pickle
+import hashlib
+import logging
+from pathlib import Path
+
+IR_VERSION = "1"  # change when node classes change to invalidate disk cache
+_tagrgx = re.compile(r"\[([^\]]+)]_")  # find tags
+_irD = {}  # memory cache: hash -> node list
+
+
+class TextNode:
+    """line of text"""
+
+    __slots__ = ("textS",)
+    kindS = "text"
+
+    def __init__(self, textS: str):
+        self.textS = textS
+
+
+class TagNode:
+    """line with a tag"""
+
+    __slots__ = ("textS",)
+    kindS = "tag"
+
+    def __init__(self, textS: str):
+        self.textS = textS
+
+
+class CmdNode:
+    """|| command line
+
+    argL holds the command name and arguments as split on |
+    """
+
+    __slots__ = ("cmdS", "argL")
+    kindS = "command"
+
+    def __init__(self, cmdS: str, argL: list):
+        self.cmdS = cmdS
+        self.argL = argL
+
+
+class AssignNode:
+    """value assignment with units and description
+
+    argL holds the assignment, units and description as split on |
+    """
+
+    __slots__ = ("varS", "exprS", "argL", "saveB")
+    kindS = "assign"
+
+    def __init__(self, varS: str, exprS: str, argL: list, saveB: bool):
+        self.varS = varS
+        self.exprS = exprS
+        self.argL = argL
+        self.saveB = saveB
+
+
+class EquationNode(AssignNode):
+    """equation with units"""
+
+    __slots__ = ()
+    kindS = "equation"
+
+
+class CodeNode:
+    """Python statement in a table-string"""
+
+    __slots__ = ("codeS",)
+    kindS = "code"
+
+    def __init__(self, codeS: str):
+        self.codeS = codeS
+
+
+class FlushNode:
+    """blank line - ends a value block and writes the value table"""
+
+    __slots__ = ()
+    kindS = "flush"
+
+
+def _compile(strL: list, typeS: str) -> list:
+    """compile rivt-string lines to nodes
+
+    Args:
+        strL (list): rivt-string lines (without the section line)
+        typeS (str): rivt-string type
+
+    Returns:
+        list: nodes
+    """
+
+    nodeL = []
+    for uS in strL:
+        if uS[0:2] == "##":
+            continue  # remove review comment
+        uS = uS[4:]  # remove indent
+        if len(uS) == 0:
+            nodeL.append(FlushNode())
+            continue
+        if uS[0] == "#":
+            continue  # remove comment
+        if _tagrgx.search(uS):  # check for tag
+            nodeL.append(TagNode(uS))
+            continue
+        if typeS == "values" and "=" in uS:
+            saveB = False
+            if uS.strip()[-2:] == "||":  # set save flag
+                uS = uS.replace("||", " ")
+                saveB = True
+            uL = uS.split("|")
+            varS = uL[0].split("=")[0].strip()
+            exprS = uL[0].split("=")[1].strip()
+            if len(uL) <= 2:
+                nodeL.append(EquationNode(varS, exprS, uL, saveB))
+            else:
+                nodeL.append(AssignNode(varS, exprS, uL, saveB))
+            continue
+        if uS[0:2] == "||":  # check for command
+            uL = uS[2:].split("|")
+            nodeL.append(CmdNode(uL[0].strip(), uL))
+            continue
+        if typeS == "table":
+            nodeL.append(CodeNode(uS))  # Python statement
+            continue
+        nodeL.append(TextNode(uS))
+
+    return nodeL
+
+
+def compile_str(strL: list, typeS: str, mpath: Path = None) -> list:
+    """return node list for rivt-string, compiling if not cached
+
+    Args:
+        strL (list): rivt-string lines (without the section line)
+        typeS (str): rivt-string type
+        mpath (Path): project tmp folder for the disk cache
+
+    Returns:
+        list: nodes
+    """
+
+    hashS = hashlib.sha1(
+        "\n".join([IR_VERSION, typeS] + strL).encode("utf-8")
+    ).hexdigest()
+    if hashS in _irD:
+        return _irD[hashS]
+    irfileP = None
+    if mpath is not None and Path(mpath).is_dir():
+        irfileP = Path(mpath, "ir", hashS + ".pkl")
+        try:
+            with open(irfileP, "rb") as f1:
+                _irD[hashS] = pickle.load(f1)
+            return _irD[hashS]
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError):
+            pass
+    nodeL = _compile(strL, typeS)
+    _irD[hashS] = nodeL
+    if irfileP is not None:
+        try:
+            irfileP.parent.mkdir(exist_ok=True)
+            with open(irfileP, "wb") as f1:
+                pickle.dump(nodeL, f1, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            logging.debug("rivt-string node cache not written: " + str(irfileP))
+    return nodeL
@@ -0,0 +1,123 @@
+#! python
+"""lazy imports for heavy libraries
+
+Sympy, pandas, matplotlib, IPython, tabulate and the sympy LaTeX parser are
+imported when a command or tag first uses them. A plain-text calc does not
+import them at all. Import times are recorded and written to the terminal when
+rivtcalc is run with --timings."""
+
+import sys
+import time
+import importlib
+
+_lazyD = {}  # registered module name -> LazyModule
+
+
+class LazyModule:
+    """module proxy that imports the module on first attribute access"""
+
+    def __init__(self, nameS: str):
+        """register a lazy module
+
+        Args:
+            nameS (str): importable module name
+        """
+        self.__dict__["_nameS"] = nameS
+        self.__dict__["_module"] = None
+        self.__dict__["_timeF"] = 0.0
+        self.__dict__["_callerS"] = ""
+
+    def _load(self):
+        """import module and record import time and first caller"""
+
+        module = self.__dict__["_module"]
+        if module is None:
+            if self._nameS in sys.modules:
+                module = sys.modules[self._nameS]  # imported elsewhere
+            else:
+                startF = time.perf_counter()
+                module = importlib.import_module(self._nameS)
+                self.__dict__["_timeF"] = time.perf_counter() - startF
+            frame = sys._getframe(1)
+            while frame.f_back and frame.f_code.co_filename == __file__:
+                frame = frame.f_back  # skip proxy frames
+            self.__dict__["_callerS"] = frame.f_code.co_name
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attrS: str):
+        return getattr(self._load(), attrS)
+
+    def __setattr__(self, attrS: str, value):
+        setattr(self._load(), attrS, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        stateS = "loaded" if self._module is not None else "not loaded"
+        return "<lazy module " + self._nameS + " (" + stateS + ")>"
+
+
+class LazyAttr:
+    """callable proxy for a function imported from a lazy module"""
+
+    def __init__(self, moduleS: str, attrS: str):
+        """
+        Args:
+            moduleS (str): importable module name
+            attrS (str): function or class name in module
+        """
+        self._module = lazy_module(moduleS)
+        self._attrS = attrS
+
+    def __call__(self, *args, **kwargs):
+        return getattr(self._module, self._attrS)(*args, **kwargs)
+
+    def __getattr__(self, attrS: str):
+        return getattr(getattr(self._module, self._attrS), attrS)
+
+
+def lazy_module(nameS: str) -> LazyModule:
+    """return shared proxy for module nameS"""
+
+    if nameS not in _lazyD:
+        _lazyD[nameS] = LazyModule(nameS)
+    return _lazyD[nameS]
+
+
+def lazy_attr(moduleS: str, attrS: str) -> LazyAttr:
+    """return proxy for moduleS.attrS that imports moduleS on first call"""
+
+    return LazyAttr(moduleS, attrS)
+
+
+def timings() -> list:
+    """return import timing rows
+
+    Returns:
+        list: [module, status, seconds, first use] for each lazy module
+    """
+    rowL = []
+    for nameS, lmod in sorted(_lazyD.items()):
+        if lmod._module is None:
+            rowL.append([nameS, "avoided", "-", "-"])
+        else:
+            rowL.append([nameS, "deferred", "%.3f" % lmod._timeF, lmod._callerS])
+    return rowL
+
+
+def report_timings():
+    """write import timing table to terminal"""
+
+    rowL = timings()
+    totalF = sum(float(r[2]) for r in rowL if r[1] == "deferred")
+    print("\nINFO  lazy import timings")
+    print("  " + "module".ljust(26) + "status".ljust(10) + "seconds".rjust(8)
+          + "   first use")
+    for rowL1 in rowL:
+        print("  " + rowL1[0].ljust(26) + rowL1[1].ljust(10)
+              + rowL1[2].rjust(8) + "   " + rowL1[3])
+    avoidI = len([r for r in rowL if r[1] == "avoided"])
+    print("INFO  deferred import time: %.3f s, modules avoided: %d\n"
+          % (totalF, avoidI), flush=True)
@@ -6,6 +6,11 @@
     terminal. Ouput functions take a file of rivt-strings (calc) and write
     a formatted calculation file (doc) to files in utf8, pdf or html formats.
 
+    The functions write to the current CalcSession, which is created from the
+    running calc file on first use. Build tools may create a CalcSession for
+    each calc file and call its run method to process many calcs in one
+    interpreter.
+
     Example calcs are here:
 
     
@@ -181,8 +186,10 @@ rc.V(
     save an equation result to the values file by appending double bars [e]_
     y1 = v1 / 4   | unit, alt unit ||         
 
-    Functions may be defined in a table-string or imported from a file.
-    || func | (function_file.py) | (function_name) | 
+    Functions may be defined in a table-string or imported from a file in the
+    calcs/scripts folder. With memo, results are saved in the tmp folder and
+    reused when the script and arguments are unchanged.
+    || func | (function_file.py) | (function_name) | (memo)
 
     A table title [t]_
     || table | x.csv | 60    
@@ -195,7 +202,9 @@ rc.T(
     """[04]_ Table-string builds tables and plots and executes statements
     
      Table-strings may include any simple Python statement (single line),
-     and any command or tag that does not include an = sign.
+     and any command or tag that does not include an = sign. Statements may
+     use numpy, pandas, sympy and matplotlib as np, pd, sp, plt and mpimg,
+     and numpy.linalg as la. Imports are not allowed.
     """
 )
 '''
@@ -209,193 +218,892 @@ import warnings
 import re
 import importlib.util
 import shutil
+import atexit
+import copy
 import numpy as np
 from pathlib import Path
 from collections import deque
 from typing import List, Set, Dict, Tuple, Optional
-from contextlib import suppress
+from contextlib import suppress, redirect_stdout
 from rivtcalc.rc_unit import *
+import rivtcalc.rc_lazy as _rc_lazy
+import rivtcalc.rc_ir as _rc_ir
+import rivtcalc.rc_reg as _rc_reg
+import rivtcalc.rc_cache as _rc_cache
+import rivtcalc.rc_eval as _rc_eval
+import rivtcalc.rc_pretty as _rc_pretty
 import rivtcalc.rc_calc as _rc_calc
 import rivtcalc.rc_tex as _rc_tex
+import rivtcalc.rc_out as _rc_out
 
 # import rivt.rivt_reprt as _reprt
 # import rivt.rivt_chk as _rchk
 
-try:
-    # print("argv1", sys.argv[1])
-    _calcfileS = sys.argv[1]
-except:
-    # print("argv0", sys.argv[0])
-    _calcfileS = sys.argv[0]
-if ".py" not in _calcfileS:
-    import __main__
-
-    # print(dir(__main__))
-    _calcfileS = __main__.__file__
-
-_cwdS = os.getcwd()
-_cfull = Path(_calcfileS)  # calc file full path
-_cfileS = _cfull.name  # calc file name
-_cnameS = _cfileS.split(".py")[0]  # calc file basename
-_cnumS = _cnameS[0:5]
-_rivpath = Path("rivtcalc.rivt_lib.py").parent  # rivtcalc program path
-_cpath = _cfull.parent.parent  # calc folder path
-_ppath = _cfull.parent.parent.parent  # project folder path
-_mpath = Path(_ppath / "tmp")  # tmp folder path
-_dpath = Path(_ppath / "docs")  # doc folder path
-_rstfile = Path(_mpath / ".".join((_cnameS, "rst")))  # rst output
-_pdffile = Path(_dpath / ".".join((_cnameS, "pdf")))  # pdf output
-
-# global variables and dictionaries
-utfcalcS = """"""  # utf calc string
-rstcalcS = """"""  # reST calc string
-exportS = """"""  # values string exports
-rivtcalcD = {}  # values dictonary
-_rstflagB = False  # reST generation flag
-# folder paths
-_foldD = {
-    "ppath": _ppath,
-    "docpath": _dpath,
-    "cpath": Path(_ppath, "calcs"),
-    "dpath": Path(_ppath, "docs"),
-    "mpath": Path(_ppath, "tmp"),
-    "spath": Path(_cpath, "scripts"),
-    "kpath": Path(_cpath, "scripts", "sketches"),
-    "hpath": Path(_dpath, "html"),
-}
-# section settings
-_setsectD = {
-    "fnumS": _cnameS[0:5],
-    "cnumS": _cnameS[1:5],
-    "dnumS": _cnameS[1:3],
-    "sdnumS": _cnameS[3:5],
-    "snameS": "",
-    "snumS": "",
-    "swidthI": 80,
-    "enumI": 0,
-    "tnumI": 0,
-    "fnumI": 0,
-    "ftqueL": deque([1]),
-}
-# command settings
-_setcmdD = {
-    "cwidthI": 30,
-    "calignS": "C",
-    "writeS": "table",
-    "scale1F": 1.0,
-    "scale2F": 1.0,
-    "trmrI": 2,
-    "trmtI": 2,
-    "subB": False,
-    "saveB": False,
-}
-
-# temp files
-_rbak = Path(_mpath / ".".join((_cnameS, "bak")))
-_logfile = Path(_mpath / ".".join((_cnameS, "logging")))
-_rstfile = Path(_mpath / ".".join((_cnameS, "rst")))
-# logs and checks
-with open(_cfull, "r") as f2:
-    calcbak = f2.read()
-with open(_rbak, "w") as f3:
-    f3.write(calcbak)  # write backup
-warnings.filterwarnings("ignore")
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s %(name)-12s %(levelname)-8s %(message)s",
-    datefmt="%m-%d %H:%M",
-    filename=_logfile,
-    filemode="w",
-)
-logconsole = logging.StreamHandler()
-logconsole.setLevel(logging.INFO)
-formatter = logging.Formatter("%(levelname)-8s %(message)s")
-logconsole.setFormatter(formatter)
-logging.getLogger("").addHandler(logconsole)
-_rshortP = Path(*Path(_cfull).parts[-3:])
-_bshortP = Path(*Path(_rbak).parts[-4:])
-_lshortP = Path(*Path(_logfile).parts[-4:])
-logging.info(f"""calc: {_rshortP}""")
-logging.info(f"""backup: {_bshortP}""")
-logging.info(f"""logging: {_lshortP}""")
-print(" ")
-# todo: check folder structure
-# todo: check for units file in c0000, supplement default units
-
-
-def _init_utf(rawS: str):
-    """return rivt-string utf class instance
+_sessionO = None  # session used by the module level API functions
+_loghandlerL = []  # root log handlers of the most recently started session
+_wordrgx = re.compile(r"[A-Za-z_]\w*")  # names that may refer to values
+_calccodeD = {}  # (calc path, calc text) -> code object of the last run calc
 
-    Args:
-        rawS (str): rivt-string
 
-    Returns:
-        class instance: utf string-type instance
+class CalcSession:
+    """state and API for one rivt calc
+
+    A session owns the calc paths, section and command settings, calc values
+    and output that is written by the R, I, V, T and doc methods. The utf and
+    reST calcs are streamed to part files in the tmp folder a section at a
+    time and renamed to the calc files by doc.
+    Creating a session has no side effects - the backup file and log are
+    written when the first rivt-string is processed. Several sessions may be
+    run back to back in one interpreter.
     """
-    sectS, strS = rawS.split("\n", 1)
-    _section(sectS)
-    strL = strS.split("\n")
-    ucalc = _rc_calc.OutputUTF(strL, _foldD, _setcmdD, _setsectD, rivtcalcD, exportS)
-    return ucalc
 
+    def __init__(
+        self,
+        calcfileS: str,
+        timingsB: bool = False,
+        exitB: bool = False,
+        cacheB: bool = True,
+        cachesizeI: int = 64 * 2 ** 20,
+        docB: bool = True,
+        overD: dict = None,
+        numexprB: bool = False,
+        quietB: bool = False,
+        flushI: int = 0,
+    ):
+        """initialize calc paths and settings
+
+        Args:
+            calcfileS (str): calc file path
+            timingsB (bool): write import timings and memo counts at exit
+            exitB (bool): exit the interpreter after a doc is written
+            cacheB (bool): reuse rendered sections from the tmp/render cache
+                and unchanged assignments from earlier V strings
+            cachesizeI (int): render cache size limit in bytes
+            docB (bool): write the calc backup, log and docs. If False only
+                values are evaluated.
+            overD (dict): expression strings that replace assigned values,
+                keyed by name. The caches are not used if given.
+            numexprB (bool): evaluate large array expressions with numexpr
+                and write the evaluation path of each at exit
+            quietB (bool): do not write calc output to the terminal
+            flushI (int): terminal writes buffered before a flush, or 0 to
+                flush once per rivt-string
+        """
+
+        self.timingsB = timingsB
+        self.exitB = exitB
+        self.cacheB = cacheB and not overD
+        self.docB = docB
+        self.numexprB = numexprB
+        self.overD = overD or {}
+        self.startB = False  # backup and log written
+        self.cfull = Path(calcfileS)  # calc file full path
+        self.cfileS = self.cfull.name  # calc file name
+        self.cnameS = self.cfileS.split(".py")[0]  # calc file basename
+        self.cnumS = self.cnameS[0:5]
+        self.cpath = self.cfull.parent.parent  # calc folder path
+        self.ppath = self.cfull.parent.parent.parent  # project folder path
+        self.mpath = Path(self.ppath / "tmp")  # tmp folder path
+        self.dpath = Path(self.ppath / "docs")  # doc folder path
+        self.rstfile = Path(self.mpath / ".".join((self.cnameS, "rst")))  # rst output
+        self.pdffile = Path(self.dpath / ".".join((self.cnameS, "pdf")))  # pdf output
+        self.rbak = Path(self.mpath / ".".join((self.cnameS, "bak")))
+        self.logfile = Path(self.mpath / ".".join((self.cnameS, "logging")))
+        self.rcache = _rc_cache.DiskCache(Path(self.mpath, "render"), cachesizeI)
+        self.eqgraph = _rc_calc.EqGraph() if self.cacheB else None
+        self.formatO = _rc_eval.FormatContext()  # number format for tables
+        self.termO = _rc_out.NullSink() if quietB else _rc_out.TermSink(None, flushI)
+
+        self.utfO = _rc_out.CalcWriter(self._part("txt"))  # utf calc
+        self.rstO = _rc_out.CalcWriter(self._part("rst"))  # reST calc
+        self.exportS = """"""  # values string exports
+        self.rivtcalcD = {}  # values dictonary
+        self.rstflagB = False  # reST generation flag
+        self.journalL = []  # rivt-strings processed in the utf pass
+        self.evalL = None  # evaluated assignments for reST replay
+        # folder paths
+        self.foldD = {
+            "ppath": self.ppath,
+            "docpath": self.dpath,
+            "cpath": Path(self.ppath, "calcs"),
+            "dpath": Path(self.ppath, "docs"),
+            "mpath": Path(self.ppath, "tmp"),
+            "spath": Path(self.cpath, "scripts"),
+            "kpath": Path(self.cpath, "scripts", "sketches"),
+            "hpath": Path(self.dpath, "html"),
+        }
+        # section settings
+        self.setsectD = {
+            "fnumS": self.cnameS[0:5],
+            "cnumS": self.cnameS[1:5],
+            "dnumS": self.cnameS[1:3],
+            "sdnumS": self.cnameS[3:5],
+            "snameS": "",
+            "snumS": "",
+            "swidthI": 80,
+            "enumI": 0,
+            "tnumI": 0,
+            "fnumI": 0,
+            "ftqueL": deque([1]),
+        }
+        # command settings
+        self.setcmdD = {
+            "cwidthI": 30,
+            "calignS": "C",
+            "writeS": "table",
+            "scale1F": 1.0,
+            "scale2F": 1.0,
+            "trmrI": 2,
+            "trmtI": 2,
+            "subB": False,
+            "saveB": False,
+            "numexprB": numexprB,
+            "batchL": [],  # batch values and the results computed from them
+        }
+
+    def _part(self, extS: str) -> Path:
+        """return part file path of a calc output, or None if not written"""
+
+        if not self.docB:
+            return None
+        return Path(self.mpath, ".".join((self.cnameS, extS, "part")))
+
+    def start(self):
+        """write calc backup and start logging
+
+        Called before the first rivt-string is processed. Log handlers from a
+        previous session are replaced.
+        """
+
+        if self.startB:
+            return
+        self.startB = True
+        if not self.docB:
+            warnings.filterwarnings("ignore")
+            return
+        with open(self.cfull, "r") as f2:
+            calcbak = f2.read()
+        with open(self.rbak, "w") as f3:
+            f3.write(calcbak)  # write backup
+        warnings.filterwarnings("ignore")
+        rootlog = logging.getLogger("")
+        for handler in _loghandlerL:
+            rootlog.removeHandler(handler)
+            handler.close()
+        _loghandlerL.clear()
+        rootlog.setLevel(logging.DEBUG)
+        logfile = logging.FileHandler(self.logfile, mode="w")
+        logfile.setLevel(logging.DEBUG)
+        logfile.setFormatter(
+            logging.Formatter(
+                "%(asctime)s %(name)-12s %(levelname)-8s %(message)s",
+                datefmt="%m-%d %H:%M",
+            )
+        )
+        logconsole = logging.StreamHandler()
+        logconsole.setLevel(logging.INFO)
+        logconsole.setFormatter(logging.Formatter("%(levelname)-8s %(message)s"))
+        for handler in (logfile, logconsole):
+            rootlog.addHandler(handler)
+            _loghandlerL.append(handler)
+        _rshortP = Path(*Path(self.cfull).parts[-3:])
+        _bshortP = Path(*Path(self.rbak).parts[-4:])
+        _lshortP = Path(*Path(self.logfile).parts[-4:])
+        logging.info(f"""calc: {_rshortP}""")
+        logging.info(f"""backup: {_bshortP}""")
+        logging.info(f"""logging: {_lshortP}""")
+        if self.timingsB or self.numexprB:
+            atexit.register(self._report)
+        print(" ")
+        # todo: check folder structure
+        # todo: check for units file in c0000, supplement default units
+
+    def run(self):
+        """execute the calc file in this session
+
+        The module level API functions write to this session while the calc
+        file runs.
+        """
+        global _sessionO
+
+        prevO, _sessionO = _sessionO, self
+        try:
+            self.start()
+            with open(self.cfull, "r") as f1:
+                calcS = f1.read()
+            keyT = (str(self.cfull), calcS)
+            codeO = _calccodeD.get(keyT)
+            if codeO is None:
+                codeO = compile(calcS, str(self.cfull), "exec")
+                _calccodeD.clear()  # keep the most recent calc only
+                _calccodeD[keyT] = codeO
+            calcD = {"__name__": "__rivt__", "__file__": str(self.cfull)}
+            exec(codeO, calcD)
+        except BaseException:
+            self._discard()
+            raise
+        finally:
+            _sessionO = prevO
+
+    def _init_utf(self, rawS: str):
+        """return rivt-string utf class instance
+
+        Args:
+            rawS (str): rivt-string
+
+        Returns:
+            class instance: utf string-type instance
+        """
+        self.start()
+        sectS, strS = rawS.split("\n", 1)
+        self._section(sectS)
+        strL = strS.split("\n")
+        ucalc = _rc_calc.OutputUTF(
+            strL,
+            self.foldD,
+            self.setcmdD,
+            self.setsectD,
+            self.rivtcalcD,
+            self.exportS,
+            self.eqgraph,
+            self.formatO,
+            self.overD,
+        )
+        return ucalc
+
+    def _init_rst(self, rawS: str):
+        """return rivt-string reST class
+
+        Args:
+            rawstr (str): rivt-string
+
+        Returns:
+            class instance: reST string-type instance
+        """
+        self.start()
+        sectS, strS = rawS.split("\n", 1)
+        self._section(sectS)
+        strL = strS.split("\n")
+        rstcalc = _rc_tex.OutputRST(
+            strL,
+            self.foldD,
+            self.setcmdD,
+            self.setsectD,
+            self.rivtcalcD,
+            self.exportS,
+            self.evalL,
+            self.formatO,
+        )
+        return rstcalc
+
+    def _record(self, typeS: str, rawS: str) -> dict:
+        """append rivt-string and current settings and values to the journal
+
+        Args:
+            typeS (str): rivt-string type (R, I, V or T)
+            rawS (str): rivt-string
+
+        Returns:
+            dict: journal entry
+        """
+
+        entryD = {
+            "typeS": typeS,
+            "rawS": rawS,
+            "setsectD": copy.deepcopy(self.setsectD),
+            "setcmdD": copy.deepcopy(self.setcmdD),
+            "rivtD": dict(self.rivtcalcD),
+            "exportS": self.exportS,
+            "evalL": [],
+        }
+        self.journalL.append(entryD)
+        return entryD
+
+    def _replay(self):
+        """write reST calc from the journal
+
+        Each rivt-string is rendered with the settings, values and evaluated
+        assignments recorded in the utf pass. Calc code is not run again.
+        """
+
+        self.rstflagB = True
+        self.rstO.discard()
+        for entryD in self.journalL:
+            self.setsectD = copy.deepcopy(entryD["setsectD"])
+            self.setcmdD = copy.deepcopy(entryD["setcmdD"])
+            self.rivtcalcD = dict(entryD["rivtD"])
+            self.exportS = entryD["exportS"]
+            self.evalL = list(entryD["evalL"])
+            getattr(self, entryD["typeS"])(entryD["rawS"])
+            self.rstO.section()
+        self.evalL = None
+
+    def _section(self, hdrS: str):
+        """format section headings and settings
+
+        Args:
+            hdrS (str): section heading line
+        """
+
+        _rgx = r"\[\d\d\]"
+        if re.search(_rgx, hdrS):
+            nameSS = self.setsectD["snameS"] = hdrS[hdrS.find("]") + 2 :].strip()
+            snumSS = self.setsectD["snumS"] = hdrS[hdrS.find("[") + 1 : hdrS.find("]")]
+            cnumSS = str(self.setsectD["cnumS"])
+            widthI = int(self.setsectD["swidthI"])
+        if self.rstflagB:
+            # draw horizontal line
+            headS = (
+                ".. raw:: latex"
+                + "\n\n"
+                + "   ?x?vspace{.2in}"
+                + "   ?x?textbf{"
+                + nameSS
+                + "}"
+                + "   ?x?hfill?x?textbf{SECTION "
+                + snumSS
+                + "}\n"
+                + "   ?x?newline"
+                + "   ?x?vspace{.05in}   {?x?color{black}?x?hrulefill}"
+                + "\n\n"
+            )
+            self.rstO += headS
+        else:
+            headS = (
+                " "
+                + nameSS
+                + (cnumSS + " - " + ("[" + snumSS + "]")).rjust(widthI - len(nameSS) - 1)
+            )
+            bordrS = widthI * "_"
+            utfS = "\n" + bordrS + "\n\n" + headS + "\n" + bordrS + "\n"
+            print(utfS)
+            self.utfO += utfS
+
+    def _filehashes(self, nodeL: list) -> list:
+        """return hashes of files named in rivt-string commands
+
+        Args:
+            nodeL (list): rivt-string nodes
+
+        Returns:
+            list: [file name, hash] for each candidate file location
+        """
+
+        cpath = self.foldD["cpath"]
+        dpath = self.foldD["dpath"]
+        folderL = [
+            Path(cpath, self.setsectD["fnumS"]),
+            Path(cpath, "c" + self.setsectD["cnumS"]),
+            Path(dpath, "d" + self.setsectD["cnumS"]),
+            Path(dpath, "d0000"),
+            self.foldD["spath"],
+            cpath,
+        ]
+        hashL = []
+        for node in nodeL:
+            if node.kindS != "command" or len(node.argL) < 2:
+                continue
+            for fileS in node.argL[1].split(","):
+                fileS = fileS.strip()
+                if not fileS or "." not in fileS:
+                    continue
+                for folderP in folderL:
+                    fileP = Path(folderP, fileS)
+                    if fileP.is_file():
+                        hashL.append([str(fileP), _rc_cache.file_hash(fileP)])
+        return hashL
+
+    def _sectkey(self, typeS: str, rawS: str) -> str:
+        """return render cache key of a rivt-string
+
+        The key covers the rivt-string, referenced files, incoming settings and
+        incoming values with names that appear in the string.
+
+        Args:
+            typeS (str): rivt-string type (R, I, V or T)
+            rawS (str): rivt-string
+
+        Returns:
+            str: cache key
+        """
+
+        strL = rawS.split("\n", 1)[-1].split("\n")
+        nodeL = _rc_ir.compile_str(strL, _rc_reg.TYPE_D[typeS], self.mpath)
+        nameL = set(_wordrgx.findall(rawS))
+        valD = {k: self.rivtcalcD[k] for k in nameL.intersection(self.rivtcalcD)}
+        keyS = _rc_cache.stable_hash(
+            typeS, rawS, self._filehashes(nodeL), self.setsectD, self.setcmdD, valD
+        )
+        return keyS
+
+    def _utf(self, typeS: str, rawS: str):
+        """process rivt-string to utf, reusing cached sections
+
+        Args:
+            typeS (str): rivt-string type (R, I, V or T)
+            rawS (str): rivt-string
+        """
+
+        self.start()
+        entryD = self._record(typeS, rawS)
+        if self.cacheB:
+            keyS = self._sectkey(typeS, rawS)
+            hitD = self.rcache.get(keyS)
+            if hitD is not None:
+                self.termO.write(hitD["termS"])
+                self.termO.flush()
+                self.utfO += hitD["utfS"]
+                self.utfO.section()
+                self.setsectD = hitD["setsectD"]
+                self.setcmdD = hitD["setcmdD"]
+                self.rivtcalcD.update(hitD["rivtD"])
+                self.exportS = hitD["exportS"]
+                entryD["evalL"] = hitD["evalL"]
+                logging.info("render cache hit: " + rawS.split("\n", 1)[0].strip())
+                return
+        preD = dict(self.rivtcalcD)
+        listO = _rc_out.ListSink()
+        try:
+            with redirect_stdout(_rc_out.Tee(listO, self.termO)):
+                ucalc = self._init_utf(rawS)
+                {
+                    "R": ucalc.r_utf,
+                    "I": ucalc.i_utf,
+                    "V": ucalc.v_utf,
+                    "T": ucalc.t_utf,
+                }[typeS]()
+        finally:
+            self.termO.flush()
+        self.utfO += ucalc.calcS
+        utfS = self.utfO.section()
+        self.setsectD = ucalc.setsectD
+        self.setcmdD = ucalc.setcmdD
+        self.rivtcalcD = ucalc.rivtD
+        self.exportS = ucalc.exportS
+        entryD["evalL"] = ucalc.evalL
+        if self.cacheB:
+            missS = object()
+            deltaD = {  # includes values read from files by commands
+                k: v for k, v in self.rivtcalcD.items() if preD.get(k, missS) is not v
+            }
+            self.rcache.set(
+                keyS,
+                {
+                    "termS": listO.getvalue(),
+                    "utfS": utfS,
+                    "setsectD": self.setsectD,
+                    "setcmdD": self.setcmdD,
+                    "rivtD": deltaD,
+                    "exportS": self.exportS,
+                    "evalL": entryD["evalL"],
+                },
+            )
+
+    def R(self, rawS: str):
+        """repository-string to utf-string
+
+        Args:
+            rawstrS (str): repository-string
+        """
+
+        if self.rstflagB:
+            rcalc = self._init_rst(rawS)
+            rcalcS, self.setsectD = rcalc.r_rst()
+            self.rstO += rcalcS
+        else:
+            self._utf("R", rawS)
+
+    def I(self, rawS: str):
+        """insert-string to utf-string
+
+        Args:
+            rawstrS (str): insert-string
+        """
+
+        if self.rstflagB:
+            rcalc = self._init_rst(rawS)
+            rcalcS, self.setsectD, self.setcmdD = rcalc.i_rst()
+            self.rstO += rcalcS
+        else:
+            self._utf("I", rawS)
+
+    def V(self, rawS: str):
+        """value-string to utf-string
+
+        Args:
+            rawstr (str): value-string
+        """
+
+        if self.rstflagB:
+            rcalc = self._init_rst(rawS)
+            (
+                rcalcS,
+                self.setsectD,
+                self.setcmdD,
+                self.rivtcalcD,
+                self.exportS,
+            ) = rcalc.v_rst()
+            self.rstO += rcalcS
+        else:
+            self._utf("V", rawS)
+
+    def T(self, rawS: str):
+        """table-string to utf-string
+
+        Args:
+           rawstr (str): table-string
+        """
+
+        if self.rstflagB:
+            rcalc = self._init_rst(rawS)
+            rcalcS, self.setsectD, self.setcmdD, self.rivtcalcD = rcalc.t_rst()
+            self.rstO += rcalcS
+        else:
+            self._utf("T", rawS)
+
+    def S(self, rawS: str):
+        """skip string
+
+        Args:
+           rawstr (str): any string to exclude
+        """
+        pass
 
-def _init_rst(rawS: str):
-    """return rivt-string reST class
+    def _report(self):
+        """write import timings, equation memo counts and array paths"""
+
+        if self.timingsB:
+            _rc_lazy.report_timings()
+            statD = _rc_pretty.memo_stats()
+            print(
+                "INFO  equation memo: %d memory hits, %d disk hits, %d rendered\n"
+                % (statD["memory"], statD["disk"], statD["rendered"]),
+                flush=True,
+            )
+        if self.numexprB:
+            pathD = _rc_eval.numexpr_paths()
+            neI = sum(1 for p in pathD.values() if p == "numexpr")
+            print(
+                "INFO  array expressions: %d numexpr, %d numpy"
+                % (neI, len(pathD) - neI)
+            )
+            for exprS, pathS in pathD.items():
+                print("      " + pathS + ": " + exprS)
+            print("", flush=True)
+
+    def _discard(self):
+        """delete part files of calcs that were not written to a doc"""
+
+        self.utfO.discard()
+        self.rstO.discard()
+
+    def _exit(self):
+        """write timings if requested and exit if a command line run"""
+
+        self._discard()
+        if self.timingsB or self.numexprB:
+            self._report()
+        if self.exitB:
+            os._exit(1)
+
+    def gen_utf8(self, filepathS: str, calctitleS: str):
+        """write utf-calc from the utf pass to calc subfolder"""
+
+        utffile = Path(
+            self.cpath / self.setsectD["fnumS"] / ".".join([self.cnameS, "txt"])
+        )
+        if filepathS == "default":  # check file write location
+            utfpthS = Path(utffile)
+        else:
+            utfpthS = Path(self.cpath / filepathS / ".".join((self.cnameS, "txt")))
+
+        self.utfO.commit(utfpthS)
+        print("INFO  utf calc written to calc folder", flush=True)
+        print("INFO  program complete")
+
+        self._exit()
+
+    def gen_pdf(self, texfileP):
+
+        time.sleep(1)
+        os.system("latexmk -c")
+        time.sleep(1)
+        dnameS = self.cnameS.replace("c", "d", 1)
+        dfolderS = str(self.setsectD["fnumS"]).replace("c", "d", 1)
+        docpdfP = Path(self.dpath / dfolderS / ".".join([dnameS, "pdf"]))
+        # clean temp files and generate pdf file
+
+        mpath = self.foldD["mpath"]
+        pdfmkS = (
+            "perl.exe c:/texlive/2020/texmf-dist/scripts/latexmk/latexmk.pl "
+            + "-pdf -xelatex -quiet -f "
+            + str(texfileP)
+        )
+        os.chdir(mpath)
+        os.system(pdfmkS)
+        print("\nINFO  pdf file written: " + ".".join([self.cnameS, "pdf"]))
+
+        time.sleep(1)  # move pdf to doc folder
+        os.chdir(mpath)
+        pdfS = ".".join([self.cnameS, "pdf"])
+        shutil.move(pdfS, docpdfP)
+        os.chdir(self.dpath)
+        print("INFO  pdf file moved to docs folder", flush=True)
+        print("INFO  program complete")
+
+        cfgP = Path(self.dpath / "d0000" / "rc_cfg.txt")  # get pdf program
+        with open(cfgP) as f2:
+            cfgL = f2.readlines()
+            cfg1S = cfgL[0].split("|")
+            cfg2S = cfg1S[1].strip()
+        cmdS = cfg2S + " " + str(docpdfP)
+        print(cmdS)
+        subprocess.run(cmdS)
+
+        self._exit()
+
+    def gen_tex(self, doctypeS, stylefileS, calctitleS, startpageS):
+
+        mpath = self.foldD["mpath"]
+        pdfD = {
+            "cpdfP": Path(mpath / ".".join([self.cnameS, "pdf"])),
+            "chtml": Path(mpath / ".".join([self.cnameS, "html"])),
+            "trst": Path(mpath / ".".join([self.cnameS, "rst"])),
+            "ttex1": Path(mpath / ".".join([self.cnameS, "tex"])),
+            "auxfile": Path(mpath / ".".join([self.cnameS, ".aux"])),
+            "outfile": Path(mpath / ".".join([self.cnameS, ".out"])),
+            "texmak2": Path(mpath / ".".join([self.cnameS, ".fls"])),
+            "texmak3": Path(mpath / ".".join([self.cnameS, ".fdb_latexmk"])),
+        }
+        if stylefileS == "default":
+            stylefileS = "pdf_style.sty"
+        else:
+            stylefileS == stylefileS.strip()
+        style_path = Path(self.dpath / "d0000" / stylefileS)
+        print("INFO  style sheet: " + str(style_path))
+        pythoncallS = "python "
+        if sys.platform == "linux":
+            pythoncallS = "python3 "
+        elif sys.platform == "darwin":
+            pythoncallS = "python3 "
+
+        rst2xeP = Path(rivpath / "scripts" / "rst2xetex.py")
+        texfileP = pdfD["ttex1"]
+        tex1S = "".join(
+            [
+                pythoncallS,
+                str(rst2xeP),
+                " --embed-stylesheet ",
+                " --documentclass=report ",
+                " --documentoptions=12pt,notitle,letterpaper ",
+                " --stylesheet=",
+                str(style_path) + " ",
+                str(self.rstfile) + " ",
+                str(texfileP),
+            ]
+        )
+        os.chdir(mpath)
+        os.system(tex1S)
+        print("INFO  tex file written : " + str(texfileP) + "\n")
+
+        # fix escape sequences
+        fnumS = self.setsectD["fnumS"]
+        with open(texfileP, "r", encoding="utf-8", errors="ignore") as texin:
+            texf = texin.read()
+        texf = texf.replace("?x?", """\\""")
+        texf = texf.replace(
+            """fancyhead[L]{\leftmark}""",
+            """fancyhead[L]{\\normalsize  """ + calctitleS + "}",
+        )
+        texf = texf.replace("x*x*x", fnumS)
+        texf = texf.replace("""\\begin{tabular}""", "%% ")
+        texf = texf.replace("""\\end{tabular}""", "%% ")
+        texf = texf.replace(
+            """\\begin{document}""",
+            """\\begin{document}\n\\setcounter{page}{""" + startpageS + "}\n",
+        )
 
-    Args:
-        rawstr (str): rivt-string
+        # texf = texf.replace(
+        #     """\\begin{document}""",
+        #     """\\renewcommand{\contentsname}{"""
+        #     + self.calctitle
+        #     + "}\n"
+        #     + """\\begin{document}"""
+        #     + "\n"
+        #     + """\\makeatletter"""
+        #     + """\\renewcommand\@dotsep{10000}"""
+        #     + """\\makeatother"""
+        #     + """\\tableofcontents"""
+        #     + """\\listoftables"""
+        #     + """\\listoffigures"""
+        # )
+
+        with open(texfileP, "w", encoding="utf-8") as texout:
+            texout.write(texf)
+
+        if doctypeS == "pdf":
+            self.gen_pdf(texfileP)
+
+        self._exit()
+
+    def gen_html(self, stylefileS):
+
+        pass
+
+    def gen_rst(self, doctypeS, stylefileS, calctitleS, startpageS):
+
+        self._replay()
+
+        self.rstO.commit(self.rstfile)
+        print("INFO  rst calc written to tmp folder", flush=True)
+
+        if doctypeS == "tex" or doctypeS == "pdf":
+            self.gen_tex(doctypeS, stylefileS, calctitleS, startpageS)
+        elif doctypeS == "html":
+            self.gen_html(stylefileS)
+        else:
+            print("INFO doc type not recognized")
+
+        self._exit()
+
+    def gen_report(self):
+        """[summary]"""
+        pass
 
-    Returns:
-        class instance: reST string-type instance
+    def doc(
+        self,
+        doctypeS="utf8",
+        stylefileS="default",
+        calctitleS="RivtCalc Calculation",
+        startpageS="1",
+        clrS="clr",
+    ):
+
+        """write rst-calc and values to files
+
+        cnnnn_calc.txt file is written to the calc subfolder
+        cnnnn_values.csv file is written to calc subfolder
+        .csv value file is written to calc subfolder
+        .style files are read from d0000 folder (default)
+        .rst calc file is written to tmp folder
+        .tex file is written to tmp folder (default)
+
+        Docs are written from the rivt-strings processed before the call.
+        The calc file is not read or run again. Nothing is written if the
+        session does not write docs. Part files of calcs that are not
+        written are deleted.
+        """
+
+        if not self.docB:
+            return
+
+        exprtfile = Path(
+            self.cpath / self.setsectD["fnumS"] / ".".join([self.cnameS, "csv"])
+        )
+        str1 = """header string\n"""  # write values file
+        str1 = str1 + self.exportS
+        with open(exprtfile, "w") as expF:
+            expF.write(str1)
+        print("INFO  values file written to calc folder", flush=True)
+        try:
+            self._doc(doctypeS, stylefileS, calctitleS, startpageS, clrS)
+        finally:
+            self._discard()
+
+    def _doc(self, doctypeS, stylefileS, calctitleS, startpageS, clrS):
+        """write calc and doc files of a doc type, see doc"""
+
+        if doctypeS == "utf8":
+            self.gen_utf8(stylefileS, calctitleS)
+
+        elif doctypeS == "tex" or doctypeS == "pdf" or doctypeS == "html":
+            if clrS == "clr":  # delete temp files
+                mpathS = str(self.foldD["mpath"])
+                fileL = [
+                    Path(mpathS, ".".join([self.cnameS, "pdf"])),
+                    Path(mpathS, ".".join([self.cnameS, "html"])),
+                    Path(mpathS, ".".join([self.cnameS, "rst"])),
+                    Path(mpathS, ".".join([self.cnameS, "tex"])),
+                    Path(mpathS, ".".join([self.cnameS, ".aux"])),
+                    Path(mpathS, ".".join([self.cnameS, ".out"])),
+                    Path(mpathS, ".".join([self.cnameS, ".fls"])),
+                    Path(mpathS, ".".join([self.cnameS, ".fdb_latexmk"])),
+                ]
+                os.chdir(mpathS)
+                tmpS = os.getcwd()
+                if tmpS == mpathS:
+                    for f in fileL:
+                        try:
+                            os.remove(f)
+                        except:
+                            pass
+                    time.sleep(1)
+                print("\nINFO  temporary Tex files deleted \n", flush=True)
+            self.gen_rst(doctypeS, stylefileS, calctitleS, startpageS)
+
+        elif doctypeS == "report":
+            self.gen_report()
+
+        else:
+            pass
+
+
+def _calcfile() -> str:
+    """return calc file path from the command line or __main__"""
+
+    argL = [a for a in sys.argv[1:] if not a.startswith("--")]
+    try:
+        # print("argv1", sys.argv[1])
+        calcfileS = argL[0]
+    except:
+        # print("argv0", sys.argv[0])
+        calcfileS = sys.argv[0]
+    if ".py" not in calcfileS:
+        import __main__
+
+        # print(dir(__main__))
+        calcfileS = __main__.__file__
+    return calcfileS
+
+
+def _flushargs() -> int:
+    """return terminal writes per flush from a --flush=n argument"""
+
+    for argS in sys.argv:
+        if argS.startswith("--flush="):
+            return int(argS.split("=", 1)[1])
+    return 0
+
+
+def session() -> CalcSession:
+    """return current session
+
+    A session for the running calc file is created on first use.
     """
-    sectS, strS = rawS.split("\n", 1)
-    _section(sectS)
-    strL = strS.split("\n")
-    rstcalc = _rc_tex.OutputRST(strL, _foldD, _setcmdD, _setsectD, rivtcalcD, exportS)
-    return rstcalc
+    global _sessionO
+
+    if _sessionO is None:
+        _sessionO = CalcSession(
+            _calcfile(),
+            timingsB="--timings" in sys.argv,
+            exitB=True,
+            cacheB="--nocache" not in sys.argv,
+            numexprB="--numexpr" in sys.argv,
+            quietB="--quiet" in sys.argv,
+            flushI=_flushargs(),
+        )
+    return _sessionO
 
 
-def _section(hdrS: str):
-    """format section headings and settings
+def set_session(sessionO: Optional[CalcSession]):
+    """set session used by the module level API functions
 
     Args:
-        hdrS (str): section heading line
+        sessionO (CalcSession): session or None to reset
     """
-    global utfcalcS, _setsectD, rstcalcS
-
-    _rgx = r"\[\d\d\]"
-    if re.search(_rgx, hdrS):
-        nameSS = _setsectD["snameS"] = hdrS[hdrS.find("]") + 2 :].strip()
-        snumSS = _setsectD["snumS"] = hdrS[hdrS.find("[") + 1 : hdrS.find("]")]
-        cnumSS = str(_setsectD["cnumS"])
-        widthI = int(_setsectD["swidthI"])
-    if _rstflagB:
-        # draw horizontal line
-        headS = (
-            ".. raw:: latex"
-            + "\n\n"
-            + "   ?x?vspace{.2in}"
-            + "   ?x?textbf{"
-            + nameSS
-            + "}"
-            + "   ?x?hfill?x?textbf{SECTION "
-            + snumSS
-            + "}\n"
-            + "   ?x?newline"
-            + "   ?x?vspace{.05in}   {?x?color{black}?x?hrulefill}"
-            + "\n\n"
-        )
-        rstcalcS += headS
-    else:
-        headS = (
-            " "
-            + nameSS
-            + (cnumSS + " - " + ("[" + snumSS + "]")).rjust(widthI - len(nameSS) - 1)
-        )
-        bordrS = widthI * "_"
-        utfS = "\n" + bordrS + "\n\n" + headS + "\n" + bordrS + "\n"
-        print(utfS)
-        utfcalcS += utfS
+    global _sessionO
+
+    _sessionO = sessionO
 
 
 def R(rawS: str):
@@ -404,16 +1112,7 @@ def R(rawS: str):
     Args:
         rawstrS (str): repository-string
     """
-    global utfcalcS, rstcalcS, _rstflagB, _foldD, _setsectD, _setcmdD, rivtcalcD
-
-    if _rstflagB:
-        rcalc = _init_rst(rawS)
-        rcalcS, _setsectD = rcalc.r_rst()
-        rstcalcS += rcalcS
-    else:
-        rcalc = _init_utf(rawS)
-        rcalcS, _setsectD = rcalc.r_utf()
-        utfcalcS += rcalcS
+    session().R(rawS)
 
 
 def I(rawS: str):
@@ -422,16 +1121,7 @@ def I(rawS: str):
     Args:
         rawstrS (str): insert-string
     """
-    global utfcalcS, rstcalcS, _rstflagB, _foldD, _setsectD, _setcmdD, rivtcalcD
-
-    if _rstflagB:
-        rcalc = _init_rst(rawS)
-        rcalcS, _setsectD, _setcmdD = rcalc.i_rst()
-        rstcalcS += rcalcS
-    else:
-        icalc = _init_utf(rawS)
-        icalcS, _setsectD, _setcmdD = icalc.i_utf()
-        utfcalcS += icalcS
+    session().I(rawS)
 
 
 def V(rawS: str):
@@ -440,16 +1130,7 @@ def V(rawS: str):
     Args:
         rawstr (str): value-string
     """
-    global utfcalcS, rstcalcS, _rstflagB, _foldD, _setsectD, _setcmdD, rivtcalcD, exportS
-
-    if _rstflagB:
-        rcalc = _init_rst(rawS)
-        rcalcS, _setsectD, _setcmdD, rivtcalcD, exportS = rcalc.v_rst()
-        rstcalcS += rcalcS
-    else:
-        vcalc = _init_utf(rawS)
-        vcalcS, _setsectD, _setcmdD, rivtcalcD, exportS = vcalc.v_utf()
-        utfcalcS += vcalcS
+    session().V(rawS)
 
 
 def T(rawS: str):
@@ -458,16 +1139,7 @@ def T(rawS: str):
     Args:
        rawstr (str): table-string
     """
-    global utfcalcS, rstcalcS, _rstflagB, _foldD, _setsectD, _setcmdD, rivtcalcD
-
-    if _rstflagB:
-        rcalc = _init_rst(rawS)
-        rcalcS, _setsectD = rcalc.t_rst()
-        rstcalcS += rcalcS
-    else:
-        tcalc = _init_utf(rawS)
-        tcalcS, _setsectD, _setcmdD, rivtcalcD = tcalc.t_utf()
-        utfcalcS += tcalcS
+    session().T(rawS)
 
 
 def S(rawS: str):
@@ -479,195 +1151,6 @@ def S(rawS: str):
     pass
 
 
-def gen_utf8(cmdS: str, filepathS: str, calctitleS: str):
-    """write utf-calc to calc subfolder"""
-
-    global utfcalcS
-
-    utfcalcS = """"""
-    exec(cmdS, globals(), locals())
-
-    utffile = Path(_cpath / _setsectD["fnumS"] / ".".join([_cnameS, "txt"]))
-    if filepathS == "default":  # check file write location
-        utfpthS = Path(utffile)
-    else:
-        utfpthS = Path(_cpath / filepathS / ".".join((_cnameS, "txt")))
-
-    with open(utfpthS, "wb") as f1:
-        f1.write(utfcalcS.encode("UTF-8"))
-    print("INFO  utf calc written to calc folder", flush=True)
-    print("INFO  program complete")
-
-    os._exit(1)
-
-
-def gen_pdf(texfileP):
-
-    global rstcalcS, _rstflagB
-
-    time.sleep(1)
-    os.system("latexmk -c")
-    time.sleep(1)
-    dnameS = _cnameS.replace("c", "d", 1)
-    dfolderS = str(_setsectD["fnumS"]).replace("c", "d", 1)
-    docpdfP = Path(_dpath / dfolderS / ".".join([dnameS, "pdf"]))
-    # clean temp files and generate pdf file
-
-    mpath = _foldD["mpath"]
-    pdfmkS = (
-        "perl.exe c:/texlive/2020/texmf-dist/scripts/latexmk/latexmk.pl "
-        + "-pdf -xelatex -quiet -f "
-        + str(texfileP)
-    )
-    os.chdir(mpath)
-    os.system(pdfmkS)
-    print("\nINFO  pdf file written: " + ".".join([_cnameS, "pdf"]))
-
-    time.sleep(1)  # move pdf to doc folder
-    os.chdir(mpath)
-    pdfS = ".".join([_cnameS, "pdf"])
-    shutil.move(pdfS, docpdfP)
-    os.chdir(_dpath)
-    print("INFO  pdf file moved to docs folder", flush=True)
-    print("INFO  program complete")
-
-    cfgP = Path(_dpath / "d0000" / "rc_cfg.txt")  # get pdf program
-    with open(cfgP) as f2:
-        cfgL = f2.readlines()
-        cfg1S = cfgL[0].split("|")
-        cfg2S = cfg1S[1].strip()
-    cmdS = cfg2S + " " + str(docpdfP)
-    print(cmdS)
-    subprocess.run(cmdS)
-
-    os._exit(1)
-
-
-def gen_tex(doctypeS, stylefileS, calctitleS, startpageS):
-
-    global rstcalcS, _rstflagB
-
-    mpath = _foldD["mpath"]
-    pdfD = {
-        "cpdfP": Path(mpath / ".".join([_cnameS, "pdf"])),
-        "chtml": Path(mpath / ".".join([_cnameS, "html"])),
-        "trst": Path(mpath / ".".join([_cnameS, "rst"])),
-        "ttex1": Path(mpath / ".".join([_cnameS, "tex"])),
-        "auxfile": Path(mpath / ".".join([_cnameS, ".aux"])),
-        "outfile": Path(mpath / ".".join([_cnameS, ".out"])),
-        "texmak2": Path(mpath / ".".join([_cnameS, ".fls"])),
-        "texmak3": Path(mpath / ".".join([_cnameS, ".fdb_latexmk"])),
-    }
-    if stylefileS == "default":
-        stylefileS = "pdf_style.sty"
-    else:
-        stylefileS == stylefileS.strip()
-    style_path = Path(_dpath / "d0000" / stylefileS)
-    print("INFO  style sheet: " + str(style_path))
-    pythoncallS = "python "
-    if sys.platform == "linux":
-        pythoncallS = "python3 "
-    elif sys.platform == "darwin":
-        pythoncallS = "python3 "
-
-    rst2xeP = Path(rivpath / "scripts" / "rst2xetex.py")
-    texfileP = pdfD["ttex1"]
-    tex1S = "".join(
-        [
-            pythoncallS,
-            str(rst2xeP),
-            " --embed-stylesheet ",
-            " --documentclass=report ",
-            " --documentoptions=12pt,notitle,letterpaper ",
-            " --stylesheet=",
-            str(style_path) + " ",
-            str(_rstfile) + " ",
-            str(texfileP),
-        ]
-    )
-    os.chdir(mpath)
-    os.system(tex1S)
-    print("INFO  tex file written : " + str(texfileP) + "\n")
-
-    # fix escape sequences
-    fnumS = _setsectD["fnumS"]
-    with open(texfileP, "r", encoding="utf-8", errors="ignore") as texin:
-        texf = texin.read()
-    texf = texf.replace("?x?", """\\""")
-    texf = texf.replace(
-        """fancyhead[L]{\leftmark}""",
-        """fancyhead[L]{\\normalsize  """ + calctitleS + "}",
-    )
-    texf = texf.replace("x*x*x", fnumS)
-    texf = texf.replace("""\\begin{tabular}""", "%% ")
-    texf = texf.replace("""\\end{tabular}""", "%% ")
-    texf = texf.replace(
-        """\\begin{document}""",
-        """\\begin{document}\n\\setcounter{page}{""" + startpageS + "}\n",
-    )
-
-    # texf = texf.replace(
-    #     """\\begin{document}""",
-    #     """\\renewcommand{\contentsname}{"""
-    #     + self.calctitle
-    #     + "}\n"
-    #     + """\\begin{document}"""
-    #     + "\n"
-    #     + """\\makeatletter"""
-    #     + """\\renewcommand\@dotsep{10000}"""
-    #     + """\\makeatother"""
-    #     + """\\tableofcontents"""
-    #     + """\\listoftables"""
-    #     + """\\listoffigures"""
-    # )
-
-    with open(texfileP, "w", encoding="utf-8") as texout:
-        texout.write(texf)
-
-    if doctypeS == "pdf":
-        gen_pdf(texfileP)
-
-    os._exit(1)
-
-
-def gen_html(stylefileS):
-
-    global rstcalcS, _rstflagB
-    pass
-
-
-def gen_rst(cmdS, doctypeS, stylefileS, calctitleS, startpageS):
-
-    global rstcalcS, _rstflagB
-
-    _rstflagB = True
-    rstcalcS = """"""
-    exec(cmdS, globals(), locals())
-
-    with open(_rstfile, "wb") as f1:
-        f1.write(rstcalcS.encode("UTF-8"))
-    print("INFO  rst calc written to tmp folder", flush=True)
-
-    f1 = open(_rstfile, "r", encoding="utf-8", errors="ignore")
-    rstcalcL = f1.readlines()
-    f1.close()
-    print("INFO  rst file read: " + str(_rstfile))
-
-    if doctypeS == "tex" or doctypeS == "pdf":
-        gen_tex(doctypeS, stylefileS, calctitleS, startpageS)
-    elif doctypeS == "html":
-        gen_html()
-    else:
-        print("INFO doc type not recognized")
-
-    os._exit(1)
-
-
-def gen_report():
-    """[summary]"""
-    pass
-
-
 def doc(
     doctypeS="utf8",
     stylefileS="default",
@@ -675,69 +1158,8 @@ def doc(
     startpageS="1",
     clrS="clr",
 ):
-
     """write rst-calc and values to files
 
-    cnnnn_calc.txt file is written to the calc subfolder
-    cnnnn_values.csv file is written to calc subfolder
-    .csv value file is written to calc subfolder
-    .style files are read from d0000 folder (default)
-    .rst calc file is written to tmp folder
-    .tex file is written to tmp folder (default)
-
+    See CalcSession.doc
     """
-    global utfcalcS, rstcalcS, _rstflagB
-
-    f1 = open(_cfull, "r")
-    utfcalcL = f1.readlines()
-    f1.close()
-    print("INFO calc file read: " + str(_cfull))
-
-    indx = 0  # avoid recursion
-    for iS in enumerate(utfcalcL):
-        if "rc.doc" in iS[1]:
-            indx = int(iS[0])
-            break
-    rstcalcL = utfcalcL = utfcalcL[0:indx] + utfcalcL[indx + 1 :]
-    cmdS = "".join(utfcalcL)
-
-    exprtfile = Path(_cpath / _setsectD["fnumS"] / ".".join([_cnameS, "csv"]))
-    str1 = """header string\n"""  # write values file
-    str1 = str1 + exportS
-    with open(exprtfile, "w") as expF:
-        expF.write(str1)
-    print("INFO  values file written to calc folder", flush=True)
-
-    if doctypeS == "utf8":
-        gen_utf8(cmdS, stylefileS, calctitleS)
-
-    elif doctypeS == "tex" or doctypeS == "pdf" or doctypeS == "html":
-        if clrS == "clr":  # delete temp files
-            mpathS = str(_foldD["mpath"])
-            fileL = [
-                Path(mpathS, ".".join([_cnameS, "pdf"])),
-                Path(mpathS, ".".join([_cnameS, "html"])),
-                Path(mpathS, ".".join([_cnameS, "rst"])),
-                Path(mpathS, ".".join([_cnameS, "tex"])),
-                Path(mpathS, ".".join([_cnameS, ".aux"])),
-                Path(mpathS, ".".join([_cnameS, ".out"])),
-                Path(mpathS, ".".join([_cnameS, ".fls"])),
-                Path(mpathS, ".".join([_cnameS, ".fdb_latexmk"])),
-            ]
-            os.chdir(mpathS)
-            tmpS = os.getcwd()
-            if tmpS == mpathS:
-                for f in fileL:
-                    try:
-                        os.remove(f)
-                    except:
-                        pass
-                time.sleep(1)
-            print("\nINFO  temporary Tex files deleted \n", flush=True)
-        gen_rst(cmdS, doctypeS, stylefileS, calctitleS, startpageS)
-
-    elif doctypeS == "report":
-        gen_report()
-
-    else:
-        pass
+    session().doc(doctypeS, stylefileS, calctitleS, startpageS, clrS)
@@ -0,0 +1,228 @@
+#! python
+"""text builders and output sinks
+
+A TextBuilder collects calc text as a list of parts and joins them once when
+the text is read, so appending with += does not copy the text written so
+far. Sinks are text streams that output is printed to with redirect_stdout:
+
+    ListSink    collect output in a list
+    TermSink    buffer output and write it to the terminal every flushI
+                writes and when flushed
+    FileSink    buffer output and write it to a file
+    NullSink    discard output (quiet mode)
+    Tee         write output to several sinks
+
+A CalcWriter streams a calc file one section at a time to a part file that
+is renamed to the calc file when it is complete.
+
+The text written is the same for every sink - only where it goes and when it
+is flushed changes."""
+
+import io
+import os
+import sys
+from pathlib import Path
+
+
+class TextBuilder:
+    """list backed string builder"""
+
+    __slots__ = ("partL",)
+
+    def __init__(self, textS: str = ""):
+        self.partL = [textS] if textS else []
+
+    def __iadd__(self, textS):
+        self.partL.append(str(textS))
+        return self
+
+    def __radd__(self, textS: str) -> str:
+        return textS + self.getvalue()
+
+    def __str__(self) -> str:
+        return self.getvalue()
+
+    def getvalue(self) -> str:
+        """return text, joining the parts"""
+
+        if len(self.partL) > 1:
+            self.partL = ["".join(self.partL)]
+        return self.partL[0] if self.partL else ""
+
+    def mark(self) -> int:
+        """return position for since"""
+
+        return len(self.partL)
+
+    def since(self, markI: int) -> str:
+        """return text added after a mark
+
+        Args:
+            markI (int): position from mark, valid until getvalue is called
+        """
+
+        return "".join(self.partL[markI:])
+
+
+class ListSink(io.TextIOBase):
+    """collect output in a list"""
+
+    def __init__(self):
+        self.outL = []
+
+    def write(self, outS: str) -> int:
+        self.outL.append(outS)
+        return len(outS)
+
+    def getvalue(self) -> str:
+        return "".join(self.outL)
+
+
+class TermSink(io.TextIOBase):
+    """buffered terminal output"""
+
+    def __init__(self, stream=None, flushI: int = 0):
+        """
+        Args:
+            stream: text stream, or None for sys.stdout when the sink is
+                made. Output printed while sys.stdout is redirected to the
+                sink is not written back to the redirect.
+            flushI (int): writes buffered before a flush, or 0 to write only
+                when flushed
+        """
+
+        self.stream = sys.stdout if stream is None else stream
+        self.flushI = flushI
+        self.bufL = []
+        self.flushesI = 0
+
+    @property
+    def encoding(self):
+        return getattr(self.stream, "encoding", "utf-8")
+
+    def write(self, outS: str) -> int:
+        self.bufL.append(outS)
+        if self.flushI and len(self.bufL) >= self.flushI:
+            self.flush()
+        return len(outS)
+
+    def flush(self):
+        if not self.bufL:
+            return
+        self.stream.write("".join(self.bufL))
+        self.stream.flush()
+        self.bufL = []
+        self.flushesI += 1
+
+
+class FileSink(TermSink):
+    """buffered file output"""
+
+    def __init__(self, fileP: Path, flushI: int = 256):
+        """
+        Args:
+            fileP (Path): output file, opened for writing in utf-8
+            flushI (int): writes buffered before a flush
+        """
+
+        super().__init__(open(fileP, "w", encoding="utf-8", newline=""), flushI)
+        self.fileP = Path(fileP)
+
+    def close(self):
+        if not self.stream.closed:
+            self.flush()
+            self.stream.close()
+        super().close()
+
+
+class NullSink(io.TextIOBase):
+    """discard output"""
+
+    def write(self, outS: str) -> int:
+        return len(outS)
+
+
+class Tee(io.TextIOBase):
+    """write output to several sinks"""
+
+    def __init__(self, *sinkT):
+        self.sinkT = sinkT
+
+    @property
+    def encoding(self):
+        return getattr(self.sinkT[-1], "encoding", "utf-8")
+
+    def write(self, outS: str) -> int:
+        for sinkO in self.sinkT:
+            sinkO.write(outS)
+        return len(outS)
+
+    def flush(self):
+        for sinkO in self.sinkT:
+            sinkO.flush()
+
+
+class CalcWriter:
+    """write calc text to a file one section at a time
+
+    Text added with += is held until the section is written, so only the
+    current section is kept in memory. Sections are written to a part file,
+    opened on the first write, which replaces the calc file in one rename
+    when the calc is complete.
+    """
+
+    def __init__(self, partP: Path = None):
+        """
+        Args:
+            partP (Path): part file, in the same file system as the calc
+                file, or None to discard sections when written
+        """
+
+        self.partP = None if partP is None else Path(partP)
+        self.fileO = None
+        self.sectO = TextBuilder()
+
+    def __iadd__(self, textS):
+        self.sectO += textS
+        return self
+
+    def section(self) -> str:
+        """write the current section and return its text"""
+
+        textS = self.sectO.getvalue()
+        self.sectO = TextBuilder()
+        if textS and self.partP is not None:
+            if self.fileO is None:
+                self.partP.parent.mkdir(parents=True, exist_ok=True)
+                self.fileO = open(self.partP, "w", encoding="utf-8", newline="")
+            self.fileO.write(textS)
+        return textS
+
+    def commit(self, fileP: Path) -> Path:
+        """write the last section and rename the part file to the calc file
+
+        Args:
+            fileP (Path): calc file
+
+        Returns:
+            Path: calc file
+        """
+
+        self.section()
+        if self.fileO is None:  # no sections
+            self.partP.parent.mkdir(parents=True, exist_ok=True)
+            self.fileO = open(self.partP, "w", encoding="utf-8", newline="")
+        self.fileO.close()
+        self.fileO = None
+        os.replace(self.partP, fileP)
+        return Path(fileP)
+
+    def discard(self):
+        """close and delete the part file"""
+
+        self.sectO = TextBuilder()
+        if self.fileO is not None:
+            self.fileO.close()
+            self.fileO = None
+        if self.partP is not None and self.partP.exists():
+            self.partP.unlink()
@@ -0,0 +1,899 @@
+#! python
+"""renders arithmetic equations to UTF8 and LaTeX without sympy
+
+Value-string equations are usually products, quotients, powers and sums of
+named values. They are parsed with the Python ast module and laid out
+directly as 2D UTF8 text or LaTeX. Symbol names follow the sympy printing
+conventions - trailing digits and _ parts become subscripts and Greek letter
+names become letters. Expressions with other constructs are rendered with
+sympy.
+
+Rendered equations are memoized in memory and in the project tmp/pretty
+folder, keyed by renderer, options and equation text, so calcs in a project
+share rendered output across runs. LaTeX from [x]_ tags is parsed with one
+ANTLR lexer and parser per process and memoized the same way.
+
+Run this module to time [x]_ tag rendering:  python -m rivtcalc.rc_pretty"""
+
+import re
+import ast
+import hashlib
+import logging
+import importlib
+import unicodedata
+from pathlib import Path
+from numpy import array2string, ndarray
+import rivtcalc.rc_lazy as _rc_lazy
+import rivtcalc.rc_cache as _rc_cache
+from rivtcalc.rc_unit import Unum
+
+sp = _rc_lazy.lazy_module("sympy")
+_abc = _rc_lazy.lazy_module("sympy.abc")
+parse_latex = _rc_lazy.lazy_attr("sympy.parsing.latex", "parse_latex")
+
+_digitrgx = re.compile(r"^([a-zA-Z]+)([0-9]+)$")  # name with trailing digits
+_greekL = [
+    "alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta",
+    "iota", "kappa", "lamda", "mu", "nu", "xi", "omicron", "pi", "rho",
+    "sigma", "tau", "upsilon", "phi", "chi", "psi", "omega",
+]  # fmt: skip
+_subD = dict(
+    zip("0123456789+-=()aehijklmnoprstuvx", "₀₁₂₃₄₅₆₇₈₉₊₋₌₍₎ₐₑₕᵢⱼₖₗₘₙₒₚᵣₛₜᵤᵥₓ")
+)
+_subD.update(zip("βγρφχ", "ᵦᵧᵨᵩᵪ"))
+_supD = dict(zip("0123456789+-=()in", "⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻⁼⁽⁾ⁱⁿ"))
+_unsupD = {v: k for k, v in _supD.items()}
+_unsuprgx = re.compile("[" + "".join(_unsupD) + "]+")  # superscript run
+_latexfuncL = [
+    "sin", "cos", "tan", "cot", "sec", "csc", "sinh", "cosh", "tanh",
+    "arcsin", "arccos", "arctan", "log", "ln", "exp",
+]  # fmt: skip
+_PREC = {ast.Add: 10, ast.Sub: 10, ast.Mult: 20, ast.Div: 20, ast.Pow: 40}
+RENDER_VERSION = "1"  # change when rendered output changes to invalidate memo
+MEMO_BYTES = 16 * 2 ** 20  # tmp/pretty size limit
+_memoD = {}  # memory memo: key -> rendered string
+_diskD = {}  # tmp folder -> DiskCache
+_statD = {"memory": 0, "disk": 0, "rendered": 0}
+
+
+class _Unsupported(Exception):
+    """expression construct is not handled by the ast renderer"""
+
+
+class _Box:
+    """block of text lines of equal width with a baseline row"""
+
+    __slots__ = ("lineL", "baseI")
+
+    def __init__(self, lineL: list, baseI: int = 0):
+        widthI = max(len(l) for l in lineL)
+        self.lineL = [l.ljust(widthI) for l in lineL]
+        self.baseI = baseI
+
+    @property
+    def width(self) -> int:
+        return len(self.lineL[0])
+
+    @property
+    def height(self) -> int:
+        return len(self.lineL)
+
+
+def _hjoin(*boxL) -> _Box:
+    """join boxes left to right on their baselines"""
+
+    aboveI = max(b.baseI for b in boxL)
+    belowI = max(b.height - b.baseI - 1 for b in boxL)
+    lineL = [""] * (aboveI + belowI + 1)
+    for box in boxL:
+        blankS = " " * box.width
+        padL = [blankS] * (aboveI - box.baseI)
+        padL += box.lineL
+        padL += [blankS] * (aboveI + belowI + 1 - len(padL))
+        lineL = [a + b for a, b in zip(lineL, padL)]
+    return _Box(lineL, aboveI)
+
+
+def _frac(numB: _Box, denB: _Box) -> _Box:
+    """stack numerator over denominator with a fraction bar
+
+    The bar extends one column each side past a fraction bar in the
+    numerator or denominator, so nested fractions keep their grouping.
+    """
+
+    widthI = max(numB.width, denB.width)
+    if any("─" in l for l in numB.lineL + denB.lineL):
+        widthI += 2
+
+    def center(lineS):
+        leftI = (widthI - len(lineS)) // 2
+        return (" " * leftI + lineS).ljust(widthI)
+
+    lineL = [center(l) for l in numB.lineL]
+    lineL.append("─" * widthI)
+    lineL += [center(l) for l in denB.lineL]
+    return _Box(lineL, numB.height)
+
+
+def _pow(baseB: _Box, expB: _Box) -> _Box:
+    """place exponent above and right of base"""
+
+    lineL = [" " * baseB.width + l for l in expB.lineL]
+    lineL += [l + " " * expB.width for l in baseB.lineL]
+    return _Box(lineL, expB.height + baseB.baseI)
+
+
+def _parens(box: _Box) -> _Box:
+    """enclose box in parentheses sized to its height"""
+
+    if box.height == 1:
+        return _Box(["(" + box.lineL[0] + ")"], 0)
+    lineL = []
+    for i, lineS in enumerate(box.lineL):
+        if i == 0:
+            lineL.append("⎛" + lineS + "⎞")
+        elif i == box.height - 1:
+            lineL.append("⎝" + lineS + "⎠")
+        else:
+            lineL.append("⎜" + lineS + "⎟")
+    return _Box(lineL, box.baseI)
+
+
+def _sqrt(box: _Box) -> _Box:
+    """square root sign for a single line argument"""
+
+    if box.height > 1:
+        raise _Unsupported("multi-line root")
+    if len(box.lineL[0]) == 1:
+        return _Box(["√" + box.lineL[0]], 0)
+    return _Box(["  " + "_" * (box.width + 2), "╲╱ " + box.lineL[0] + " "], 1)
+
+
+def _split_name(nameS: str) -> tuple:
+    """split symbol name into name, superscripts and subscripts"""
+
+    partL = re.split(r"(__|_|\^)", nameS)
+    nameS, supL, subL = partL[0], [], []
+    for sepS, partS in zip(partL[1::2], partL[2::2]):
+        if not partS:
+            continue
+        (subL if sepS == "_" else supL).append(partS)
+    matchO = _digitrgx.match(nameS)
+    if matchO:
+        nameS = matchO.group(1)
+        subL.insert(0, matchO.group(2))
+    return nameS, supL, subL
+
+
+def _greek(nameS: str) -> str:
+    """return Greek letter for letter name or name unchanged"""
+
+    lowS = "lamda" if nameS.lower() == "lambda" else nameS.lower()
+    if lowS not in _greekL:
+        return nameS
+    caseS = "CAPITAL" if nameS[0].isupper() else "SMALL"
+    return unicodedata.lookup("GREEK " + caseS + " LETTER " + lowS.upper())
+
+
+def _script(partL: list, mapD: dict):
+    """return UTF8 sub or superscript string or None if not available"""
+
+    outS = ""
+    for partS in partL:
+        partS = _greek(partS)
+        if not all(c in mapD for c in partS):
+            return None
+        outS += "".join(mapD[c] for c in partS)
+    return outS
+
+
+def pretty_name(nameS: str) -> str:
+    """return UTF8 form of a symbol name
+
+    Args:
+        nameS (str): Python name
+
+    Returns:
+        str: name with Greek letters and sub and superscripts
+    """
+
+    baseS, supL, subL = _split_name(nameS)
+    outS = _greek(baseS)
+    for partL, mapD in ((supL, _supD), (subL, _subD)):
+        if not partL:
+            continue
+        scriptS = _script(partL, mapD)
+        if scriptS is None:
+            sepS = "__" if mapD is _supD else "_"
+            scriptS = sepS + sepS.join(_greek(p) for p in partL)
+        outS += scriptS
+    return outS
+
+
+def _latex_greek(nameS: str) -> str:
+    lowS = "lamda" if nameS.lower() == "lambda" else nameS.lower()
+    if lowS not in _greekL:
+        return nameS
+    texS = "lambda" if lowS == "lamda" else lowS
+    if nameS[0].islower():
+        return "o" if lowS == "omicron" else "\\" + texS
+    latinD = {"alpha": "A", "beta": "B", "epsilon": "E", "zeta": "Z", "eta": "H",
+              "iota": "I", "kappa": "K", "mu": "M", "nu": "N", "omicron": "O",
+              "rho": "P", "tau": "T", "chi": "X"}  # fmt: skip
+    return latinD.get(lowS, "\\" + texS.capitalize())
+
+
+def latex_name(nameS: str) -> str:
+    """return LaTeX form of a symbol name
+
+    Args:
+        nameS (str): Python name
+
+    Returns:
+        str: LaTeX name with Greek letters and sub and superscripts
+    """
+
+    baseS, supL, subL = _split_name(nameS)
+    outS = _latex_greek(baseS)
+    if supL:
+        outS += "^{" + " ".join(_latex_greek(p) for p in supL) + "}"
+    if subL:
+        outS += "_{" + " ".join(_latex_greek(p) for p in subL) + "}"
+    return outS
+
+
+def value_text(valO, fmtO=None) -> str:
+    """return a calc value formatted for substitution into an equation
+
+    Unum values are written as number and unit. Unitless values are written
+    without a unit marker. Arrays, such as batch values, are written as a
+    list of numbers.
+
+    Args:
+        valO: calc value
+        fmtO (Formatter): Unum formatter, defaults to Unum.formatter
+
+    Returns:
+        str: formatted value
+    """
+
+    fmtO = fmtO or Unum.formatter
+    numO = valO._value if isinstance(valO, Unum) else valO
+    if isinstance(numO, ndarray):
+        try:
+            numS = array2string(
+                numO,
+                separator=", ",
+                formatter={"all": lambda v: fmtO["value_format"] % v},
+            )
+        except TypeError:
+            numS = str(numO)  # object arrays
+    elif not isinstance(valO, Unum):
+        return str(valO)
+    else:
+        try:
+            numS = fmtO.format_number(valO)
+        except TypeError:
+            return str(valO)  # list values
+    if not getattr(valO, "_unit", None):
+        return numS
+    return numS + " " + fmtO.format_unit(valO)
+
+
+def latex_text(valS: str) -> str:
+    """return LaTeX for a formatted value such as '1.50 kips/ft'
+
+    Args:
+        valS (str): number, optionally followed by a unit
+
+    Returns:
+        str: LaTeX string with the unit in roman type
+    """
+
+    partL = valS.strip().split(" ", 1)
+    if len(partL) == 1:
+        return partL[0]
+    unitS = _unsuprgx.sub(
+        lambda m: "^{" + "".join(_unsupD[c] for c in m.group()) + "}", partL[1]
+    )
+    unitS = unitS.replace("·", " \\cdot ").replace("*", " \\cdot ")
+    return partL[0] + "\\ \\mathrm{" + unitS.strip() + "}"
+
+
+def _normalize(node):
+    """rewrite (a/b)/c as a/(b*c) so chained divisions form one fraction"""
+
+    if isinstance(node, ast.BinOp):
+        node.left = _normalize(node.left)
+        node.right = _normalize(node.right)
+        if (
+            isinstance(node.op, ast.Div)
+            and isinstance(node.left, ast.BinOp)
+            and isinstance(node.left.op, ast.Div)
+        ):
+            denN = ast.BinOp(left=node.left.right, op=ast.Mult(), right=node.right)
+            return ast.BinOp(left=node.left.left, op=ast.Div(), right=denN)
+    elif isinstance(node, ast.UnaryOp):
+        node.operand = _normalize(node.operand)
+    elif isinstance(node, ast.Call):
+        node.args = [_normalize(a) for a in node.args]
+    return node
+
+
+def _parse(exprS: str):
+    """return normalized expression tree"""
+
+    try:
+        treeN = ast.parse(exprS.strip(), mode="eval").body
+    except SyntaxError as error:
+        raise _Unsupported("syntax") from error
+    return _normalize(treeN)
+
+
+def _prec(node) -> int:
+    """binding strength of node for parenthesizing"""
+
+    if isinstance(node, ast.BinOp):
+        try:
+            return _PREC[type(node.op)]
+        except KeyError:
+            raise _Unsupported(type(node.op).__name__)
+    if isinstance(node, ast.UnaryOp):
+        return 30
+    return 100
+
+
+def _is_frac(node) -> bool:
+    return isinstance(node, ast.BinOp) and isinstance(node.op, ast.Div)
+
+
+def _needs_parens(node, parent, rightB: bool) -> bool:
+    """True if child node is enclosed in parentheses under parent"""
+
+    if _is_frac(node):
+        return isinstance(parent, ast.BinOp) and isinstance(parent.op, ast.Pow) \
+            and not rightB
+    childI, parentI = _prec(node), _prec(parent)
+    if isinstance(parent, ast.BinOp) and isinstance(parent.op, ast.Pow):
+        return not rightB and childI < 100
+    if isinstance(node, ast.UnaryOp) and rightB:
+        return True
+    if childI < parentI:
+        return True
+    return rightB and childI == parentI and isinstance(parent.op, ast.Sub)
+
+
+def _wrap_value(valS: str, parent, rightB: bool) -> bool:
+    """True if a substituted value is enclosed in parentheses under parent"""
+
+    if parent is None or not (" " in valS.strip() or valS.lstrip()[:1] == "-"):
+        return False
+    if isinstance(parent, ast.UnaryOp):
+        return True
+    opT = type(parent.op)
+    if opT is ast.Pow:
+        return not rightB
+    return opT is ast.Mult or (opT is ast.Sub and rightB)
+
+
+def _layers(func, *layerLL) -> list:
+    """apply func to each layer of the argument layer lists"""
+
+    return [func(*argT) for argT in zip(*layerLL)]
+
+
+class _Renderer:
+    """walks an expression tree and returns UTF8 boxes or LaTeX strings
+
+    Each walk returns one result per layer. Layer 0 has symbol names. If a
+    substitution function is given, layer 1 has the text it returns for each
+    name, so the symbolic and substituted forms come from one traversal.
+    """
+
+    def __init__(self, exprS: str, subF=None):
+        """
+        Args:
+            exprS (str): Python expression
+            subF (function): returns value text for a name, or None to keep
+                the name
+        """
+        self.exprS = exprS.strip()
+        self.subF = subF
+
+    def _number(self, node) -> str:
+        if isinstance(node.value, bool) or not isinstance(
+            node.value, (int, float)
+        ):
+            raise _Unsupported("constant")
+        return ast.get_source_segment(self.exprS, node) or repr(node.value)
+
+    def _call(self, node) -> tuple:
+        if not isinstance(node.func, ast.Name) or node.keywords:
+            raise _Unsupported("call")
+        if any(isinstance(a, ast.Starred) for a in node.args):
+            raise _Unsupported("call")
+        return node.func.id, node.args
+
+    def _leaf(self, node, parent, rightB, nameF, valueF, wrapF) -> list:
+        """return layers for a name"""
+
+        layerL = [nameF(node.id)]
+        if self.subF is not None:
+            valS = self.subF(node.id)
+            if valS is None:
+                layerL.append(layerL[0])
+            else:
+                valO = valueF(valS)
+                if _wrap_value(valS, parent, rightB):
+                    valO = wrapF(valO)
+                layerL.append(valO)
+        return layerL
+
+    def _same(self, valO) -> list:
+        return [valO] * (1 if self.subF is None else 2)
+
+    def box(self, node, parent=None, rightB=False) -> list:
+        """return UTF8 boxes for node"""
+
+        if parent is not None and _needs_parens(node, parent, rightB):
+            return _layers(_parens, self.box(node))
+        if isinstance(node, ast.Name):
+            return self._leaf(
+                node,
+                parent,
+                rightB,
+                lambda n: _Box([pretty_name(n)]),
+                lambda v: _Box(v.split("\n")),
+                _parens,
+            )
+        if isinstance(node, ast.Constant):
+            return self._same(_Box([self._number(node)]))
+        if isinstance(node, ast.UnaryOp):
+            if not isinstance(node.op, (ast.USub, ast.UAdd)):
+                raise _Unsupported(type(node.op).__name__)
+            signB = _Box(["-" if isinstance(node.op, ast.USub) else "+"])
+            return _layers(lambda b: _hjoin(signB, b), self.box(node.operand, node))
+        if isinstance(node, ast.Call):
+            funcS, argL = self._call(node)
+            boxLL = [self.box(a) for a in argL]
+            if funcS == "sqrt" and len(boxLL) == 1:
+                return _layers(_sqrt, boxLL[0])
+
+            def call(*boxL):
+                argB = boxL[0] if boxL else _Box([""])
+                for b in boxL[1:]:
+                    argB = _hjoin(argB, _Box([", "]), b)
+                return _hjoin(_Box([funcS]), _parens(argB))
+
+            return _layers(call, *boxLL) if boxLL else self._same(call())
+        if isinstance(node, ast.BinOp):
+            opT = type(node.op)
+            if opT is ast.Div:
+                return _layers(_frac, self.box(node.left), self.box(node.right))
+            if opT is ast.Pow:
+                return _layers(_pow, self.box(node.left, node), self.box(node.right))
+            opS = {ast.Mult: "⋅", ast.Add: " + ", ast.Sub: " - "}.get(opT)
+            if opS is None:
+                raise _Unsupported(opT.__name__)
+            opB = _Box([opS])
+            return _layers(
+                lambda l, r: _hjoin(l, opB, r),
+                self.box(node.left, node),
+                self.box(node.right, node, True),
+            )
+        raise _Unsupported(type(node).__name__)
+
+    def latex(self, node, parent=None, rightB=False) -> list:
+        """return LaTeX strings for node"""
+
+        if parent is not None and _needs_parens(node, parent, rightB):
+            return _layers(lambda t: "\\left(" + t + "\\right)", self.latex(node))
+        if isinstance(node, ast.Name):
+            return self._leaf(
+                node,
+                parent,
+                rightB,
+                latex_name,
+                latex_text,
+                lambda t: "\\left(" + t + "\\right)",
+            )
+        if isinstance(node, ast.Constant):
+            return self._same(self._number(node))
+        if isinstance(node, ast.UnaryOp):
+            if not isinstance(node.op, (ast.USub, ast.UAdd)):
+                raise _Unsupported(type(node.op).__name__)
+            signS = "- " if isinstance(node.op, ast.USub) else "+ "
+            return _layers(lambda t: signS + t, self.latex(node.operand, node))
+        if isinstance(node, ast.Call):
+            funcS, argL = self._call(node)
+            argLL = [self.latex(a) for a in argL]
+            if funcS == "sqrt" and len(argL) == 1:
+                return _layers(lambda t: "\\sqrt{" + t + "}", argLL[0])
+            if funcS in _latexfuncL:
+                headS = "\\" + funcS
+            else:
+                headS = "\\operatorname{" + funcS + "}"
+
+            def call(*argL):
+                return headS + "{\\left(" + ", ".join(argL) + " \\right)}"
+
+            return _layers(call, *argLL) if argLL else self._same(call())
+        if isinstance(node, ast.BinOp):
+            opT = type(node.op)
+            if opT is ast.Div:
+                return _layers(
+                    lambda n, d: "\\frac{" + n + "}{" + d + "}",
+                    self.latex(node.left),
+                    self.latex(node.right),
+                )
+            if opT is ast.Pow:
+                return _layers(
+                    lambda b, e: b + "^{" + e + "}",
+                    self.latex(node.left, node),
+                    self.latex(node.right),
+                )
+            opS = {ast.Mult: " \\cdot ", ast.Add: " + ", ast.Sub: " - "}.get(opT)
+            if opS is None:
+                raise _Unsupported(opT.__name__)
+            return _layers(
+                lambda l, r: l + opS + r,
+                self.latex(node.left, node),
+                self.latex(node.right, node, True),
+            )
+        raise _Unsupported(type(node).__name__)
+
+
+def _sympy_eq(varS: str, exprS: str):
+    """return unevaluated sympy equation"""
+
+    spS = "Eq(" + varS + ",(" + exprS + "))"
+    return sp.sympify(spS, _abc._clash2, evaluate=False)
+
+
+def _memo(kindS: str, varS: str, exprS: str, mpath, renderF) -> str:
+    """return memoized rendering or render and store it
+
+    Args:
+        kindS (str): renderer and options
+        varS (str): assigned name
+        exprS (str): Python expression
+        mpath (Path): project tmp folder for the disk memo, or None
+        renderF (function): renders varS, exprS if not memoized
+    """
+
+    keyS = hashlib.sha1(
+        "\n".join([RENDER_VERSION, kindS, varS.strip(), exprS.strip()]).encode("utf-8")
+    ).hexdigest()
+    outS = _memoD.get(keyS)
+    if outS is not None:
+        _statD["memory"] += 1
+        return outS
+    cacheO = None
+    if mpath is not None and Path(mpath).is_dir():
+        cacheO = _diskD.get(str(mpath))
+        if cacheO is None:
+            cacheO = _rc_cache.DiskCache(Path(mpath, "pretty"), MEMO_BYTES)
+            _diskD[str(mpath)] = cacheO
+        outS = cacheO.get(keyS)
+        if outS is not None:
+            _statD["disk"] += 1
+            _memoD[keyS] = outS
+            return outS
+    outS = renderF(varS, exprS)
+    _statD["rendered"] += 1
+    _memoD[keyS] = outS
+    if cacheO is not None:
+        cacheO.set(keyS, outS)
+    return outS
+
+
+def _pretty_eq(varS: str, exprS: str) -> str:
+    try:
+        rendO = _Renderer(exprS)
+        eqB = _hjoin(
+            _Box([pretty_name(varS.strip())]),
+            _Box([" = "]),
+            rendO.box(_parse(exprS))[0],
+        )
+        return "\n".join(eqB.lineL)
+    except _Unsupported as error:
+        logging.debug("equation rendered with sympy (" + str(error) + "): " + exprS)
+    try:
+        return sp.pretty(_sympy_eq(varS, exprS))
+    except Exception as error:
+        logging.debug("equation written as text (" + str(error) + "): " + exprS)
+    return pretty_name(varS.strip()) + " = " + exprS.strip()
+
+
+def _latex_eq(varS: str, exprS: str) -> str:
+    try:
+        rendO = _Renderer(exprS)
+        return latex_name(varS.strip()) + " = " + rendO.latex(_parse(exprS))[0]
+    except _Unsupported as error:
+        logging.debug("equation rendered with sympy (" + str(error) + "): " + exprS)
+    try:
+        return sp.latex(_sympy_eq(varS, exprS), mul_symbol="dot")
+    except Exception as error:
+        logging.debug("equation written as text (" + str(error) + "): " + exprS)
+    textS = re.sub(r"([{}_#%&$])", r"\\\1", exprS.strip())
+    return latex_name(varS.strip()) + r" = \texttt{" + textS + "}"
+
+
+def sub_values(exprS: str, valD: dict, fmtO=None) -> dict:
+    """return value text for each calc value name in an expression
+
+    Units are simplified as in the equation table.
+
+    Args:
+        exprS (str): Python expression
+        valD (dict): calc values
+        fmtO (Formatter): Unum formatter, defaults to Unum.formatter
+
+    Returns:
+        dict: name -> value text
+    """
+
+    subD = {}
+    for nameS in names(exprS):
+        if nameS in valD:
+            valO = valD[nameS]
+            if isinstance(valO, Unum):
+                valO = valO.copy().simplify_unit()  # in place
+            subD[nameS] = value_text(valO, fmtO)
+    return subD
+
+
+def pretty_sub(varS: str, exprS: str, subF, resultS: str) -> tuple:
+    """return UTF8 layouts of an equation and of its substituted values
+
+    Both layouts come from one traversal of the expression. The second
+    layout is followed by the formatted result. Expressions the ast renderer
+    does not handle are rendered with sympy and show the result only.
+
+    Args:
+        varS (str): assigned name
+        exprS (str): Python expression
+        subF (function): returns value text for a name, or None to keep it
+        resultS (str): formatted result
+
+    Returns:
+        tuple: symbolic layout, substituted layout
+    """
+
+    nameB = _Box([pretty_name(varS.strip())])
+    eqB = _Box([" = "])
+    try:
+        symB, subB = _Renderer(exprS, subF).box(_parse(exprS))
+    except _Unsupported as error:
+        logging.debug("substitution not rendered (" + str(error) + "): " + exprS)
+        resB = _Box([resultS])
+        return _pretty_eq(varS, exprS), "\n".join(_hjoin(nameB, eqB, resB).lineL)
+    symS = "\n".join(_hjoin(nameB, eqB, symB).lineL)
+    subS = "\n".join(_hjoin(nameB, eqB, subB, eqB, _Box([resultS])).lineL)
+    return symS, subS
+
+
+def latex_sub(varS: str, exprS: str, subF, resultS: str) -> tuple:
+    """return LaTeX for an equation and for its substituted values
+
+    Args:
+        varS (str): assigned name
+        exprS (str): Python expression
+        subF (function): returns value text for a name, or None to keep it
+        resultS (str): formatted result
+
+    Returns:
+        tuple: symbolic LaTeX, substituted LaTeX
+    """
+
+    nameS = latex_name(varS.strip()) + " = "
+    partL = resultS.split("  [", 1)  # result and [converted result]
+    resS = latex_text(partL[0])
+    if len(partL) == 2:
+        convS = partL[1][:-1] if partL[1].endswith("]") else partL[1]
+        resS += " \\quad \\left[" + latex_text(convS) + "\\right]"
+    try:
+        symS, subS = _Renderer(exprS, subF).latex(_parse(exprS))
+    except _Unsupported as error:
+        logging.debug("substitution not rendered (" + str(error) + "): " + exprS)
+        return _latex_eq(varS, exprS), nameS + resS
+    return nameS + symS, nameS + subS + " = " + resS
+
+
+def pretty_eq(varS: str, exprS: str, mpath: Path = None) -> str:
+    """return UTF8 layout of equation varS = exprS
+
+    Args:
+        varS (str): assigned name
+        exprS (str): Python expression
+        mpath (Path): project tmp folder for the disk memo
+
+    Returns:
+        str: multi-line UTF8 string
+    """
+
+    return _memo("pretty:unicode", varS, exprS, mpath, _pretty_eq)
+
+
+def latex_eq(varS: str, exprS: str, mpath: Path = None) -> str:
+    """return LaTeX for equation varS = exprS
+
+    Args:
+        varS (str): assigned name
+        exprS (str): Python expression
+        mpath (Path): project tmp folder for the disk memo
+
+    Returns:
+        str: LaTeX string
+    """
+
+    return _memo("latex:mul_symbol=dot", varS, exprS, mpath, _latex_eq)
+
+
+class _LatexParser:
+    """sympy LaTeX parser with one ANTLR lexer and parser per process
+
+    The lexer and parser are built on first use and reset for each string.
+    If the sympy parser internals cannot be loaded the public parse_latex
+    function is used.
+    """
+
+    def __init__(self):
+        self.antlr4 = None
+        self.antlrmod = None
+        self.lexer = None
+        self.parser = None
+        self.warmB = None  # None - not built, False - use parse_latex
+
+    def _build(self):
+        """build lexer and parser"""
+
+        try:
+            self.antlr4 = importlib.import_module("antlr4")
+            self.antlrmod = importlib.import_module(
+                "sympy.parsing.latex._parse_latex_antlr"
+            )
+            self.lexer = self.antlrmod.LaTeXLexer(self.antlr4.InputStream(""))
+            self.parser = self.antlrmod.LaTeXParser(
+                self.antlr4.CommonTokenStream(self.lexer)
+            )
+            self.warmB = True
+        except Exception as error:
+            logging.debug("LaTeX parser is built per tag: " + str(error))
+            self.warmB = False
+
+    def parse(self, txS: str):
+        """return sympy expression for LaTeX string
+
+        Args:
+            txS (str): LaTeX math
+
+        Returns:
+            sympy expression or relation
+        """
+
+        if self.warmB is None:
+            self._build()
+        if not self.warmB:
+            return parse_latex(txS)
+        txS = txS.strip()
+        errO = self.antlrmod.MathErrorListener(txS)
+        for recogO in (self.lexer, self.parser):
+            recogO.removeErrorListeners()
+            recogO.addErrorListener(errO)
+        self.lexer.inputStream = self.antlr4.InputStream(txS)  # resets lexer
+        self.parser.setTokenStream(self.antlr4.CommonTokenStream(self.lexer))
+        return self.antlrmod.convert_relation(self.parser.math().relation())
+
+
+_latexparser = _LatexParser()
+
+
+def _pretty_latex(varS: str, txS: str) -> str:
+    exprO = _latexparser.parse(txS)
+    return sp.pretty(sp.sympify(exprO, _abc._clash2, evaluate=False))
+
+
+def pretty_latex(txS: str, mpath: Path = None) -> str:
+    """return UTF8 layout of LaTeX math from an [x]_ tag
+
+    Args:
+        txS (str): LaTeX math
+        mpath (Path): project tmp folder for the disk memo
+
+    Returns:
+        str: multi-line UTF8 string
+    """
+
+    return _memo("latex-tag:pretty", "", txS, mpath, _pretty_latex)
+
+
+def memo_stats() -> dict:
+    """return memo counts
+
+    Returns:
+        dict: memory hits, disk hits and rendered equations
+    """
+
+    return dict(_statD)
+
+
+def names(exprS: str) -> list:
+    """return names used as values in an expression, in order of appearance
+
+    Function names are not included.
+
+    Args:
+        exprS (str): Python expression
+
+    Returns:
+        list: names
+    """
+
+    try:
+        treeN = ast.parse(exprS.strip(), mode="eval")
+    except SyntaxError:
+        return [str(s) for s in sp.sympify(exprS).atoms(sp.Symbol)]
+    funcL = {id(n.func) for n in ast.walk(treeN) if isinstance(n, ast.Call)}
+    nodeL = [
+        n for n in ast.walk(treeN) if isinstance(n, ast.Name) and id(n) not in funcL
+    ]
+    nameL = []
+    for node in sorted(nodeL, key=lambda n: (n.lineno, n.col_offset)):
+        if node.id not in nameL:
+            nameL.append(node.id)
+    return nameL
+
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+
+    texL = [
+        r"\frac{a}{b} + c^{2}",
+        r"\sigma = \frac{M y}{I}",
+        r"\sqrt{x^{2} + y^{2}}",
+        r"f_{c} = 0.85 \cdot \beta_{1} \cdot a",
+    ]
+    repI = 20
+
+    def _bench(labelS, renderF, setupF=None):
+        totalF = 0.0
+        for i in range(repI):
+            if setupF is not None:
+                setupF(i)  # not timed
+            startF = time.perf_counter()
+            for txS in texL:
+                renderF(txS)
+            totalF += time.perf_counter() - startF
+        msF = 1000 * totalF / (repI * len(texL))
+        print("  " + labelS.ljust(34) + "%8.3f ms/tag" % msF)
+
+    def _public(txS):
+        exprO = parse_latex(txS)
+        return sp.pretty(sp.sympify(exprO, _abc._clash2, evaluate=False))
+
+    try:
+        _public(texL[0])
+    except Exception as error:
+        print("INFO  LaTeX parser not available: " + str(error).split("\n")[0])
+        raise SystemExit(1)
+    with tempfile.TemporaryDirectory() as tmpS:
+        stateD = {"folder": None}
+
+        def _cold(i):
+            _memoD.clear()
+            stateD["folder"] = Path(tmpS, "cold" + str(i))
+            stateD["folder"].mkdir()
+
+        def _disk(i):
+            _memoD.clear()
+
+        print("INFO  [x]_ tag rendering, %d tags x %d" % (len(texL), repI))
+        _bench("parse_latex per tag (before)", _public)
+        _bench("reused lexer and parser", lambda t: _pretty_latex("", t))
+        _bench("cold memo", lambda t: pretty_latex(t, stateD["folder"]), _cold)
+        for txS in texL:
+            pretty_latex(txS, tmpS)  # fill disk memo
+        _bench("disk memo (new process)", lambda t: pretty_latex(t, tmpS), _disk)
+        _bench("memory memo", lambda t: pretty_latex(t, tmpS))
@@ -0,0 +1,164 @@
+#! python
+"""registry of rivt-string commands and tags
+
+Commands and tags are registered for an output backend ('utf' or 'rst') and
+rivt-string types ('repository', 'insert', 'values', 'table'). A handler is
+the name of a backend method, or a function that takes the backend instance
+as its first argument, so commands and tags can be added without editing
+the backends:
+
+    def _note(calcO, argL):
+        calcO.calcS += "NOTE: " + argL[1].strip() + "\\n"
+
+    rc_reg.register_command("note", _note, ["utf"], ["insert"], 1)
+
+Command handlers take the command arguments as split on |. Tag handlers take
+the line with the tag and return the formatted line. A tagged line is
+dispatched with one regular expression search and a dictionary lookup."""
+
+import re
+from functools import partial
+
+TYPE_D = {"R": "repository", "I": "insert", "V": "values", "T": "table"}
+BACKEND_L = ["utf", "rst"]
+_tagrgx = re.compile(r"(?<!\S)\[[^\]\s]+\]_(?!\S)")  # tag separated by spaces
+_cmdD = {b: {t: {} for t in TYPE_D.values()} for b in BACKEND_L}
+_tagD = {b: {t: {} for t in TYPE_D.values()} for b in BACKEND_L}
+_argD = {}  # (string type, command) -> minimum arguments
+
+
+def register_command(
+    nameS: str,
+    handler,
+    backendL: list = BACKEND_L,
+    typeL: list = ("insert", "values", "table"),
+    argsI: int = 0,
+):
+    """register command handler
+
+    Args:
+        nameS (str): command name as written after ||
+        handler (str or function): backend method name, or function of the
+            backend instance and the argument list
+        backendL (list): output backends
+        typeL (list): rivt-string types
+        argsI (int): minimum number of arguments after the command name
+    """
+
+    for backendS in backendL:
+        for typeS in typeL:
+            _cmdD[backendS][typeS][nameS] = handler
+    for typeS in typeL:
+        _argD[(typeS, nameS)] = argsI
+
+
+def register_tag(
+    tagS: str,
+    handler,
+    backendL: list = BACKEND_L,
+    typeL: list = ("insert", "values", "table"),
+):
+    """register tag handler
+
+    Args:
+        tagS (str): tag including brackets and underscore, e.g. [e]_
+        handler (str or function): backend method name, or function of the
+            backend instance and the tagged line that returns the output
+        backendL (list): output backends
+        typeL (list): rivt-string types
+    """
+
+    for backendS in backendL:
+        for typeS in typeL:
+            _tagD[backendS][typeS][tagS] = handler
+
+
+def commands(backendS: str, typeS: str) -> dict:
+    """return command handlers of a backend and string type"""
+
+    return _cmdD[backendS][typeS]
+
+
+def tags(backendS: str, typeS: str) -> dict:
+    """return tag handlers of a backend and string type"""
+
+    return _tagD[backendS][typeS]
+
+
+def arguments(typeS: str, nameS: str) -> int:
+    """return minimum number of arguments of a command"""
+
+    return _argD.get((typeS, nameS), 0)
+
+
+def bind(calcO, handlerD: dict) -> dict:
+    """return handlers as functions bound to a backend instance
+
+    Args:
+        calcO: backend instance (OutputUTF or OutputRST)
+        handlerD (dict): handlers from commands or tags
+
+    Returns:
+        dict: name -> function of the remaining handler arguments
+    """
+
+    return {
+        k: getattr(calcO, h) if isinstance(h, str) else partial(h, calcO)
+        for k, h in handlerD.items()
+    }
+
+
+def find_tag(textS: str, tagD: dict):
+    """return handler of the first registered tag in a line, or None
+
+    Args:
+        textS (str): line with tags
+        tagD (dict): tag handlers
+    """
+
+    for tagS in _tagrgx.findall(textS):
+        if tagS in tagD:
+            return tagD[tagS]
+    return None
+
+
+# built in commands ------------------------------------------------------------
+for _nameS, _methS, _argsI in [
+    ("search", "_rsearch", 0),
+    ("keys", "_rkeys", 0),
+    ("info", "_rinfo", 0),
+    ("pdf", "_rpdf", 0),
+]:
+    register_command(_nameS, _methS, BACKEND_L, ["repository"], _argsI)
+register_command("text", "_itext", BACKEND_L, ["repository"], 0)
+register_command("table", "_itable", BACKEND_L, ["repository"], 0)
+register_command("text", "_itext", argsI=2)
+register_command("table", "_itable", argsI=1)
+register_command("image", "_iimage", argsI=2)
+register_command("latex", "_ilatex", ["utf"], ["table"], 2)
+for _nameS, _methS, _argsI in [
+    ("config", "_vconfig", 2),
+    ("value", "_vvalue", 1),
+    ("data", "_vdata", 3),
+    ("func", "_vfunc", 2),
+]:
+    register_command(_nameS, _methS, BACKEND_L, ["values"], _argsI)
+
+# built in tags ----------------------------------------------------------------
+register_tag("[literal]_", "_tagliteral", ["utf"], TYPE_D.values())
+register_tag("[foot]_", "_tagfoot", BACKEND_L, TYPE_D.values())
+for _tagS, _methS in [
+    ("[#]_", "_tagmark"),
+    ("[page]_", "_tagpage"),
+    ("[line]_", "_tagline"),
+    ("[link]_", "_taglink"),
+    ("[r]_", "_tagright"),
+    ("[c]_", "_tagcenter"),
+    ("[f]_", "_tagfigure"),
+    ("[e]_", "_tagequation"),
+    ("[t]_", "_tagtable"),
+]:
+    register_tag(_tagS, _methS)
+register_tag("[latex]_", "_tagliteral", ["utf"])
+register_tag("[x]_", "_tagtex", BACKEND_L, ["insert", "values"])
+register_tag("[s]_", "_tagsympy", BACKEND_L, ["insert", "values"])
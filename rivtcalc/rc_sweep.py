@@ -0,0 +1,237 @@
+#! python
+"""runs a calc for each row of a case file
+
+    python -m rivtcalc sweep calc.py cases.csv [--results=M1,V1] [--workers=4]
+
+The header row of the case file names V() input values. For each row the calc
+is run with the row values replacing the assigned values, which are written
+in the units of the assignment. Cases run in a pool of worker processes that
+import rivtcalc once and keep compiled rivt-strings and equations between
+cases. Docs are not written. Results are written to a csv file next to the
+case file and a summary table is printed."""
+
+import os
+import csv
+import sys
+import time
+import logging
+from pathlib import Path
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+
+import rivtcalc.rc_lazy as _rc_lazy
+import rivtcalc.rc_ir as _rc_ir
+import rivtcalc.rc_lib as _rc_lib
+import rivtcalc.rc_out as _rc_out
+import rivtcalc.rc_eval as _rc_eval
+import rivtcalc.rc_unit as _rc_unit
+from rivtcalc.rc_unit import Unum
+
+tabulate = _rc_lazy.lazy_attr("tabulate", "tabulate")
+
+
+def read_cases(casefileS: str) -> tuple:
+    """return input names and case rows from a case file
+
+    Args:
+        casefileS (str): csv file with a header row of input names
+
+    Returns:
+        tuple: input names, list of case dictionaries
+    """
+
+    with open(casefileS, "r", newline="") as csvF:
+        readL = [r for r in csv.reader(csvF) if any(c.strip() for c in r)]
+    nameL = [n.strip() for n in readL[0]]
+    caseL = []
+    for rowL in readL[1:]:
+        caseL.append({n: c.strip() for n, c in zip(nameL, rowL) if c.strip()})
+    return nameL, caseL
+
+
+def _units(sessO) -> dict:
+    """return first unit of each assignment in the V strings of a session"""
+
+    unitD = {}
+    for entryD in sessO.journalL:
+        if entryD["typeS"] != "V":
+            continue
+        strL = entryD["rawS"].split("\n")[1:]
+        for node in _rc_ir.compile_str(strL, "values"):
+            if node.kindS in ("assign", "equation") and len(node.argL) > 1:
+                unitD[node.varS] = node.argL[1].split(",")[0].strip()
+    return unitD
+
+
+def _result(valO, unitS: str) -> tuple:
+    """return number and unit string for a calc value
+
+    Args:
+        valO: calc value
+        unitS (str): unit expression to cast Unum values to, or '-'
+    """
+
+    if not isinstance(valO, Unum):
+        return valO, ""
+    try:
+        valU = valO.cast_unit(eval(_rc_eval.compiled(unitS), vars(_rc_unit)))
+    except Exception:  # unitless or not a unit of the value
+        valU = valO.copy().simplify_unit()
+    return valU.number(), _rc_eval.FormatContext().unit(valU)
+
+
+def run_case(calcfileS: str, caseD: dict, resultL: list) -> dict:
+    """run calc for one case and return results
+
+    Args:
+        calcfileS (str): calc file path
+        caseD (dict): input expression strings keyed by name
+        resultL (list): result names, or empty for all equation results
+
+    Returns:
+        dict: results as (number, unit) keyed by name, input names that were
+            not assigned and the error message if the calc failed
+    """
+
+    sessO = _rc_lib.CalcSession(
+        calcfileS, cacheB=False, docB=False, overD=caseD, quietB=True
+    )
+    try:
+        with redirect_stdout(_rc_out.NullSink()):
+            sessO.run()
+    except Exception as error:
+        errorS = type(error).__name__ + ": " + str(error)
+        return {"valD": {}, "unusedL": [], "errorS": errorS}
+    if not resultL:
+        resultL = [
+            rowL[1]
+            for entryD in sessO.journalL
+            for rowL in entryD["evalL"]
+            if rowL[0] == "equation"
+        ]
+    rivtD = sessO.rivtcalcD
+    unitD = _units(sessO)
+    valD = {n: _result(rivtD[n], unitD.get(n, "-")) for n in resultL if n in rivtD}
+    unusedL = [n for n in caseD if n not in rivtD]
+    return {"valD": valD, "unusedL": unusedL, "errorS": ""}
+
+
+def _run_chunk(argT: tuple) -> list:
+    """run a list of cases in a worker process"""
+
+    calcfileS, caseL, resultL = argT
+    return [run_case(calcfileS, caseD, resultL) for caseD in caseL]
+
+
+def sweep(
+    calcfileS: str,
+    casefileS: str,
+    resultL: list = None,
+    workersI: int = None,
+    outfileS: str = None,
+) -> list:
+    """run calc for each case and write results
+
+    Args:
+        calcfileS (str): calc file path
+        casefileS (str): case file path
+        resultL (list): result names, or None for all equation results
+        workersI (int): worker processes, defaults to the cpu count
+        outfileS (str): results file, defaults to <case file>_results.csv
+
+    Returns:
+        list: result dictionaries in case order
+    """
+
+    startF = time.perf_counter()
+    calcfileS = str(Path(calcfileS).resolve())
+    resultL = list(resultL or [])
+    nameL, caseL = read_cases(casefileS)
+    workersI = max(1, min(workersI or os.cpu_count() or 1, len(caseL)))
+    sizeI = max(1, -(-len(caseL) // (workersI * 4)))  # chunks per worker
+    chunkL = [
+        (calcfileS, caseL[i : i + sizeI], resultL)
+        for i in range(0, len(caseL), sizeI)
+    ]
+    outL = []
+    if workersI == 1:
+        for argT in chunkL:
+            outL.extend(_run_chunk(argT))
+    else:
+        with ProcessPoolExecutor(max_workers=workersI) as pool:
+            for chunkresL in pool.map(_run_chunk, chunkL):
+                outL.extend(chunkresL)
+
+    if not resultL:  # names from the first case that ran
+        resultL = next((list(o["valD"]) for o in outL if not o["errorS"]), [])
+    unusedL = sorted({n for o in outL for n in o["unusedL"]})
+    if unusedL:
+        logging.warning("case inputs not assigned in calc: " + ", ".join(unusedL))
+    caseP = Path(casefileS)
+    outfileP = Path(outfileS or Path(caseP.parent, caseP.stem + "_results.csv"))
+    with open(outfileP, "w", newline="") as csvF:
+        writer = csv.writer(csvF)
+        hdrL = ["case"] + nameL
+        for nameS in resultL:
+            hdrL += [nameS, nameS + "_unit"]
+        writer.writerow(hdrL + ["error"])
+        for caseI, (caseD, outD) in enumerate(zip(caseL, outL), 1):
+            rowL = [caseI] + [caseD.get(n, "") for n in nameL]
+            for nameS in resultL:
+                rowL += list(outD["valD"].get(nameS, ("", "")))
+            writer.writerow(rowL + [outD["errorS"]])
+
+    print(summary(resultL, outL))
+    errorI = sum(1 for o in outL if o["errorS"])
+    print(
+        "INFO  sweep: %d cases, %d errors, %d workers, %.2f s"
+        % (len(outL), errorI, workersI, time.perf_counter() - startF)
+    )
+    print("INFO  results written to " + str(outfileP), flush=True)
+    return outL
+
+
+def summary(resultL: list, outL: list) -> str:
+    """return table of result ranges over the cases
+
+    Args:
+        resultL (list): result names
+        outL (list): result dictionaries in case order
+
+    Returns:
+        str: table with unit, minimum, maximum and governing case
+    """
+
+    tblL = []
+    for nameS in resultL:
+        caseL = [
+            (o["valD"][nameS][0], i, o["valD"][nameS][1])
+            for i, o in enumerate(outL, 1)
+            if nameS in o["valD"]
+        ]
+        try:
+            minT, maxT = min(caseL), max(caseL)
+        except (TypeError, ValueError):  # no cases or values not comparable
+            tblL.append([nameS, "", "", "", ""])
+            continue
+        tblL.append([nameS, maxT[2], minT[0], maxT[0], maxT[1]])
+    hdrL = ["result", "unit", "minimum", "maximum", "case of max"]
+    return tabulate(tblL, headers=hdrL, tablefmt="rst", floatfmt=".4g")
+
+
+def main(argL: list):
+    """run sweep from command line arguments
+
+    Args:
+        argL (list): arguments after 'sweep'
+    """
+
+    fileL = [a for a in argL if not a.startswith("--")]
+    optD = dict(a[2:].split("=", 1) for a in argL if a.startswith("--") and "=" in a)
+    if len(fileL) != 2:
+        print("usage: python -m rivtcalc sweep calc.py cases.csv")
+        print("           [--results=name,name] [--workers=n] [--out=file.csv]")
+        sys.exit(1)
+    resultL = [n.strip() for n in optD.get("results", "").split(",") if n.strip()]
+    workersI = int(optD["workers"]) if "workers" in optD else None
+    sweep(fileL[0], fileL[1], resultL, workersI, optD.get("out"))
@@ -14,29 +14,29 @@ import re
 import io
 import logging
 import numpy.linalg as la
-import pandas as pd
-import sympy as sp
-import matplotlib.pyplot as plt
-import matplotlib.image as mpimg
-from IPython.display import display as _display
-from IPython.display import Image as _Image
-from io import StringIO
-from sympy.parsing.latex import parse_latex
-from sympy.abc import _clash2
-from sympy.core.alphabets import greeks
-from tabulate import tabulate
+import rivtcalc.rc_lazy as _rc_lazy
+import rivtcalc.rc_ir as _rc_ir
+import rivtcalc.rc_eval as _rc_eval
+import rivtcalc.rc_pretty as _rc_pretty
+import rivtcalc.rc_func as _rc_func
+import rivtcalc.rc_reg as _rc_reg
+import rivtcalc.rc_out as _rc_out
 from pathlib import Path
 from numpy import *
-from IPython.display import display as _display
-from IPython.display import Image as _Image
-
-try:
-    from PIL import Image as PImage
-    from PIL import ImageOps as PImageOps
-except:
-    pass
 from rivtcalc.rc_unit import *
 
+# heavy libraries are imported on first use
+pd = _rc_lazy.lazy_module("pandas")
+sp = _rc_lazy.lazy_module("sympy")
+plt = _rc_lazy.lazy_module("matplotlib.pyplot")
+mpimg = _rc_lazy.lazy_module("matplotlib.image")
+_abc = _rc_lazy.lazy_module("sympy.abc")
+PImage = _rc_lazy.lazy_module("PIL.Image")
+PImageOps = _rc_lazy.lazy_module("PIL.ImageOps")
+tabulate = _rc_lazy.lazy_attr("tabulate", "tabulate")
+_display = _rc_lazy.lazy_attr("IPython.display", "display")
+_Image = _rc_lazy.lazy_attr("IPython.display", "Image")
+
 logging.getLogger("numexpr").setLevel(logging.WARNING)
 
 
@@ -51,6 +51,8 @@ class OutputRST:
         setsectD: dict,
         rivtD: dict,
         exportS: str,
+        evalL: list = None,
+        formatO: _rc_eval.FormatContext = None,
     ):
         """convert rivt-strings to reST-strings
 
@@ -61,9 +63,12 @@ class OutputRST:
             setcmdD (dict): command settings
             setsectD (dict): section settings
             rivtD (dict): global rivt dictionary
+            evalL (list): assignments evaluated in the utf pass. If given,
+                values are formatted from the list and calc code is not run.
+            formatO (FormatContext): session number format, or None
         """
 
-        self.restS = """"""  # restructured text string
+        self.restS = _rc_out.TextBuilder()  # restructured text string
         self.exportS = exportS  # value export string
         self.strL = strL  # rivt-string list
         self.valL = []  # value blocklist
@@ -71,6 +76,19 @@ class OutputRST:
         self.setsectD = setsectD
         self.setcmdD = setcmdD
         self.rivtD = rivtD
+        self.scope = _rc_eval.CalcScope(
+            rivtD,
+            _rc_eval.calc_namespace(globals()),
+            setcmdD.get("numexprB", False),
+        )  # calc namespace
+        self.tscope = _rc_eval.CalcScope(
+            rivtD,
+            _rc_eval.table_namespace(globals()),
+            setcmdD.get("numexprB", False),
+        )  # table statement namespace
+        self.evalL = evalL
+        self.batchL = []  # batch values and results
+        self.formatO = formatO or _rc_eval.FormatContext()
 
     def _refs(self, objnumI: int, typeS: str) -> str:
         """reference label for equations, tables and figures
@@ -91,104 +109,119 @@ class OutputRST:
 
         return refS
 
-    def _tags(self, tagS: str, tagL: list) -> tuple:
-        """parse tag
+    def _tags(self, tagS: str, tagD: dict) -> str:
+        """format line with a tag
 
         Args:
-            tagS (str): rivt-string with tag
-            tagL (list): list of tag parameters
-            setsectD (dict): section dictionary
+            tagS (str): rivt-string line with tag
+            tagD (dict): bound tag handlers of the string type
 
         Return:
             rstS (str): restructured text string
-            setsectD (dict): updated section dictionary
         """
 
         tagS = tagS.rstrip()
-        uS = ""
-        swidthI = self.setsectD["swidthI"] - 1
-        try:
-            tag = list(set(tagL).intersection(tagS.split()))[0]
-        except:
-            uS = tagS
-            return uS
-
-        if tag == "[#]_":  # auto increment footnote mark
-            uS = tagS + "\n"
-        elif tag == "[page]_":  # new page
-            uS = ".. raw:: latex \n\n ?x?newpage \n"
-        elif tag == "[line]_":  # horizontal line
-            uS = int(self.setsectD["swidthI"]) * "-"
-        elif tag == "[link]_":  # url link
-            tgS = tagS.strip("[link]_").strip()
-            tgL = tgS.split("|")
-            uS = ".. _" + tgL[0].strip() + ": " + tgL[1].strip()
-        elif tag == "[r]_":  # right adjust text
-            tagL = tagS.strip().split("[r]_")
-            uS = "?x?hfill " + tagL[0].strip()
-        elif tag == "[c]_":  # center text
-            tagL = tagS.strip().split("[c]_")
-            uS = "?x?begin{center} " + tagL[0].strip() + "?x?end{center}"
-        elif tag == "[x]_":  # format tex
-            tagL = tagS.strip().split("[x]_")
-            txS = tagL[0].strip()
-            uS = ".. raw:: math\n\n   " + txS + "\n"
-        elif tag == "[s]_":  # format sympy
-            tagL = tagS.strip().split("[s]_")
-            spS = tagL[0].strip()
-            txS = sp.latex(S(spS))
-            uS = ".. raw:: math\n\n   " + txS + "\n"
-        elif tag == "[f]_":  # figure caption
-            tagL = tagS.strip().split("[f]_")
-            fnumI = int(self.setsectD["fnumI"]) + 1
-            self.setsectD["fnumI"] = fnumI
-            refS = self._refs(fnumI, "[ Fig: ") + " ]"
-            uS = "\n\n**" + tagL[0].strip() + "**" + \
-                " ?x?hfill " + refS + "\n\n"
-        elif tag == "[e]_":  # equation label
-            tagL = tagS.strip().split("[e]_")
-            enumI = int(self.setsectD["enumI"]) + 1
-            self.setsectD["enumI"] = enumI
-            refS = self._refs(enumI, "[ Equ: ") + "]"
-            uS = "**" + tagL[0].strip() + "**" + " ?x?hfill " + refS
-        elif tag == "[t]_":  # table label
-            tagL = tagS.strip().split("[t]_")
-            tnumI = int(self.setsectD["tnumI"]) + 1
-            self.setsectD["tnumI"] = tnumI
-            refS = self._refs(tnumI, "[Table: ") + "]"
-            uS = "**" + tagL[0].strip() + "**" + " ?x?hfill  " + refS
-        elif tag == "[foot]_":  # footnote label
-            tagS = tagS.strip("[foot]_").strip()
-            # ".. target-notes::\n\n"
-            uS = ".. [*] " + tagS
-        elif tag == "[n]_":  # new line
-            tagL = tagS.strip().split("[n]_")
-            tagS = tagL[0] + "\n"
-            uS = tagS
-        else:
-            uS = tagS
+        tagF = _rc_reg.find_tag(tagS, tagD)
+        if tagF is None:
+            return tagS
+        return tagF(tagS)
+
+    def _tagmark(self, tagS: str) -> str:
+        """auto increment footnote mark"""
+
+        return tagS + "\n"
+
+    def _tagpage(self, tagS: str) -> str:
+        """new page"""
+
+        return ".. raw:: latex \n\n ?x?newpage \n"
+
+    def _tagline(self, tagS: str) -> str:
+        """horizontal line"""
+
+        return int(self.setsectD["swidthI"]) * "-"
+
+    def _taglink(self, tagS: str) -> str:
+        """url link"""
+
+        tgS = tagS.strip("[link]_").strip()
+        tgL = tgS.split("|")
+        return ".. _" + tgL[0].strip() + ": " + tgL[1].strip()
+
+    def _tagright(self, tagS: str) -> str:
+        """right adjust text"""
+
+        tagL = tagS.strip().split("[r]_")
+        return "?x?hfill " + tagL[0].strip()
+
+    def _tagcenter(self, tagS: str) -> str:
+        """center text"""
+
+        tagL = tagS.strip().split("[c]_")
+        return "?x?begin{center} " + tagL[0].strip() + "?x?end{center}"
+
+    def _tagtex(self, tagS: str) -> str:
+        """format tex"""
+
+        txS = tagS.strip().split("[x]_")[0].strip()
+        return ".. raw:: math\n\n   " + txS + "\n"
+
+    def _tagsympy(self, tagS: str) -> str:
+        """format sympy"""
+
+        spL = tagS.strip().split("[s]_")[0].strip().split("=")
+        txS = _rc_pretty.latex_eq(spL[0], spL[1], self.folderD["mpath"])
+        return ".. raw:: math\n\n   " + txS + "\n"
+
+    def _tagfigure(self, tagS: str) -> str:
+        """figure caption"""
 
-        return uS
+        tagL = tagS.strip().split("[f]_")
+        fnumI = int(self.setsectD["fnumI"]) + 1
+        self.setsectD["fnumI"] = fnumI
+        refS = self._refs(fnumI, "[ Fig: ") + " ]"
+        return "\n\n**" + tagL[0].strip() + "**" + " ?x?hfill " + refS + "\n\n"
 
-    def _parseRST(self, typeS: str, cmdL: list, methL: list, tagL: list):
+    def _tagequation(self, tagS: str) -> str:
+        """equation label"""
+
+        tagL = tagS.strip().split("[e]_")
+        enumI = int(self.setsectD["enumI"]) + 1
+        self.setsectD["enumI"] = enumI
+        refS = self._refs(enumI, "[ Equ: ") + "]"
+        return "**" + tagL[0].strip() + "**" + " ?x?hfill " + refS
+
+    def _tagtable(self, tagS: str) -> str:
+        """table label"""
+
+        tagL = tagS.strip().split("[t]_")
+        tnumI = int(self.setsectD["tnumI"]) + 1
+        self.setsectD["tnumI"] = tnumI
+        refS = self._refs(tnumI, "[Table: ") + "]"
+        return "**" + tagL[0].strip() + "**" + " ?x?hfill  " + refS
+
+    def _tagfoot(self, tagS: str) -> str:
+        """footnote label"""
+
+        tagS = tagS.strip("[foot]_").strip()
+        return ".. [*] " + tagS
+
+    def _parseRST(self, typeS: str):
         """parse rivt-string to reST
 
+        Commands and tags are dispatched to the handlers registered in rc_reg
+        for the rst backend and the string type.
+
         Args:
             typeS (str): rivt-string type
-            cmdL (list): command list
-            methL (list): method list
-            tagL (list): tag list
         """
-        locals().update(self.rivtD)
-        uL = []  # command arguments
-        indxI = -1  # method index
-        _rgx = r"\[([^\]]+)]_"  # find tags
-
-        for uS in self.strL:
-            if uS[0:2] == "##":
-                continue  # remove comment
-            uS = uS[4:]  # remove indent
-            if len(uS) == 0:
+        cmdD = _rc_reg.bind(self, _rc_reg.commands("rst", typeS))
+        tagD = _rc_reg.bind(self, _rc_reg.tags("rst", typeS))
+        nodeL = _rc_ir.compile_str(self.strL, typeS, self.folderD["mpath"])
+
+        for node in nodeL:
+            kindS = node.kindS
+            if kindS == "flush":
                 if len(self.valL) > 0:  # print value table
                     fltfmtS = ""
                     hdrL = ["variable", "value", "[value]", "description"]
@@ -196,52 +229,24 @@ class OutputRST:
                     self._vtable(self.valL, hdrL, "rst", alignL, fltfmtS)
                     self.valL = []
                     self.restS += "\n\n"
-                    self.rivtD.update(locals())
-                    continue
                 else:
                     # self.restS += "?x?vspace{7pt}"
                     self.restS += "\n"
+            elif kindS == "tag":
+                if node.textS.strip() == "[literal]_":
                     continue
-            try:
-                if uS[0] == "#":
-                    continue  # remove comment
-            except:
-                self.restS += "\n"
-                continue
-            if uS.strip() == "[literal]_":
-                continue
-            if re.search(_rgx, uS):  # check for tag
-                utgS = self._tags(uS, tagL)
+                utgS = self._tags(node.textS, tagD)
                 self.restS += utgS.rstrip() + "\n"
-                continue
-            if typeS == "values":  # chk for values
-                self.setcmdD["saveB"] = False
-                if "=" in uS and uS.strip()[-2] == "||":  # value to file
-                    uS = uS.replace("||", " ")
-                    self.setcmdD["saveB"] = True
-                if "=" in uS:  # assign value
-                    uL = uS.split("|")
-                    self._vassign(uL)
-                    continue
-            if typeS == "table":  # check for table
-                if uS[0:2] == "||":
-                    uL = uS[2:].split("|")
-                    indxI = cmdL.index(uL[0].strip())
-                    methL[indxI](uL)
-                    continue
-                else:
-                    exec(uS)  # exec table code
-                    continue
-            if uS[0:2] == "||":  # check for cmd
-                # print(f"{cmdL=}")
-                uL = uS[2:].split("|")
-                indxI = cmdL.index(uL[0].strip())
-                methL[indxI](uL)
-                continue  # call any cmd
-
-            self.rivtD.update(locals())
-            if typeS != "table":  # skip table prnt
-                self.restS += uS.rstrip() + "\n"
+            elif kindS == "equation" or kindS == "assign":
+                self.setcmdD["saveB"] = node.saveB
+                self._vassign(list(node.argL))
+            elif kindS == "command":
+                cmdD[node.cmdS](list(node.argL))  # call any cmd
+            elif kindS == "code":
+                if self.evalL is None:
+                    self.tscope.exec(node.codeS)  # exec table code
+            else:
+                self.restS += node.textS.rstrip() + "\n"
 
     def r_rst(self) -> str:
         """parse repository string
@@ -251,18 +256,7 @@ class OutputRST:
              setsectD (dict): section settings
         """
 
-        rcmdL = ["search", "keys", "info", "text", "table", "pdf"]
-        rmethL = [
-            self._rsearch,
-            self._rkeys,
-            self._rinfo,
-            self._itext,
-            self._itable,
-            self._rpdf,
-        ]
-        rtagL = ["[links]_", "[literal]_", "[foot]_", "[#]__"]
-
-        self._parseRST("repository", rcmdL, rmethL, rtagL)
+        self._parseRST("repository")
 
         return self.restS, self.setsectD
 
@@ -284,19 +278,6 @@ class OutputRST:
         """
         alignD = {"S": "", "D": "decimal",
                   "C": "center", "R": "right", "L": "left"}
-        rtagL = [
-            "[page]_",
-            "[line]_",
-            "[link]_",
-            "[literal]_",
-            "[foot]_",
-            "[r]_",
-            "[c]_",
-            "[e]_",
-            "[t]_",
-            "[f]_",
-            "[#]_",
-        ]
         if len(rL) < 4:
             rL += [""] * (4 - len(rL))  # pad parameters
         rstS = ""
@@ -332,7 +313,7 @@ class OutputRST:
                 incl_colL = eval(rL[3].strip())
                 totalL = [""] * len(incl_colL)
         ttitleS = readL[0][0].strip() + " [t]_"
-        rstgS = self._tags(ttitleS, rtagL)
+        rstgS = self._tagtable(ttitleS)
         self.restS += rstgS.rstrip() + "\n\n"
         for row in readL[1:]:
             contentL.append([row[i] for i in incl_colL])
@@ -344,20 +325,13 @@ class OutputRST:
                 templist = [i.replace("""\\n""", """\n""") for i in templist]
                 wrowL.append("""\n""".join(templist))
             wcontentL.append(wrowL)
-        sys.stdout.flush()
-        old_stdout = sys.stdout
-        output = StringIO()
-        output.write(
-            tabulate(
-                wcontentL,
-                tablefmt="rst",
-                headers="firstrow",
-                numalign="decimal",
-                stralign=saS,
-            )
+        rstS = tabulate(
+            wcontentL,
+            tablefmt="rst",
+            headers="firstrow",
+            numalign="decimal",
+            stralign=saS,
         )
-        rstS = output.getvalue()
-        sys.stdout = old_stdout
 
         self.restS += rstS + "\n"
 
@@ -373,29 +347,7 @@ class OutputRST:
             setcmdD (dict): command settings
         """
 
-        icmdL = ["text", "table", "image"]
-        imethL = [
-            self._itext,
-            self._itable,
-            self._iimage,
-        ]
-        itagL = [
-            "[page]_",
-            "[line]_",
-            "[link]_",
-            "[literal]_",
-            "[foot]_",
-            "[s]_",
-            "[x]_",
-            "[r]_",
-            "[c]_",
-            "[e]_",
-            "[t]_",
-            "[f]_",
-            "[#]_",
-        ]
-
-        self._parseRST("insert", icmdL, imethL, itagL)
+        self._parseRST("insert")
 
         return self.restS, self.setsectD, self.setcmdD
 
@@ -436,20 +388,6 @@ class OutputRST:
         """
         alignD = {"S": "", "D": "decimal",
                   "C": "center", "R": "right", "L": "left"}
-        itagL = [
-            "[page]_",
-            "[line]_",
-            "[link]_",
-            "[literal]_",
-            "[foot]_",
-            "[r]_",
-            "[c]_",
-            "[e]_",
-            "[t]_",
-            "[f]_",
-            "[#]_",
-            "[n]_",
-        ]
         if len(iL) < 4:
             iL += [""] * (4 - len(iL))  # pad parameters
         utfS = ""
@@ -486,24 +424,17 @@ class OutputRST:
                 incl_colL = eval(iL[3].strip())
                 totalL = [""] * len(incl_colL)
         ttitleS = readL[0][0].strip() + " [t]_"
-        utgS = self._tags(ttitleS, itagL)
+        utgS = self._tagtable(ttitleS)
         self.restS += utgS.rstrip() + "\n\n"
         for row in readL[1:]:
             contentL.append([row[i] for i in incl_colL])
-        sys.stdout.flush()
-        old_stdout = sys.stdout
-        output = StringIO()
-        output.write(
-            tabulate(
-                contentL,
-                tablefmt="latex",
-                headers="firstrow",
-                numalign="decimal",
-                stralign=saS,
-            )
+        rstS = tabulate(
+            contentL,
+            tablefmt="latex",
+            headers="firstrow",
+            numalign="decimal",
+            stralign=saS,
         )
-        rstS = output.getvalue()
-        sys.stdout = old_stdout
 
         # print(rstS)
         cS = 0
@@ -584,36 +515,9 @@ class OutputRST:
             exportS (list): value strings for export
         """
 
-        locals().update(self.rivtD)
-        vcmdL = ["config", "value", "data", "func", "text", "table", "image"]
-        vmethL = [
-            self._vconfig,
-            self._vvalue,
-            self._vdata,
-            self._vfunc,
-            self._itext,
-            self._itable,
-            self._iimage,
-        ]
-
-        vtagL = [
-            "[page]_",
-            "[line]_",
-            "[link]_",
-            "[literal]_",
-            "[foot]_",
-            "[s]_",
-            "[x]_",
-            "[r]_",
-            "[c]_",
-            "[e]_",
-            "[t]_",
-            "[f]_",
-            "[#]_",
-        ]
-
-        self._parseRST("values", vcmdL, vmethL, vtagL)
-        self.rivtD.update(locals())
+        self._parseRST("values")
+        if self.batchL:
+            self._vbatch(self.batchL)
         return self.restS, self.setsectD, self.setcmdD, self.rivtD, self.exportS
 
     def _vconfig(self, vL: list):
@@ -635,83 +539,111 @@ class OutputRST:
             vL (list): list of assignments
         """
 
-        locals().update(self.rivtD)
+        if self.evalL is not None:
+            self._vreplay(vL)
+            return
         rprecS = str(self.setcmdD["trmrI"])  # trim numbers
         tprecS = str(self.setcmdD["trmtI"])
         fltfmtS = "." + rprecS.strip() + "f"
-        exec("set_printoptions(precision=" + rprecS + ")")
-        exec("Unum.set_format(value_format = '%." + rprecS + "f')")
+        self.formatO.set_precision(rprecS)
         if len(vL) <= 2:  # equation
             unitL = vL[1].split(",")
             unit1S, unit2S = unitL[0].strip(), unitL[1].strip()
             varS = vL[0].split("=")[0].strip()
             valS = vL[0].split("=")[1].strip()
-            val1U = val2U = array(eval(valS))
+            subD = {}
+            if self.setcmdD["subB"]:  # values before assignment
+                subD = _rc_pretty.sub_values(
+                    valS, self.rivtD, self.formatO.formatter()
+                )
+            valV = self.scope.eval(valS)
+            if self._visbatch(valS, valV):  # one result per case
+                self.scope[varS] = valV
+                self.setcmdD["batchL"].append(varS)
+                eqltxS = _rc_pretty.latex_eq(varS, valS, self.folderD["mpath"])
+                self.restS += "\n.. math:: \n\n" + "  " + eqltxS + "\n\n"
+                self.batchL.append([varS, valV, unit1S])
+                if self.setcmdD["saveB"] == True:
+                    self.exportS += vL[0] + vL[1] + "  # equation" + "\n"
+                return
+            val1U = val2U = array(valV)
             if unit1S != "-":
-                if type(eval(valS)) == list:
-                    val1U = array(eval(valS)) * eval(unit1S)
-                    val2U = [q.cast_unit(eval(unit2S)) for q in val1U]
+                if type(valV) == list:
+                    val1U = array(valV) * self.scope.eval(unit1S)
+                    unit2U = self.scope.eval(unit2S)
+                    val2U = [q.cast_unit(unit2U) for q in val1U]
                 else:
-                    cmdS = varS + "= " + valS
-                    exec(cmdS, globals(), locals())
-                    valU = eval(varS).cast_unit(eval(unit1S))
+                    self.scope[varS] = valV  # evaluated above
+                    valU = valV.cast_unit(self.scope.eval(unit1S))
                     valdec = ("%." + str(rprecS) + "f") % valU.number()
-                    val1U = str(valdec) + " " + str(valU.unit())
-                    val2U = valU.cast_unit(eval(unit2S))
+                    val1U = str(valdec) + " " + self.formatO.unit(valU)
+                    val2U = valU.cast_unit(self.scope.eval(unit2S))
             else:
-                cmdS = varS + "= " + "unum.as_unum(" + valS + ")"
-                exec(cmdS, globals(), locals())
+                self.scope[varS] = unum.as_unum(valV)
                 # valU = eval(varS).cast_unit(eval(unit1S))
                 # valdec = ("%." + str(rprecS) + "f") % valU.number()
                 # val1U = str(valdec) + " " + str(valU.unit())
-                val1U = eval(varS)
+                val1U = self.scope.eval(varS)
                 val2U = val1U
-            rstS = vL[0]
-            spS = "Eq(" + varS + ",(" + valS + "))"  # pretty print
-            symeq = sp.sympify(spS, _clash2, evaluate=False)
-            eqltxS = sp.latex(symeq, mul_symbol="dot")
-            self.restS += "\n.. math:: \n\n" + "  " + eqltxS + "\n\n"
-            eqS = sp.sympify(valS)
-            eqatom = eqS.atoms(sp.Symbol)
+            eqatom = [n for n in _rc_pretty.names(valS) if n in self.rivtD]
             if self.setcmdD["subB"]:
-                self._vsub(vL)
+                self._vsub(varS, valS, subD, self._vresult(val1U, val2U))
             else:
+                eqltxS = _rc_pretty.latex_eq(varS, valS, self.folderD["mpath"])
+                self.restS += "\n.. math:: \n\n" + "  " + eqltxS + "\n\n"
                 hdrL = []
                 valL = []
                 hdrL.append(varS)
-                valL.append(str(val1U) + "  [" + str(val2U) + "]")
+                valL.append(self._vresult(val1U, val2U))
                 for sym in eqatom:
-                    hdrL.append(str(sym))
-                    symU = eval(str(sym))
-                    valL.append(str(symU.simplify_unit()))
+                    hdrL.append(sym)
+                    symU = self.rivtD[sym]
+                    if isinstance(symU, Unum):
+                        symU = symU.simplify_unit()
+                    valL.append(self.formatO.format(symU))
                 alignL = ["center"] * len(valL)
                 self._vtable([valL], hdrL, "rst", alignL, fltfmtS)
             if self.setcmdD["saveB"] == True:
                 pyS = vL[0] + vL[1] + "  # equation" + "\n"
                 # print(pyS)
                 self.exportS += pyS
+        elif len(vL) >= 4 and vL[3].strip() == "batch":  # one value per case
+            unitL = vL[1].split(",")
+            unit1S = unitL[0].strip()
+            varS = vL[0].split("=")[0].strip()
+            valS = vL[0].split("=")[1].strip()
+            valA = asarray(self.scope.eval(valS), dtype=float).ravel()
+            if unit1S != "-":
+                valA = self.scope.eval(unit1S) * valA
+            self.scope[varS] = valA
+            self.setcmdD["batchL"].append(varS)
+            self.batchL.append([varS, valA, unit1S])
+            if self.setcmdD["saveB"] == True:
+                self.exportS += vL[0] + vL[1] + vL[2] + "\n"
         elif len(vL) >= 3:  # value
             descripS = vL[2].strip()
             unitL = vL[1].split(",")
             unit1S, unit2S = unitL[0].strip(), unitL[1].strip()
             varS = vL[0].split("=")[0].strip()
             valS = vL[0].split("=")[1].strip()
-            val1U = val2U = array(eval(valS))
+            valV = self.scope.eval(valS)
+            val1U = val2U = array(valV)
             if unit1S != "-":
-                if type(eval(valS)) == list:
-                    val1U = array(eval(valS)) * eval(unit1S)
-                    val2U = [q.cast_unit(eval(unit2S)) for q in val1U]
+                if type(valV) == list:
+                    val1U = array(valV) * self.scope.eval(unit1S)
+                    unit2U = self.scope.eval(unit2S)
+                    val2U = [q.cast_unit(unit2U) for q in val1U]
                 else:
                     cmdS = varS + "= " + valS + "*" + unit1S
-                    exec(cmdS, globals(), locals())
-                    valU = eval(varS)
-                    val1U = str(valU.number()) + " " + str(valU.unit())
-                    val2U = valU.cast_unit(eval(unit2S))
+                    self.scope.exec(cmdS)
+                    valU = self.scope.eval(varS)
+                    val1U = str(valU.number()) + " " + self.formatO.unit(valU)
+                    val2U = valU.cast_unit(self.scope.eval(unit2S))
             else:
-                cmdS = varS + "= " + "unum.as_unum(" + valS + ")"
+                cmdS = varS + "= " + "as_unum(" + valS + ")"
                 print(f"{cmdS=}")
-                exec(cmdS, globals(), locals())
-                valU = eval(varS)
+                self.scope.exec(cmdS)
+                valU = self.scope.eval(varS)
                 # val1U = str(valU.number()) + " " + str(valU.unit())
                 val2U = valU
             self.valL.append([varS, val1U, val2U, descripS])
@@ -719,20 +651,86 @@ class OutputRST:
                 pyS = vL[0] + vL[1] + vL[2] + "\n"
                 # print(pyS)
                 self.exportS += pyS
-        self.rivtD.update(locals())
         # print(self.rivtD)
 
+    def _vreplay(self, vL: list):
+        """format assignment from values evaluated in the utf pass
+
+        Args:
+            vL (list): list of assignments
+        """
+
+        typeS, varS, valU, rowL = self.evalL.pop(0)
+        self.rivtD[varS] = valU
+        rprecS = str(self.setcmdD["trmrI"])  # trim numbers
+        fltfmtS = "." + rprecS.strip() + "f"
+        self.formatO.set_precision(rprecS)
+        if typeS == "equation":
+            valS = vL[0].split("=")[1].strip()
+            hdrL, valL, subD = rowL
+            if self.setcmdD["subB"]:
+                self._vsub(varS, valS, subD, valL[0])
+            else:
+                eqltxS = _rc_pretty.latex_eq(varS, valS, self.folderD["mpath"])
+                self.restS += "\n.. math:: \n\n" + "  " + eqltxS + "\n\n"
+            if len(hdrL):
+                alignL = ["center"] * len(valL)
+                self._vtable([valL], hdrL, "rst", alignL, fltfmtS)
+            if self.setcmdD["saveB"] == True:
+                self.exportS += vL[0] + vL[1] + "  # equation" + "\n"
+        elif typeS == "batch":
+            self.batchL.append([varS, valU, rowL])
+            if len(vL) <= 2:  # equation
+                valS = vL[0].split("=")[1].strip()
+                eqltxS = _rc_pretty.latex_eq(varS, valS, self.folderD["mpath"])
+                self.restS += "\n.. math:: \n\n" + "  " + eqltxS + "\n\n"
+                if self.setcmdD["saveB"] == True:
+                    self.exportS += vL[0] + vL[1] + "  # equation" + "\n"
+            elif self.setcmdD["saveB"] == True:
+                self.exportS += vL[0] + vL[1] + vL[2] + "\n"
+        else:
+            self.valL.append(rowL)
+            if self.setcmdD["saveB"] == True:
+                self.exportS += vL[0] + vL[1] + vL[2] + "\n"
+
+    def _visbatch(self, valS: str, valV) -> bool:
+        """return True if equation reads batch values and gives one result per case"""
+
+        if set(_rc_pretty.names(valS)).isdisjoint(self.setcmdD["batchL"]):
+            return False
+        return _rc_eval.is_batch(valV)
+
+    def _vbatch(self, batchL: list):
+        """write one table of batch values and results, one row for each case
+
+        Args:
+            batchL (list): name, value and unit expression of each column
+        """
+
+        hdrL, colL = ["case"], []
+        for varS, valO, unitS in batchL:
+            if isinstance(valO, Unum) and unitS != "-":
+                unitU = self.scope.eval(unitS)
+                valO = valO.cast_unit(unitU)  # one unit check per column
+                varS += " [" + self.formatO.unit(unitU) + "]"
+            hdrL.append(varS)
+            colL.append(valO)
+        alignL = ["right"] * len(hdrL)
+        self._vtable(self.formatO.columns(colL), hdrL, "rst", alignL, "")
+
+    def _vresult(self, val1U, val2U) -> str:
+        """return equation result and converted result"""
+
+        return self.formatO.format(val1U) + "  [" + self.formatO.format(val2U) + "]"
+
     def _vtable(self, tbl, hdrL, tblfmt, alignL, fltfmtS):
         """write value table"""
 
-        locals().update(self.rivtD)
+        tbl = [[self.formatO.cell(c) for c in rowL] for rowL in tbl]
         rprecS = str(self.setcmdD["trmrI"])  # trim numbers
         tprecS = str(self.setcmdD["trmtI"])
         fltfmtS = "." + rprecS.strip() + "f"
-        sys.stdout.flush()
-        old_stdout = sys.stdout
-        output = StringIO()
-        tableS = tabulate(
+        rstS = tabulate(
             tbl,
             tablefmt=tblfmt,
             headers=hdrL,
@@ -740,17 +738,12 @@ class OutputRST:
             colalign=alignL,
             floatfmt=fltfmtS,
         )
-        output.write(tableS)
-        rstS = output.getvalue()
-        sys.stdout = old_stdout
-        sys.stdout.flush()
         inrstS = ""
         self.restS += ":: \n\n"
         for i in rstS.split("\n"):
             inrstS = "  " + i
             self.restS += inrstS + "\n"
         self.restS += "\n\n"
-        self.rivtD.update(locals())
 
     def _vvalue(self, vL: list):
         """import values from files
@@ -759,7 +752,6 @@ class OutputRST:
             vL (list): value command arguments
         """
 
-        locals().update(self.rivtD)
         valL = []
         fltfmtS = ""
         if len(vL) < 5:
@@ -778,22 +770,23 @@ class OutputRST:
             if not len(varS):
                 valL.append(["------", "------", "------", "------"])  # totals
                 continue
-            val1U = val2U = array(eval(valS))
+            valV = self.scope.eval(valS)
+            val1U = val2U = array(valV)
             if unit1S != "-":
-                if type(eval(valS)) == list:
-                    val1U = array(eval(valS)) * eval(unit1S)
-                    val2U = [q.cast_unit(eval(unit2S)) for q in val1U]
+                if type(valV) == list:
+                    val1U = array(valV) * self.scope.eval(unit1S)
+                    unit2U = self.scope.eval(unit2S)
+                    val2U = [q.cast_unit(unit2U) for q in val1U]
                 else:
                     cmdS = varS + "= " + valS + "*" + unit1S
-                    exec(cmdS, globals(), locals())
-                    valU = eval(varS)
-                    val1U = str(valU.number()) + " " + str(valU.unit())
-                    val2U = valU.cast_unit(eval(unit2S))
+                    self.scope.exec(cmdS)
+                    valU = self.scope.eval(varS)
+                    val1U = str(valU.number()) + " " + self.formatO.unit(valU)
+                    val2U = valU.cast_unit(self.scope.eval(unit2S))
             valL.append([varS, val1U, val2U, descripS])
         hdrL = ["variable", "value", "[value]", "description"]
         alignL = ["left", "right", "right", "left"]
         self._vtable(valL, hdrL, "rst", alignL, fltfmtS)
-        self.rivtD.update(locals())
 
     def _vdata(self, vL: list):
         """import data from files
@@ -802,13 +795,12 @@ class OutputRST:
             vL (list): data command arguments
         """
 
-        locals().update(self.rivtD)
         valL = []
         if len(vL) < 5:
             vL += [""] * (5 - len(vL))  # pad command
         valL.append(["variable", "values"])
         vfileS = Path(self.folderD["apath"] / vL[2].strip())
-        vecL = eval(vL[3].strip())
+        vecL = self.scope.eval(vL[3].strip())
         with open(vfileS, "r") as csvF:
             reader = csv.reader(csvF)
         vL = list(reader)
@@ -816,80 +808,38 @@ class OutputRST:
             varS = i[0]
             varL = array(i[1:])
             cmdS = varS + "=" + str(varL)
-            exec(cmdS, globals(), locals())
+            self.scope.exec(cmdS)
             if len(varL) > 4:
                 varL = str((varL[:2]).append(["..."]))
             valL.append([varS, varL])
         hdrL = ["variable", "values"]
         alignL = ["left", "right"]
         self._vtable(valL, hdrL, "rst", alignL)
-        self.rivtD.update(locals())
 
-    def _vsub(self, eqL: list, eqS: str):
-        """substitute numbers for variables in printed output
+    def _vsub(self, varS: str, valS: str, subD: dict, resultS: str):
+        """write equation and equation with values substituted
 
         Args:
-            epL (list): equation and units
-            epS (str): [description]
+            varS (str): assigned name
+            valS (str): expression
+            subD (dict): value text for names in the expression
+            resultS (str): formatted result
         """
 
-        locals().update(self.rivtd)
-
-        eformat = ""
-        utfS = eqL[0].strip()
-        descripS = eqL[3]
-        parD = dict(eqL[1])
-        varS = utfS.split("=")
-        resultS = vars[0].strip() + " = " + str(eval(vars[1]))
-        try:
-            eqS = "Eq(" + eqL[0] + ",(" + eqL[1] + "))"
-            # sps = sps.encode('unicode-escape').decode()
-            utfs = sp.pretty(sp.sympify(eqS, _clash2, evaluate=False))
-            self.calcl.append(utfs)
-        except:
-            self.calcl.append(utfs)
-        try:
-            symeq = sp.sympify(eqS.strip())  # substitute
-            symat = symeq.atoms(sp.Symbol)
-            for _n2 in symat:
-                evlen = len((eval(_n2.__str__())).__str__())  # get var length
-                new_var = str(_n2).rjust(evlen, "~")
-                new_var = new_var.replace("_", "|")
-                symeq1 = symeq.subs(_n2, sp.Symbols(new_var))
-            out2 = sp.pretty(symeq1, wrap_line=False)
-            # print('out2a\n', out2)
-            symat1 = symeq1.atoms(sp.Symbol)  # adjust character length
-            for _n1 in symat1:
-                orig_var = str(_n1).replace("~", "")
-                orig_var = orig_var.replace("|", "_")
-                try:
-                    expr = eval((self.odict[orig_var][1]).split("=")[1])
-                    if type(expr) == float:
-                        form = "{:." + eformat + "f}"
-                        symeval1 = form.format(eval(str(expr)))
-                    else:
-                        symeval1 = eval(orig_var.__str__()).__str__()
-                except:
-                    symeval1 = eval(orig_var.__str__()).__str__()
-                out2 = out2.replace(_n1.__str__(), symeval1)
-            # print('out2b\n', out2)
-            out3 = out2  # clean up unicode
-            out3.replace("*", "\\u22C5")
-            # print('out3a\n', out3)
-            _cnt = 0
-            for _m in out3:
-                if _m == "-":
-                    _cnt += 1
-                    continue
-                else:
-                    if _cnt > 1:
-                        out3 = out3.replace("-" * _cnt, "\u2014" * _cnt)
-                    _cnt = 0
-        except:
-            pass
+        symS, subS = _rc_pretty.latex_sub(varS, valS, subD.get, resultS)
+        self.restS += "\n.. math:: \n\n" + "  " + symS + "\n\n"
+        self.restS += "\n.. math:: \n\n" + "  " + subS + "\n\n"
 
     def _vfunc(self, vL: list):
-        pass
+        """assign function from a script file
+
+        Args:
+            vL (list): func command arguments - file, name and optional memo
+        """
+
+        funcO = _rc_func.script_func(vL, self.folderD)
+        self.rivtD[funcO.nameS] = funcO
+        self.restS += "\n::\n\n   " + funcO.signature() + "\n\n"
 
     def t_rst(self) -> tuple:
         """parse table-strings
@@ -901,24 +851,6 @@ class OutputRST:
             rivtD (list): calculation values
         """
 
-        tcmdL = ["text", "table", "image"]
-        tmethL = [self._itext, self._itable, self._iimage]
-        ttagL = [
-            "[page]_",
-            "[line]_",
-            "[link]_",
-            "[literal]_",
-            "[foot]_",
-            "[s]",
-            "[x]",
-            "[r]_",
-            "[c]_",
-            "[e]_",
-            "[t]_",
-            "[f]_",
-            "[#]_",
-        ]
-
-        self._parseUTF("table", tcmdL, tmethL, ttagL)
-
-        return self.calcS, self.setsectD, self.setcmdD, self.rivtD
+        self._parseRST("table")
+
+        return self.restS, self.setsectD, self.setcmdD, self.rivtD
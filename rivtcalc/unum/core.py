@@ -161,6 +161,17 @@ class Formatter(object):
     __call__ = format
 
 
+def _is_zero(value):
+    """
+    Return True if value is zero. Array values are never treated as zero.
+    """
+
+    try:
+        return bool(value == 0)
+    except ValueError:
+        return False
+
+
 def uniform_unum(func):
     def decorator(self, value):
         return func(self, Unum.uniform(value))
@@ -350,10 +361,10 @@ class Unum(object):
         if self._unit == other._unit:
             return self, other
 
-        if self._value == 0:
+        if _is_zero(self._value):
             return Unum(self._value, other._unit), other
 
-        if other._value == 0:
+        if _is_zero(other._value):
             return self, Unum(other._value, self._unit)
 
         s = self.copy()
@@ -0,0 +1,37 @@
+"""shared fixtures - a throwaway rivt project folder and a calc runner"""
+
+import io
+import textwrap
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import pytest
+
+from rivtcalc import rc_lib
+
+
+@pytest.fixture
+def project(tmp_path):
+    """return project folder with calcs, scripts, docs and tmp subfolders"""
+
+    for folderS in ("calcs/c0101", "calcs/scripts", "docs/d0000", "docs/d0101", "tmp"):
+        Path(tmp_path, folderS).mkdir(parents=True)
+    return tmp_path
+
+
+def write(folderP: Path, nameS: str, textS: str) -> Path:
+    """write dedented text to a file and return its path"""
+
+    fileP = Path(folderP, nameS)
+    fileP.write_text(textwrap.dedent(textS).lstrip("\n"), encoding="utf-8")
+    return fileP
+
+
+def run(calcP: Path, **kwD) -> tuple:
+    """run a calc in a new session, returning the session and terminal text"""
+
+    termO = io.StringIO()
+    with redirect_stdout(termO):
+        sessO = rc_lib.CalcSession(str(calcP), **kwD)
+        sessO.run()
+    return sessO, termO.getvalue()
@@ -0,0 +1,80 @@
+"""batch values evaluated for every case in one table"""
+
+from pathlib import Path
+
+from conftest import run, write
+
+_batchS = '''
+from rivtcalc import rc_lib as rc
+
+rc.V(
+    """[01]_ Batch
+
+    ||config | nosub | 2,2
+
+    L1 = linspace(10, 30, 3)   | FT, IN | span | batch
+    w1 = [1.0, 1.5, 2.0]   | KLF, PLF | load | batch
+
+    bending moment [e]_
+    M1 = w1 * L1**2 / 8 | FT_KIPS, IN_KIPS
+    """
+)
+rc.V(
+    """[02]_ Shear
+
+    V1 = w1*L1/2 | KIPS, LBF
+    """
+)
+'''
+
+_arrayS = '''
+from rivtcalc import rc_lib as rc
+
+rc.T(
+    """[01]_ Arrays
+
+    y1 = array([1.0, 2.0, 3.0])
+    """
+)
+rc.V(
+    """[02]_ Values
+
+    ||config | nosub | 2,2
+
+    y2 = y1*2 | -, -
+    """
+)
+'''
+
+
+def test_batch_table(project):
+    calcP = write(Path(project, "calcs", "c0101"), "c0101_batch.py", _batchS)
+    sessO, termS = run(calcP, cacheB=False)
+    assert termS.count("case") == 2
+    assert sessO.setcmdD["batchL"] == ["L1", "w1", "M1", "V1"]
+    assert "25.00" in termS  # M1 of the first case, 1.0 * 10**2 / 8
+    assert "20.00" in termS  # V1 of the last case, 2.0 * 30 / 2
+
+
+def test_array_not_batch(project):
+    calcP = write(Path(project, "calcs", "c0101"), "c0101_array.py", _arrayS)
+    sessO, termS = run(calcP, cacheB=False)
+    assert "case" not in termS
+    assert sessO.setcmdD["batchL"] == []
+    assert list(sessO.rivtcalcD["y2"].number()) == [2.0, 4.0, 6.0]
+
+
+def test_cached_batch(project):
+    calcP = write(Path(project, "calcs", "c0101"), "c0101_batch.py", _batchS)
+    _, firstS = run(calcP)
+    sessO, secondS = run(calcP)
+    assert secondS == firstS
+    assert sessO.setcmdD["batchL"] == ["L1", "w1", "M1", "V1"]
+
+
+def test_sub_mode_batch(project):
+    subS = _batchS.replace("||config | nosub", "||config | sub")
+    calcP = write(Path(project, "calcs", "c0101"), "c0101_batch.py", subS)
+    sessO, termS = run(calcP, cacheB=False)
+    assert termS.count("case") == 2
+    assert "25.00" in termS and "20.00" in termS
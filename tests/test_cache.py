@@ -0,0 +1,75 @@
+"""stable hashes and size bounded disk cache"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from rivtcalc.rc_cache import DiskCache, stable_hash
+from rivtcalc.rc_unit import FT, IN
+
+
+def test_stable_hash_equal_values():
+    assert stable_hash(1.5, "a", [1, 2]) == stable_hash(1.5, "a", [1, 2])
+    assert stable_hash({"a": 1, "b": 2}) == stable_hash({"b": 2, "a": 1})
+    assert stable_hash(np.arange(4.0)) == stable_hash(np.arange(4.0))
+    assert stable_hash(2.0 * FT) == stable_hash(2.0 * FT)
+
+
+def test_stable_hash_different_values():
+    assert stable_hash(1) != stable_hash(1.0)
+    assert stable_hash([1, 2]) != stable_hash((1, 2))
+    assert stable_hash(np.arange(4.0)) != stable_hash(np.arange(4.0).reshape(2, 2))
+    assert stable_hash(2.0 * FT) != stable_hash(2.0 * IN)
+    assert stable_hash({"a": 1}) != stable_hash({"a": 2})
+
+
+def test_stable_hash_across_runs():
+    srcS = (
+        "from rivtcalc.rc_cache import stable_hash\n"
+        "print(stable_hash({'b', 'a', 'c'}, {'x': [1.5, 'y']}))\n"
+    )
+    digestL = []
+    for seedS in ("1", "2"):
+        envD = dict(os.environ, PYTHONHASHSEED=seedS)
+        digestL.append(
+            subprocess.run(
+                [sys.executable, "-c", srcS], env=envD, capture_output=True,
+                text=True, check=True,
+            ).stdout
+        )
+    assert digestL[0] == digestL[1] != ""
+
+
+def _age(cacheO, keyS, secondsI):
+    fileP = cacheO._path(keyS)
+    timeF = fileP.stat().st_mtime - secondsI
+    os.utime(fileP, (timeF, timeF))
+
+
+def test_disk_cache_get_set(tmp_path):
+    cacheO = DiskCache(tmp_path / "cache")
+    assert cacheO.get("k1", "none") == "none"
+    assert cacheO.set("k1", {"a": [1, 2]})
+    assert cacheO.get("k1") == {"a": [1, 2]}
+    assert (cacheO.hitsI, cacheO.missesI) == (1, 1)
+    assert not cacheO.set("k2", lambda: 1)  # not picklable
+    cacheO.clear()
+    assert cacheO.get("k1") is None
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cacheO = DiskCache(tmp_path / "cache", maxbytesI=2500)
+    dataB = bytes(1000)
+    cacheO.set("k1", dataB)
+    cacheO.set("k2", dataB)
+    _age(cacheO, "k1", 30)
+    _age(cacheO, "k2", 20)
+    assert cacheO.get("k1") == dataB  # k1 used last, k2 is now oldest
+    cacheO.set("k3", dataB)
+    assert cacheO.get("k2") is None
+    assert cacheO.get("k1") == dataB
+    assert cacheO.get("k3") == dataB
+    sizeI = sum(p.stat().st_size for p in (tmp_path / "cache").glob("*.pkl"))
+    assert sizeI <= 2500
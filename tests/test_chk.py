@@ -0,0 +1,147 @@
+"""checker findings on valid and invalid calcs"""
+
+from pathlib import Path
+
+import rivtcalc.rc_chk as _rc_chk
+
+from conftest import run, write
+
+_validS = '''
+from rivtcalc import rc_lib as rc
+
+rc.I(
+    """[01]_ Tables
+
+    load table [t]_
+    || table | tbl.csv | 30,C | [:]
+    """
+)
+rc.V(
+    """[02]_ Values
+
+    ||config | nosub | 2,2
+
+    L1 = 20.0   | FT, IN | span
+    w1 = 1.5    | KLF, PLF | load
+
+    bending moment [e]_
+    M1 = w1 * L1**2 / 8 | FT_KIPS, IN_KIPS
+    """
+)
+rc.T(
+    """[03]_ Table code
+
+    a1 = 3 + 4
+    df1 = pd.DataFrame({"a": [a1]})
+    """
+)
+'''
+
+_invalidS = '''
+from rivtcalc import rc_lib as rc
+
+rc.I(
+    """[01]_ Tables
+
+    || table | missing.csv | 30,C | [:]
+    || tabel | tbl.csv
+    [zz]_ unknown tag
+    """
+)
+rc.V(
+    """[02]_ Values
+
+    ||config | maybe | 2,2
+
+    L1 = 20.0   | FTT, IN | span
+    M1 = L1 * (2 | FT, IN
+    """
+)
+rc.T(
+    """[03]_ Table code
+
+    import os
+    a1 = L1.__class__
+    """
+)
+'''
+
+_infoS = '''
+from rivtcalc import rc_lib as rc
+
+rc.R(
+    """[01]_ Info
+
+    || info | tbl.csv
+    """
+)
+'''
+
+
+def _table(project):
+    write(
+        Path(project, "calcs", "c0101"),
+        "tbl.csv",
+        """
+        load, value
+        dead, 10
+        live, 20
+        """,
+    )
+
+
+def test_valid_calc(project):
+    _table(project)
+    calcP = write(Path(project, "calcs", "c0101"), "c0101_tbl.py", _validS)
+    assert _rc_chk.check_calc(str(calcP)) == []
+    sessO, termS = run(calcP, cacheB=False)
+    assert "M1" in sessO.rivtcalcD
+    assert list(sessO.rivtcalcD["df1"]["a"]) == [7]
+
+
+def test_table_in_docs_folder(project):
+    _table(project)
+    Path(project, "calcs", "c0101", "tbl.csv").rename(
+        Path(project, "docs", "d0000", "tbl.csv")
+    )
+    calcP = write(Path(project, "calcs", "c0101"), "c0101_tbl.py", _validS)
+    probL = _rc_chk.check_calc(str(calcP))
+    assert len(probL) == 1 and "file not found" in probL[0]
+    assert str(Path("calcs", "c0101", "tbl.csv")) in probL[0]
+    assert "d0000" not in probL[0]
+
+
+def test_info_in_docs_folder(project):
+    _table(project)
+    calcP = write(Path(project, "calcs", "c0101"), "c0101_info.py", _infoS)
+    assert "file not found" in "".join(_rc_chk.check_calc(str(calcP)))
+    Path(project, "calcs", "c0101", "tbl.csv").rename(
+        Path(project, "docs", "d0000", "tbl.csv")
+    )
+    assert _rc_chk.check_calc(str(calcP)) == []
+
+
+def test_invalid_calc(project):
+    _table(project)
+    calcP = write(Path(project, "calcs", "c0101"), "c0101_bad.py", _invalidS)
+    probL = _rc_chk.check_calc(str(calcP))
+    msgS = "\n".join(probL)
+    assert all(p.startswith(str(calcP) + ":") for p in probL)
+    assert msgS.count("file not found") == 1
+    assert "missing.csv" in msgS
+    assert "unknown command 'tabel'" in msgS
+    assert "unknown tag [zz]_" in msgS
+    assert "config mode 'maybe'" in msgS
+    assert "unknown unit 'FTT'" in msgS
+    assert "syntax:" in msgS
+    assert "import not allowed" in msgS
+    assert "name '__class__' not allowed" in msgS
+
+
+def test_check_folder(project, capsys):
+    _table(project)
+    write(Path(project, "calcs", "c0101"), "c0101_tbl.py", _validS)
+    write(Path(project, "calcs", "c0101"), "c0101_bad.py", _invalidS)
+    probL = _rc_chk.check(str(project), 1)
+    assert probL and all("c0101_bad.py" in p for p in probL)
+    assert "2 calcs" in capsys.readouterr().out
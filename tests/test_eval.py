@@ -0,0 +1,94 @@
+"""calc namespace and name checks of CalcScope"""
+
+import pytest
+
+import rivtcalc.rc_calc as _rc_calc
+import rivtcalc.rc_eval as _rc_eval
+
+
+@pytest.fixture
+def scope():
+    baseD = _rc_eval.calc_namespace(vars(_rc_calc))
+    varsD = {"L1": 2.0 * baseD["FT"], "xL": [1, 2, 3], "A1": _rc_calc.eye(2) * 2}
+    return _rc_eval.CalcScope(varsD, baseD)
+
+
+def test_allowed_names(scope):
+    assert scope.eval("sqrt(4)") == 2.0
+    assert scope.eval("sum([x * 2 for x in xL])") == 12
+    assert scope.eval("la.det(A1)") == pytest.approx(4.0)
+    assert scope.eval("L1.cast_unit(IN)").number() == pytest.approx(24.0)
+    scope.exec("y1 = max(xL) + pi")
+    assert scope.varsD["y1"] == pytest.approx(3 + _rc_calc.pi)
+
+
+@pytest.mark.parametrize(
+    "srcS",
+    [
+        "import os",
+        "from os import path",
+        "global L1",
+        "a1 = L1.__class__",
+        "a1 = (lambda __x: 1)(2)",
+        "A1.tofile('a.bin')",
+    ],
+)
+def test_rejected_statements(scope, srcS):
+    with pytest.raises(_rc_eval.CalcNameError):
+        scope.exec(srcS)
+
+
+@pytest.mark.parametrize(
+    "srcS",
+    [
+        "undefined_v * 2",
+        "open('a.txt')",
+        "os.getcwd()",
+        "sp.sympify('1')",
+        "pd.read_pickle('a.pkl')",
+        "plt.savefig('a.png')",
+        "load('a.npy')",
+        "linalg.det(A1)",
+        "unum.as_unum(1)",
+    ],
+)
+def test_unknown_names(scope, srcS):
+    with pytest.raises(_rc_eval.CalcNameError):
+        scope.eval(srcS)
+    assert "y1" not in scope.varsD
+
+
+def test_nested_scopes_read_calc_values(scope):
+    scope.varsD["k1"] = 2.0
+    scope.exec("z3 = [v * k1 for v in xL]")
+    scope.exec("f1 = lambda a: a * k1")
+    scope.exec("def g1(a): return a + k1")
+    assert scope.varsD["z3"] == [2.0, 4.0, 6.0]
+    assert scope.varsD["f1"](3) == 6.0
+    assert scope.varsD["g1"](1) == 3.0
+    assert "__builtins__" not in scope.varsD and "sqrt" not in scope.varsD
+    scope.exec("del z3; d1 = {v: k1 for v in xL}")
+    assert "z3" not in scope.varsD and scope.varsD["d1"] == {1: 2.0, 2: 2.0, 3: 2.0}
+
+
+def test_table_modules():
+    tableO = _rc_eval.CalcScope(
+        {"A1": _rc_calc.eye(2) * 2}, _rc_eval.table_namespace(vars(_rc_calc))
+    )
+    tableO.exec("df1 = pd.DataFrame({'a': [1.0, 2.0]})")
+    tableO.exec("s1 = sp.sympify('x + 1')")
+    tableO.exec("d1 = la.det(A1) + np.pi * 0")
+    tableO.exec("f1 = plt.figure()")
+    tableO.exec("plt.close(f1)")
+    assert list(tableO.varsD["df1"]["a"]) == [1.0, 2.0]
+    assert tableO.varsD["d1"] == pytest.approx(4.0)
+    assert "mpimg" in tableO.baseD
+    with pytest.raises(_rc_eval.CalcNameError):
+        tableO.exec("import os")
+
+
+def test_names_checked_before_running(scope, capsys):
+    with pytest.raises(_rc_eval.CalcNameError):
+        scope.exec("y1 = print('ran') or undefined_v")
+    assert capsys.readouterr().out == ""
+    assert "y1" not in scope.varsD
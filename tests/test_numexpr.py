@@ -0,0 +1,29 @@
+"""numexpr evaluation path of large array expressions"""
+
+import numpy as np
+
+import rivtcalc.rc_eval as _rc_eval
+
+
+class _Missing:
+    """stand in for a numexpr module that fails to import"""
+
+    callsI = 0
+
+    def evaluate(self, *argT, **kwD):
+        _Missing.callsI += 1
+        raise ImportError("No module named 'numexpr'")
+
+
+def test_missing_numexpr_checked_once(monkeypatch):
+    monkeypatch.setattr(_rc_eval, "_numexpr", _Missing())
+    monkeypatch.setattr(_rc_eval, "_numexprB", True)
+    monkeypatch.setattr(_rc_eval, "_pathD", {})
+    x1 = np.linspace(0.0, 1.0, _rc_eval.NUMEXPR_MIN)
+    scopeO = _rc_eval.CalcScope({"x1": x1}, {}, numexprB=True)
+    for exprS in ("x1 * 2", "x1 + 1", "x1 * 2"):
+        valA = scopeO.eval(exprS)
+    assert np.allclose(valA, x1 * 2)
+    assert _Missing.callsI == 1
+    pathD = _rc_eval.numexpr_paths()
+    assert set(pathD.values()) == {"numpy (numexpr not installed)"}
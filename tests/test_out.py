@@ -0,0 +1,78 @@
+"""output sinks and calc writer give the same text"""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from rivtcalc import rc_out as _rc_out
+
+from conftest import run, write
+from test_writer import _calcS
+
+_partL = ["line %d\n" % i for i in range(10)] + ["ünïcode ₁\n", ""]
+_textS = "".join(_partL)
+
+
+@pytest.mark.parametrize("flushI", [0, 1, 3])
+def test_term_sink(flushI):
+    streamO = io.StringIO()
+    sinkO = _rc_out.TermSink(streamO, flushI)
+    for partS in _partL:
+        sinkO.write(partS)
+    sinkO.flush()
+    assert streamO.getvalue() == _textS
+    if flushI == 3:
+        assert sinkO.flushesI == 4
+
+
+def test_file_tee_and_list_sinks(tmp_path):
+    fileP = Path(tmp_path, "out.txt")
+    fileO = _rc_out.FileSink(fileP, flushI=4)
+    listO = _rc_out.ListSink()
+    teeO = _rc_out.Tee(listO, fileO, _rc_out.NullSink())
+    for partS in _partL:
+        teeO.write(partS)
+    fileO.close()
+    assert listO.getvalue() == _textS
+    assert fileP.read_text(encoding="utf-8") == _textS
+
+
+def test_text_builder():
+    textO = _rc_out.TextBuilder("head\n")
+    markI = textO.mark()
+    for partS in _partL:
+        textO += partS
+    assert textO.since(markI) == _textS
+    assert textO.getvalue() == "head\n" + _textS
+    assert "x" + textO == "xhead\n" + _textS
+
+
+def test_calc_writer(tmp_path):
+    partP = Path(tmp_path, "calc.part")
+    writerO = _rc_out.CalcWriter(partP)
+    sectL = []
+    for partS in _partL:
+        writerO += partS
+        if len(writerO.sectO.partL) == 4:
+            sectL.append(writerO.section())
+    fileP = writerO.commit(Path(tmp_path, "calc.txt"))
+    assert "".join(sectL) == _textS[: len("".join(sectL))]
+    assert fileP.read_text(encoding="utf-8") == _textS
+    assert not partP.exists()
+
+
+@pytest.mark.parametrize("kwD", [{"quietB": True}, {"flushI": 1}, {"flushI": 5}])
+def test_session_sinks(project, kwD):
+    calcP = write(Path(project, "calcs", "c0101"), "c0101_beam.py", _calcS)
+    utfP = Path(project, "calcs", "c0101", "c0101_beam.txt")
+    sessO, termS = run(calcP, cacheB=False)
+    sessO.doc()
+    baseS = utfP.read_text("utf-8")
+    sessO, sinkS = run(calcP, cacheB=False, **kwD)
+    sessO.doc()
+    assert utfP.read_text("utf-8") == baseS
+    if kwD.get("quietB"):
+        assert sinkS.strip() == ""  # only the session start line
+    else:
+        assert sinkS == termS
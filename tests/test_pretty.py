@@ -0,0 +1,51 @@
+"""equation layout and substituted values"""
+
+import pytest
+from numpy import array
+
+import rivtcalc.rc_pretty as _rc_pretty
+from rivtcalc.rc_eval import FormatContext
+from rivtcalc.rc_unit import FT, KLF
+
+
+@pytest.mark.parametrize(
+    "resultS, convS",
+    [
+        ("-0.12 [-]  [-0.12 [-]]", r"\left[-0.12\ \mathrm{[-]}\right]"),
+        ("75.00 ft-kips  [900.00 in-kips]", r"\left[900.00\ \mathrm{in-kips}\right]"),
+    ],
+)
+def test_latex_sub_converted_result(resultS, convS):
+    symS, subS = _rc_pretty.latex_sub("x1", "a1*2", lambda nameS: None, resultS)
+    assert subS.endswith(convS)
+    assert subS.count(r"\left[") == subS.count(r"\right]") == 1
+
+
+def test_value_text_arrays():
+    fmtO = FormatContext(2).formatter()
+    assert _rc_pretty.value_text(FT * array([10.0, 15.0]), fmtO) == "[10.00, 15.00] ft"
+    assert _rc_pretty.value_text(array([1.0, 2.0]), fmtO) == "[1.00, 2.00]"
+    assert _rc_pretty.value_text(2.5 * FT, fmtO) == "2.50 ft"
+
+
+@pytest.mark.parametrize("exprS", ["a1/(b1/c1)", "(a1/b1)/(c1/d1)", "a1/(b1 + c1/d1)"])
+def test_nested_fraction_bars(exprS):
+    lineL = _rc_pretty._pretty_eq("x1", exprS).split("\n")
+    barL = sorted((l.count("─") for l in lineL if "─" in l), reverse=True)
+    assert len(barL) >= 2 and barL[0] >= barL[1] + 2
+    assert lineL[[l.count("─") for l in lineL].index(barL[0])].startswith("x₁ = ")
+
+
+def test_sub_values_simplify_units():
+    fmtO = FormatContext(2).formatter()
+    p1U = 1.5 * KLF * (20.0 * FT)
+    subD = _rc_pretty.sub_values("P1 / 2", {"P1": p1U}, fmtO)
+    assert subD == {"P1": "30.00 kips"}
+    assert _rc_pretty.value_text(p1U, fmtO) != "30.00 kips"  # value not changed
+
+
+def test_unrendered_expression_as_text():
+    assert _rc_pretty._pretty_eq("x2", "x1[0]*2") == "x₂ = x1[0]*2"
+    assert _rc_pretty._latex_eq("x2", "a_1[0]*2") == r"x_{2} = \texttt{a\_1[0]*2}"
+    symS, subS = _rc_pretty.pretty_sub("x2", "x1[0]*2", lambda nameS: None, "2.00")
+    assert (symS, subS) == ("x₂ = x1[0]*2", "x₂ = 2.00")
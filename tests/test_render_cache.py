@@ -0,0 +1,70 @@
+"""render cache reuse of sections with values read by commands"""
+
+from pathlib import Path
+
+from conftest import run, write
+
+_calcS = '''
+from rivtcalc import rc_lib as rc
+
+rc.V(
+    """[01]_ Inputs
+
+    ||config | nosub | 2,2
+
+    || value | loads.csv
+
+    || func | area.py | area
+
+    b1 = 2.0   | FT, IN | width
+    """
+)
+rc.V(
+    """[02]_ Results
+
+    P1 = wq*4 | KIPS, LBF
+
+    A1 = area(b1) | FT**2, IN**2
+    """
+)
+'''
+
+
+def _calc(project) -> Path:
+    write(
+        Path(project, "calcs", "c0101"),
+        "loads.csv",
+        """
+        variable, value, unit, alt unit, description
+        wq, 1.5, KIPS, LBF, point load
+        """,
+    )
+    write(
+        Path(project, "calcs", "scripts"),
+        "area.py",
+        '''
+        def area(b):
+            """square area"""
+            return b * b
+        ''',
+    )
+    return write(Path(project, "calcs", "c0101"), "c0101_loads.py", _calcS)
+
+
+def test_cached_run_keeps_command_values(project):
+    calcP = _calc(project)
+    firstO, firstS = run(calcP)
+    secondO, secondS = run(calcP)
+    assert secondO.rcache.hitsI >= 1
+    for nameS in ("wq", "area", "P1", "A1"):
+        assert nameS in secondO.rivtcalcD
+    assert secondO.rivtcalcD["P1"].number() == firstO.rivtcalcD["P1"].number()
+    assert secondO.rivtcalcD["A1"].number() == firstO.rivtcalcD["A1"].number()
+
+
+def test_cached_run_output_matches(project):
+    calcP = _calc(project)
+    _, firstS = run(calcP, cacheB=False)
+    _, secondS = run(calcP)
+    _, thirdS = run(calcP)
+    assert firstS == secondS == thirdS
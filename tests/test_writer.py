@@ -0,0 +1,63 @@
+"""streamed calc files and part file clean up"""
+
+from pathlib import Path
+
+import pytest
+
+from conftest import run, write
+
+_calcS = '''
+from rivtcalc import rc_lib as rc
+
+rc.I(
+    """[01]_ Intro
+
+    Some intro text.
+    """
+)
+rc.V(
+    """[02]_ Values
+
+    ||config | nosub | 2,2
+
+    L1 = 20.0   | FT, IN | span
+    w1 = 1.5    | KLF, PLF | load
+
+    bending moment [e]_
+    M1 = w1 * L1**2 / 8 | FT_KIPS, IN_KIPS
+    """
+)
+'''
+
+
+def _parts(project) -> list:
+    return sorted(Path(project, "tmp").glob("*.part"))
+
+
+def test_utf_doc(project):
+    calcP = write(Path(project, "calcs", "c0101"), "c0101_beam.py", _calcS)
+    sessO, termS = run(calcP, cacheB=False)
+    assert _parts(project)
+    sessO.doc()
+    utfS = Path(project, "calcs", "c0101", "c0101_beam.txt").read_text("utf-8")
+    assert "Some intro text." in utfS and "bending moment" in utfS
+    assert "M₁" in utfS
+    assert _parts(project) == []
+
+
+def test_rst_doc(project, monkeypatch):
+    calcP = write(Path(project, "calcs", "c0101"), "c0101_beam.py", _calcS)
+    sessO, termS = run(calcP, cacheB=False)
+    monkeypatch.setattr(sessO, "gen_tex", lambda *argT: None)
+    sessO.doc("tex", clrS="keep")
+    rstS = Path(project, "tmp", "c0101_beam.rst").read_text("utf-8")
+    assert "Some intro text." in rstS
+    assert _parts(project) == []
+
+
+def test_failed_run(project):
+    failS = _calcS + 'rc.T("""[03]_ Fails\n\n    a1 = 1 / 0\n    """)\n'
+    calcP = write(Path(project, "calcs", "c0101"), "c0101_beam.py", failS)
+    with pytest.raises(ZeroDivisionError):
+        run(calcP, cacheB=False)
+    assert _parts(project) == []